@@ -0,0 +1,293 @@
+"""
+Write-behind view counters.
+
+Page views are collected in a buffer (process memory or the Django cache) and
+applied to the model's counter column in batched ``F()`` updates, so a page
+view never loads or rewrites the content row.
+
+Configuration lives in ``settings.VIEW_COUNTER``:
+
+    VIEW_COUNTER = {
+        'BACKEND': 'memory',       # 'memory' (per process) or 'cache' (shared)
+        'CACHE_ALIAS': 'default',  # cache used by the 'cache' backend
+        'FLUSH_INTERVAL': 30,      # seconds between in-process flushes (and one at exit); 0 disables
+        'MODELS': ['blog.BlogPost', 'faq.FAQ'],
+        'ROLLUP_MODELS': ['company.CompanyReview', 'pages.StaticPage'],
+    }
+
+``MODELS`` have a ``views`` column; ``ROLLUP_MODELS`` only have daily
+rollups. Every flush also appends the drained counts to the daily rollups
+(see analytics/rollup.py).
+
+The 'cache' backend needs a cache with atomic incr/decr (Redis, Memcached) to
+be exact across processes; ``manage.py flush_view_counts`` drains it from cron.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from rest_framework.response import Response
+
+from . import rollup
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'memory',
+    'CACHE_ALIAS': 'default',
+    'FLUSH_INTERVAL': 30,
+    'KEY_PREFIX': 'views',
+    'MODELS': ['blog.BlogPost', 'faq.FAQ'],
+    'ROLLUP_MODELS': ['company.CompanyReview', 'pages.StaticPage'],
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'VIEW_COUNTER', {}))
+    return config
+
+
+class MemoryBackend:
+    """Pending increments held in this process only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+
+    def incr(self, pk, amount=1):
+        with self._lock:
+            self._counts[pk] += amount
+            return self._counts[pk]
+
+    def get(self, pk):
+        return self._counts.get(pk, 0)
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = dict(self._counts), defaultdict(int)
+        return counts
+
+
+class CacheBackend:
+    """Pending increments shared by every process through the Django cache."""
+
+    lock_timeout = 5
+    lock_wait = 1
+
+    def __init__(self, label, alias, prefix):
+        self.cache = caches[alias]
+        self.prefix = f'{prefix}:{label.lower()}'
+        self.index_key = f'{self.prefix}:pending'
+        self.lock_key = f'{self.prefix}:lock'
+        # Pks whose counters are pending but not yet in the shared index (the lock was busy)
+        self._unindexed = set()
+        self._unindexed_lock = threading.Lock()
+
+    def _key(self, pk):
+        return f'{self.prefix}:{pk}'
+
+    def incr(self, pk, amount=1):
+        key = self._key(pk)
+        if self.cache.add(key, amount, timeout=None):
+            value = amount
+        else:
+            try:
+                value = self.cache.incr(key, amount)
+            except ValueError:
+                # The key expired or was evicted between add() and incr()
+                self.cache.set(key, amount, timeout=None)
+                value = amount
+        if value == amount or self._unindexed:
+            # First pending view since the last drain: remember the pk
+            self._update_index(add={pk})
+        return value
+
+    def get(self, pk):
+        return self.cache.get(self._key(pk)) or 0
+
+    def drain(self):
+        pending = self._update_index(clear=True)
+        if pending is None:
+            # Another process holds the index; its views stay pending for the next flush
+            return {}
+        counts, leftover = {}, set()
+        for pk in pending:
+            key = self._key(pk)
+            value = self.cache.get(key) or 0
+            if not value:
+                continue
+            counts[pk] = value
+            # Views that arrived after get() stay in the counter
+            if self.cache.decr(key, value) > 0:
+                leftover.add(pk)
+        if leftover:
+            self._update_index(add=leftover)
+        return counts
+
+    def _update_index(self, add=(), clear=False):
+        """Read-modify-write the pending pk set under a short cache lock; returns the set read.
+
+        Without the lock nothing is written and None is returned: the pks to
+        add are kept in this process and go in with its next update.
+        """
+        with self._unindexed_lock:
+            add = self._unindexed | set(add)
+            self._unindexed = set()
+        deadline = time.monotonic() + self.lock_wait
+        locked = self.cache.add(self.lock_key, 1, timeout=self.lock_timeout)
+        while not locked and time.monotonic() < deadline:
+            time.sleep(0.01)
+            locked = self.cache.add(self.lock_key, 1, timeout=self.lock_timeout)
+        if not locked:
+            with self._unindexed_lock:
+                self._unindexed |= add
+            return None
+        try:
+            current = set(self.cache.get(self.index_key) or ())
+            if clear:
+                self.cache.delete(self.index_key)
+                return current | add
+            if not add <= current:
+                self.cache.set(self.index_key, current | add, timeout=None)
+            return current
+        finally:
+            self.cache.delete(self.lock_key)
+
+
+class ViewCounter:
+    """Buffered counter for one model column (``views`` by default), or for the rollups only."""
+
+    def __init__(self, label, field='views'):
+        self.label = label
+        self.field = field
+        config = get_config()
+        if config['BACKEND'] == 'cache':
+            self.backend = CacheBackend(label, config['CACHE_ALIAS'], config['KEY_PREFIX'])
+        else:
+            self.backend = MemoryBackend()
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    def add(self, pk, amount=1):
+        self.backend.incr(pk, amount)
+        _start_flusher()
+
+    def pending(self, pk):
+        return self.backend.get(pk)
+
+    def flush(self):
+        """Apply pending increments; returns the number of views written."""
+        counts = self.backend.drain()
+        if not counts:
+            return 0
+        # One UPDATE per distinct increment instead of one per row
+        by_amount = defaultdict(list)
+        for pk, amount in counts.items():
+            by_amount[amount].append(pk)
+        try:
+            with transaction.atomic():
+                if self.field:
+                    for amount, pks in by_amount.items():
+                        self.model._default_manager.filter(pk__in=pks).update(
+                            **{self.field: F(self.field) + amount}
+                        )
+                rollup.record(self.label, counts)
+        except Exception:
+            for pk, amount in counts.items():
+                self.backend.incr(pk, amount)
+            raise
+        return sum(counts.values())
+
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def get_counter(label):
+    """Return the process-wide counter for a model label such as 'blog.BlogPost'."""
+    with _counters_lock:
+        if label not in _counters:
+            rollup_only = label in get_config()['ROLLUP_MODELS']
+            _counters[label] = ViewCounter(label, field=None if rollup_only else 'views')
+        return _counters[label]
+
+
+def flush_all():
+    config = get_config()
+    labels = set(config['MODELS']) | set(config['ROLLUP_MODELS']) | set(_counters)
+    return {label: get_counter(label).flush() for label in sorted(labels)}
+
+
+class CountViewsMixin:
+    """Buffer a view of the retrieved object, including detail responses served from the response cache.
+
+    With ``count_views_deferred()`` false the response is kept out of the
+    cache and shows the ``views`` column plus the views still buffered.
+    """
+    view_counter_label = None
+
+    def count_views_deferred(self):
+        return True
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        counter = get_counter(self.view_counter_label)
+        counter.add(instance.pk)
+        data = self.get_serializer(instance).data
+        if self.count_views_deferred():
+            self.response_cache_meta = {'view_pk': instance.pk}
+            return Response(data)
+        data['views'] = instance.views + counter.pending(instance.pk)
+        response = Response(data)
+        response.skip_response_cache = True
+        return response
+
+    def response_cache_hit(self, meta):
+        if meta and 'view_pk' in meta:
+            get_counter(self.view_counter_label).add(meta['view_pk'])
+
+
+_flusher = None
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush_all()
+        except Exception:
+            # Counts were restored to the buffer; retry on the next tick
+            pass
+        finally:
+            close_old_connections()
+
+
+def _flush_at_exit():
+    try:
+        flush_all()
+    except Exception:
+        # The database may already be gone (e.g. a test database); the counts are lost either way
+        logger.exception('Could not flush buffered view counts at exit')
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    interval = get_config()['FLUSH_INTERVAL']
+    with _counters_lock:
+        if _flusher is not None or not interval:
+            return
+        _flusher = threading.Thread(target=_flush_loop, args=(interval,), name='view-counter-flush', daemon=True)
+        _flusher.start()
+        atexit.register(_flush_at_exit)
@@ -0,0 +1,97 @@
+"""
+Helpful / not-helpful vote ingestion for blog posts and FAQs.
+
+``record_vote()`` is the single write path for both. In one transaction it
+inserts the vote with ``INSERT ... ON CONFLICT DO NOTHING`` on the
+``(item, ip_address)`` unique constraint and bumps the item's
+``helpful_count`` or ``not_helpful_count`` only when a row was inserted. A
+repeat vote costs no failed insert and no counter update.
+
+Before the database is touched, ``cache.add()`` on a per-(item, address)
+marker turns away addresses that already voted, so repeat voters and bots
+hammering a vote widget are answered from the cache.
+
+Configuration lives in ``settings.FEEDBACK``:
+
+    FEEDBACK = {
+        'CACHE_ALIAS': 'default',
+        'DEDUP_TIMEOUT': 24 * 60 * 60,  # seconds a vote is remembered in the cache
+    }
+
+The unique constraint stays authoritative: a marker lost to eviction or a
+per-process cache only means the vote reaches the ``ON CONFLICT`` insert.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'DEDUP_TIMEOUT': 24 * 60 * 60,
+    'KEY_PREFIX': 'vote',
+}
+
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+NOT_FOUND = 'not_found'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FEEDBACK', {}))
+    return config
+
+
+def insert_ignore(model, values, conflict_fields):
+    """INSERT one row unless it collides on ``conflict_fields``; return whether it was inserted."""
+    meta = model._meta
+    quote = connection.ops.quote_name
+    fields = [meta.get_field(name) for name in values]
+    columns = ', '.join(quote(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    conflict = ', '.join(quote(meta.get_field(name).column) for name in conflict_fields)
+    params = [field.get_db_prep_save(values[field.name], connection) for field in fields]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) VALUES ({placeholders}) '
+            f'ON CONFLICT ({conflict}) DO NOTHING',
+            params,
+        )
+        return cursor.rowcount == 1
+
+
+def record_vote(items, feedback_model, item_field, *, key, ip_address, is_helpful, comment=''):
+    """Record a vote on the single item in ``items``, keyed by ``key`` (its slug).
+
+    Returns ``CREATED``, ``DUPLICATE`` (this address already voted) or
+    ``NOT_FOUND`` (``items`` is empty).
+    """
+    config = get_config()
+    cache = caches[config['CACHE_ALIAS']]
+    marker = f"{config['KEY_PREFIX']}:{feedback_model._meta.label_lower}:{key}:{ip_address}"
+    if not cache.add(marker, 1, config['DEDUP_TIMEOUT']):
+        return DUPLICATE
+
+    try:
+        with transaction.atomic():
+            pk = items.values_list('pk', flat=True).first()
+            if pk is None:
+                cache.delete(marker)
+                return NOT_FOUND
+            inserted = insert_ignore(feedback_model, {
+                item_field: pk,
+                'is_helpful': is_helpful,
+                'comment': comment,
+                'ip_address': ip_address,
+                'created_at': timezone.now(),
+            }, conflict_fields=(item_field, 'ip_address'))
+            if inserted:
+                counter = 'helpful_count' if is_helpful else 'not_helpful_count'
+                items.model.objects.filter(pk=pk).update(**{counter: F(counter) + 1})
+    except Exception:
+        # Let the voter retry rather than be remembered for a vote that was never stored
+        cache.delete(marker)
+        raise
+    return CREATED if inserted else DUPLICATE
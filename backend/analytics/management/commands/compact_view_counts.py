@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollup import compact
+
+
+class Command(BaseCommand):
+    help = "Merge each closed day's view rollups into one row per item and drop days past retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='Only compact days this recent, so a missed night is caught up (0: every day)',
+        )
+
+    def handle(self, *args, **options):
+        merged, expired = compact(lookback_days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"{merged} rows merged, {expired} expired rows deleted"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from analytics.buffer import flush_all, get_config
+
+
+class Command(BaseCommand):
+    help = "Apply buffered page views to the models' view counters"
+
+    def handle(self, *args, **options):
+        if get_config()['BACKEND'] != 'cache':
+            self.stdout.write(self.style.WARNING(
+                "VIEW_COUNTER uses the 'memory' backend; each web process flushes its own buffer."
+            ))
+        for label, written in flush_all().items():
+            self.stdout.write(self.style.SUCCESS(f"{label}: {written} views flushed"))
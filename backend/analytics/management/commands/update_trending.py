@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from analytics.trending import update_trending
+
+
+class Command(BaseCommand):
+    help = "Recompute the trending scores of items viewed or voted on since the last run"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Rescore every item, e.g. after changing TRENDING HALF_LIFE_DAYS',
+        )
+
+    def handle(self, *args, **options):
+        for label, written in update_trending(full=options['full']).items():
+            self.stdout.write(self.style.SUCCESS(f"{label}: {written} scores updated"))
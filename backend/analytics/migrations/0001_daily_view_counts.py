@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyViewCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item_type', 'object_id', 'day'], name='dailyviews_item_idx'), models.Index(fields=['item_type', 'day'], name='dailyviews_day_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_daily_view_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
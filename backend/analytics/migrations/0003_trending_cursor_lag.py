@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_trending_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingcursor',
+            name='pending',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trendingcursor',
+            name='pending_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
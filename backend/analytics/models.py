@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class DailyViewCount(models.Model):
+    """Views of one item on one day (see analytics/rollup.py).
+
+    Flushes append a row per item and flush; ``compact_view_counts`` merges a
+    closed day's rows into one per item, so totals are always ``SUM(views)``.
+    """
+    item_type = models.CharField(max_length=50)  # model label, e.g. 'blog.blogpost'
+    object_id = models.PositiveBigIntegerField()
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # "Views of these items since day X": one range per item
+            models.Index(fields=['item_type', 'object_id', 'day'], name='dailyviews_item_idx'),
+            # "Most viewed since day X", compaction and retention: one range per type
+            models.Index(fields=['item_type', 'day'], name='dailyviews_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_type}:{self.object_id} {self.day}: {self.views}"
+
+
+class TrendingCursor(models.Model):
+    """Highest row id of a table already folded into the trending scores.
+
+    ``pending`` is the highest id seen at ``pending_at``; it becomes the
+    position once no transaction from that time can still be uncommitted.
+    """
+    name = models.CharField(max_length=100, unique=True)  # e.g. 'analytics.dailyviewcount'
+    position = models.BigIntegerField(default=0)
+    pending = models.BigIntegerField(default=0)
+    pending_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
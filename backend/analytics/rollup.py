@@ -0,0 +1,146 @@
+"""
+Per-day view rollups for posts, FAQs, reviews and static pages.
+
+Lifetime ``views`` columns cannot answer "most viewed this week", so every
+flush of the view buffer (analytics/buffer.py) also appends one
+``DailyViewCount`` row per viewed item for the current day. A flush is one
+batched INSERT, and no two processes update the same row. ``compact()``
+(``manage.py compact_view_counts``, run nightly) merges each closed day into
+one row per item and drops days past the retention window. Readers sum
+rows either way, so a day that has not been compacted yet only costs a few
+extra rows.
+
+Configuration lives in ``settings.VIEW_ROLLUPS``:
+
+    VIEW_ROLLUPS = {
+        'ENABLED': True,
+        'RETENTION_DAYS': 400,  # days of history kept
+    }
+
+Views are dated by the day they are flushed, so a view buffered just before
+midnight can be counted on the next day.
+
+``views_since()``, ``top_viewed()``, ``views_by_day()`` and
+``with_recent_views()`` read the rollups.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import DailyViewCount
+
+DEFAULTS = {
+    'ENABLED': True,
+    'RETENTION_DAYS': 400,
+    'BATCH_SIZE': 1000,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'VIEW_ROLLUPS', {}))
+    return config
+
+
+def item_type(model):
+    """``'blog.blogpost'`` for a model or a label such as ``'blog.BlogPost'``."""
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.concrete_model._meta.label_lower
+
+
+def window_start(days, today=None):
+    """First day of the ``days``-day window that ends today."""
+    return (today or timezone.localdate()) - datetime.timedelta(days=days - 1)
+
+
+def record(model, counts, day=None):
+    """Append ``{pk: views}`` to the rollups for ``day`` (today); returns the rows written."""
+    config = get_config()
+    if not config['ENABLED']:
+        return 0
+    kind, day = item_type(model), day or timezone.localdate()
+    rows = [
+        DailyViewCount(item_type=kind, object_id=pk, day=day, views=views)
+        for pk, views in counts.items() if views > 0
+    ]
+    DailyViewCount.objects.bulk_create(rows, batch_size=config['BATCH_SIZE'])
+    return len(rows)
+
+
+def _window(model, days):
+    return DailyViewCount.objects.filter(item_type=item_type(model), day__gte=window_start(days))
+
+
+def views_since(model, days, pks=None):
+    """``{pk: views}`` over the last ``days`` days for ``pks``, or for every item viewed."""
+    rows = _window(model, days)
+    if pks is not None:
+        rows = rows.filter(object_id__in=list(pks))
+    return dict(rows.values('object_id').annotate(total=Sum('views')).values_list('object_id', 'total'))
+
+
+def top_viewed(model, days, limit=10):
+    """``[(pk, views), ...]`` of the ``limit`` items viewed most over the last ``days`` days."""
+    rows = _window(model, days).values('object_id').annotate(total=Sum('views'))
+    return list(rows.order_by('-total', 'object_id').values_list('object_id', 'total')[:limit])
+
+
+def views_by_day(model, pk, days):
+    """``[(day, views), ...]`` for each of the last ``days`` days, oldest first, zeros included."""
+    start = window_start(days)
+    totals = dict(
+        _window(model, days).filter(object_id=pk)
+        .values('day').annotate(total=Sum('views')).values_list('day', 'total')
+    )
+    return [
+        (day, totals.get(day, 0))
+        for day in (start + datetime.timedelta(days=offset) for offset in range(days))
+    ]
+
+
+def with_recent_views(queryset, days, name='recent_views'):
+    """Annotate ``queryset`` with each item's views over the last ``days`` days."""
+    totals = (
+        _window(queryset.model, days).filter(object_id=OuterRef('pk'))
+        .order_by().values('object_id').annotate(total=Sum('views')).values('total')
+    )
+    return queryset.annotate(**{name: Coalesce(Subquery(totals, output_field=IntegerField()), 0)})
+
+
+def compact(lookback_days=None, today=None):
+    """Merge each closed day's rows into one per item and drop days past retention.
+
+    Only days within ``lookback_days`` of today are examined when it is given.
+    Returns ``(merged, expired)``, the number of rows removed by each step.
+    """
+    config = get_config()
+    today = today or timezone.localdate()
+    expired = DailyViewCount.objects.filter(
+        day__lt=today - datetime.timedelta(days=config['RETENTION_DAYS'])
+    ).delete()[0]
+
+    closed = DailyViewCount.objects.filter(day__lt=today)
+    if lookback_days:
+        closed = closed.filter(day__gte=today - datetime.timedelta(days=lookback_days))
+    pending = (
+        closed.values('item_type', 'object_id', 'day').annotate(rows=Count('id')).filter(rows__gt=1)
+        .values_list('item_type', 'day').distinct().order_by('day', 'item_type')
+    )
+
+    merged = 0
+    for kind, day in list(pending):
+        with transaction.atomic():
+            rows = DailyViewCount.objects.filter(item_type=kind, day=day)
+            totals = list(rows.values('object_id').annotate(total=Sum('views')).values_list('object_id', 'total'))
+            deleted = rows.delete()[0]
+            DailyViewCount.objects.bulk_create(
+                [DailyViewCount(item_type=kind, object_id=pk, day=day, views=total) for pk, total in totals],
+                batch_size=config['BATCH_SIZE'],
+            )
+        merged += deleted - len(totals)
+    return merged, expired
@@ -0,0 +1,347 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analytics import rollup, trending
+from analytics.buffer import CacheBackend, ViewCounter, flush_all, get_counter
+from analytics.models import DailyViewCount
+from backend.client_ip import get_client_ip
+
+from blog.models import BlogFeedback, BlogPost
+from faq.models import FAQ, FAQCategory, FAQFeedback
+from pages.models import StaticPage
+
+
+class ViewCounterTests(TestCase):
+    backend = 'memory'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.posts = [
+            BlogPost.objects.create(title=f'Post {i}', slug=f'post-{i}', content='x', is_published=True)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        settings = override_settings(VIEW_COUNTER={'BACKEND': self.backend, 'FLUSH_INTERVAL': 0})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.counter = ViewCounter('blog.BlogPost')
+
+    def views(self):
+        return list(BlogPost.objects.order_by('pk').values_list('views', flat=True))
+
+    def test_flush_groups_updates_by_amount(self):
+        first, second, third = self.posts
+        for pk, amount in ((first.pk, 2), (second.pk, 2), (third.pk, 5)):
+            self.counter.add(pk, amount)
+        self.assertEqual(self.counter.pending(first.pk), 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.counter.flush(), 9)
+        # One UPDATE per distinct amount, however many rows share it
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 2)
+        self.assertEqual(self.views(), [2, 2, 5])
+        self.assertEqual(self.counter.pending(first.pk), 0)
+        self.assertEqual(self.counter.flush(), 0)
+
+    def test_failed_flush_requeues_the_views(self):
+        self.counter.add(self.posts[0].pk, 3)
+        with mock.patch.object(rollup, 'record', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.counter.flush()
+        self.assertEqual(self.views(), [0, 0, 0])
+        self.assertEqual(self.counter.pending(self.posts[0].pk), 3)
+        self.assertEqual(self.counter.flush(), 3)
+        self.assertEqual(self.views(), [3, 0, 0])
+
+
+class CacheViewCounterTests(ViewCounterTests):
+    backend = 'cache'
+
+    def test_busy_index_lock_keeps_views_pending(self):
+        backend = self.counter.backend
+        backend.lock_wait = 0
+        cache.add(backend.lock_key, 1)
+        self.counter.add(self.posts[0].pk)
+        # Neither written without the lock nor lost: the pk waits in this process
+        self.assertIsNone(cache.get(backend.index_key))
+        self.assertEqual(self.counter.flush(), 0)
+        cache.delete(backend.lock_key)
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.views(), [1, 0, 0])
+
+    def test_processes_share_the_buffer(self):
+        self.counter.add(self.posts[1].pk)
+        other = CacheBackend('blog.BlogPost', 'default', 'views')
+        other.incr(self.posts[1].pk)
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.views(), [0, 2, 0])
+
+
+class VoteIngestionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = BlogPost.objects.create(title='Deductibles', slug='deductibles', content='x')
+        category = FAQCategory.objects.create(name='Claims')
+        cls.faq = FAQ.objects.create(category=category, question='How do claims work?', slug='claims')
+
+    def setUp(self):
+        cache.clear()
+
+    def vote(self, url, helpful=True, ip='203.0.113.7'):
+        return self.client.post(url, {'is_helpful': helpful}, content_type='application/json', REMOTE_ADDR=ip)
+
+    def test_blog_vote_counts_once(self):
+        url = '/api/blog/posts/deductibles/feedback/'
+        self.assertEqual(self.vote(url).status_code, 201)
+        # Repeat voter: answered from the cache marker without touching the database
+        with self.assertNumQueries(0):
+            self.assertEqual(self.vote(url, helpful=False).status_code, 400)
+        self.assertEqual(self.vote(url, ip='203.0.113.8', helpful=False).status_code, 201)
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.helpful_count, self.post.not_helpful_count), (1, 1))
+        self.assertEqual(BlogFeedback.objects.count(), 2)
+
+    def test_duplicate_past_the_cache_is_ignored_by_the_insert(self):
+        url = '/api/faq/api/faqs/claims/feedback/'
+        self.assertEqual(self.vote(url).status_code, 201)
+        cache.clear()  # another process, or an evicted marker
+        self.assertEqual(self.vote(url).status_code, 400)
+
+        self.faq.refresh_from_db()
+        self.assertEqual(self.faq.helpful_count, 1)
+        self.assertEqual(FAQFeedback.objects.count(), 1)
+
+    def test_unknown_item(self):
+        self.assertEqual(self.vote('/api/blog/posts/missing/feedback/').status_code, 404)
+        self.assertEqual(self.vote('/api/faq/api/faqs/missing/feedback/').status_code, 404)
+
+    def test_invalid_vote_is_rejected_before_the_cache(self):
+        url = '/api/blog/posts/deductibles/feedback/'
+        self.assertEqual(self.client.post(url, {}, content_type='application/json').status_code, 400)
+        self.assertEqual(self.vote(url).status_code, 201)
+
+
+class ClientIPTests(SimpleTestCase):
+    def ip(self, remote, forwarded=None):
+        headers = {'REMOTE_ADDR': remote}
+        if forwarded is not None:
+            headers['HTTP_X_FORWARDED_FOR'] = forwarded
+        return get_client_ip(RequestFactory().get('/', **headers))
+
+    @override_settings(TRUSTED_PROXIES=[])
+    def test_header_ignored_without_trusted_proxies(self):
+        self.assertEqual(self.ip('198.51.100.1', '1.2.3.4'), '198.51.100.1')
+
+    @override_settings(TRUSTED_PROXIES=[])
+    def test_warns_once_about_an_ignored_header(self):
+        with mock.patch('backend.client_ip._warned_untrusted_header', False):
+            with self.assertNoLogs('backend.client_ip'):
+                self.ip('198.51.100.1')
+            with self.assertLogs('backend.client_ip', 'WARNING') as logs:
+                self.ip('10.0.0.5', '203.0.113.9')
+                self.ip('10.0.0.5', '203.0.113.10')
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('TRUSTED_PROXIES', logs.output[0])
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_walks_trusted_hops_right_to_left(self):
+        # The client forged the first hop; the proxy appended the real address
+        self.assertEqual(self.ip('10.0.0.5', '6.6.6.6, 203.0.113.9, 10.0.0.7'), '203.0.113.9')
+        self.assertEqual(self.ip('198.51.100.1', '203.0.113.9'), '198.51.100.1')
+        self.assertEqual(self.ip('10.0.0.5', 'garbage, 203.0.113.9'), '203.0.113.9')
+        self.assertEqual(self.ip('10.0.0.5'), '10.0.0.5')
+
+
+@override_settings(RATE_LIMITS={'SCOPES': {'feedback': {'rate': '1/hour', 'burst': 2}}})
+class FeedbackThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(4):
+            BlogPost.objects.create(title=f'Post {i}', slug=f'post-{i}', content='x')
+
+    def setUp(self):
+        cache.clear()
+
+    def vote(self, slug, ip):
+        return self.client.post(
+            f'/api/blog/posts/{slug}/feedback/', {'is_helpful': True}, content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def test_burst_then_429(self):
+        self.assertEqual(self.vote('post-0', '203.0.113.7').status_code, 201)
+        self.assertEqual(self.vote('post-1', '203.0.113.7').status_code, 201)
+        with self.assertNumQueries(0):
+            response = self.vote('post-2', '203.0.113.7')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 3000)
+        # Buckets are per address
+        self.assertEqual(self.vote('post-2', '203.0.113.8').status_code, 201)
+
+
+class ViewRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = BlogPost.objects.create(title='Deductibles', slug='deductibles', content='x', is_published=True)
+        cls.page = StaticPage.objects.create(page_type='press', title='Press', content='x')
+        category = FAQCategory.objects.create(name='Claims')
+        cls.old = FAQ.objects.create(category=category, question='Old favourite?', slug='old', views=100)
+        cls.new = FAQ.objects.create(category=category, question='New question?', slug='new')
+
+    def setUp(self):
+        cache.clear()
+        for label in ('blog.BlogPost', 'faq.FAQ', 'pages.StaticPage'):
+            get_counter(label).backend.drain()
+
+    def test_flush_appends_daily_rows(self):
+        self.client.post('/api/blog/posts/deductibles/increment_view/')
+        self.client.post('/api/blog/posts/deductibles/increment_view/')
+        self.assertEqual(self.client.get('/api/pages/press/').status_code, 200)
+        # Served from the response cache, still a view
+        self.assertEqual(self.client.get('/api/pages/press/')['X-Response-Cache'], 'HIT')
+        flush_all()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+        self.assertEqual(rollup.views_since(BlogPost, 7), {self.post.pk: 2})
+        self.assertEqual(rollup.views_since(StaticPage, 1), {self.page.pk: 2})
+        self.assertEqual(rollup.views_by_day(BlogPost, self.post.pk, 2)[-1], (timezone.localdate(), 2))
+
+    @override_settings(VIEW_ROLLUPS={'RETENTION_DAYS': 30})
+    def test_compaction_merges_closed_days(self):
+        today = timezone.localdate()
+        yesterday, expired = today - datetime.timedelta(days=1), today - datetime.timedelta(days=31)
+        for day in (yesterday, yesterday, today, today, expired):
+            rollup.record(BlogPost, {self.post.pk: 3, self.post.pk + 1: 1}, day=day)
+
+        self.assertEqual(rollup.compact(today=today), (2, 2))
+        self.assertEqual(DailyViewCount.objects.filter(day=yesterday).count(), 2)
+        self.assertEqual(DailyViewCount.objects.filter(day=today).count(), 4)
+        self.assertEqual(rollup.views_since(BlogPost, 2, pks=[self.post.pk]), {self.post.pk: 12})
+        self.assertEqual(rollup.top_viewed(BlogPost, 2, limit=1), [(self.post.pk, 12)])
+        self.assertEqual(rollup.compact(today=today), (0, 0))
+
+    def test_popular_over_recent_days(self):
+        rollup.record(FAQ, {self.new.pk: 5})
+        rollup.record(FAQ, {self.old.pk: 50}, day=timezone.localdate() - datetime.timedelta(days=30))
+        slugs = [faq['slug'] for faq in self.client.get('/api/faq/api/faqs/popular/?days=7').json()]
+        self.assertEqual(slugs, ['new', 'old'])
+        # Past retention the window is clamped
+        slugs = [faq['slug'] for faq in self.client.get('/api/faq/api/faqs/popular/?days=100000000').json()]
+        self.assertEqual(slugs, ['old', 'new'])
+        for days in ('abc', '0', '-3'):
+            self.assertEqual(self.client.get(f'/api/faq/api/faqs/popular/?days={days}').status_code, 400)
+
+    def test_cached_faq_details_still_count(self):
+        self.client.get('/api/faq/api/faqs/new/')
+        self.assertEqual(self.client.get('/api/faq/api/faqs/new/')['X-Response-Cache'], 'HIT')
+        flush_all()
+        self.assertEqual(FAQ.objects.get(pk=self.new.pk).views, 2)
+
+    @override_settings(FAQ_DEFERRED_VIEWS=False)
+    def test_undeferred_faq_views_are_buffered(self):
+        self.assertEqual(self.client.get('/api/faq/api/faqs/new/').json()['views'], 1)
+        self.assertEqual(self.client.get('/api/faq/api/faqs/new/').json()['views'], 2)
+        self.assertFalse(DailyViewCount.objects.exists())
+        flush_all()
+        self.assertEqual(FAQ.objects.get(pk=self.new.pk).views, 2)
+        self.assertEqual(list(DailyViewCount.objects.values_list('object_id', 'views')), [(self.new.pk, 2)])
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fresh = BlogPost.objects.create(title='Fresh', slug='fresh', content='x', is_published=True)
+        cls.stale = BlogPost.objects.create(title='Stale', slug='stale', content='x', is_published=True)
+        category = FAQCategory.objects.create(name='Claims')
+        cls.liked = FAQ.objects.create(category=category, question='Liked?', slug='liked', helpful_count=40)
+        cls.other = FAQ.objects.create(category=category, question='Other?', slug='other')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_scores(self):
+        self.assertEqual(trending.wilson_lower_bound(0, 0), 0)
+        # Nine of ten beats one of one: the bound rewards evidence, not just the share
+        self.assertGreater(trending.wilson_lower_bound(9, 1), trending.wilson_lower_bound(1, 0))
+        today = timezone.localdate()
+        # One half-life apart: the same views score exactly one point apart
+        self.assertAlmostEqual(
+            trending.score([(today, 8)]) - trending.score([(today - datetime.timedelta(days=7), 8)]), 1,
+        )
+        self.assertEqual(trending.score([]), 0)
+
+    @override_settings(TRENDING={'CURSOR_LAG_SECONDS': 0})
+    def test_only_changed_items_are_rescored(self):
+        today = timezone.localdate()
+        rollup.record(BlogPost, {self.stale.pk: 100}, day=today - datetime.timedelta(days=60))
+        rollup.record(BlogPost, {self.fresh.pk: 10})
+        rollup.record(FAQ, {self.liked.pk: 10, self.other.pk: 10})
+        self.assertEqual(
+            trending.update_trending(), {'blog.BlogPost': 2, 'faq.FAQ': 2, 'company.CompanyReview': 0},
+        )
+        self.assertEqual(trending.update_trending(), {'blog.BlogPost': 0, 'faq.FAQ': 0, 'company.CompanyReview': 0})
+
+        BlogFeedback.objects.create(blog_post=self.stale, is_helpful=True, ip_address='203.0.113.7')
+        self.assertEqual(trending.update_trending()['blog.BlogPost'], 1)
+
+        slugs = [post['slug'] for post in self.client.get('/api/blog/posts/?ordering=trending').json()['results']]
+        self.assertEqual(slugs, ['fresh', 'stale'])
+        # Same views, but the helpful votes lift it
+        slugs = [faq['slug'] for faq in self.client.get('/api/faq/api/faqs/popular/').json()]
+        self.assertEqual(slugs, ['liked', 'other'])
+
+    def test_unscored_items_fall_back_to_lifetime_views(self):
+        # Content from before the rollups has no score yet; it keeps its old popularity order
+        BlogPost.objects.filter(pk=self.stale.pk).update(views=500)
+        FAQ.objects.filter(pk=self.other.pk).update(views=500)
+        slugs = [post['slug'] for post in self.client.get('/api/blog/posts/?ordering=trending').json()['results']]
+        self.assertEqual(slugs, ['stale', 'fresh'])
+        slugs = [faq['slug'] for faq in self.client.get('/api/faq/api/faqs/popular/').json()]
+        self.assertEqual(slugs, ['other', 'liked'])
+
+        # Equal lifetime views: helpful votes decide (counter updates leave cached lists alone)
+        FAQ.objects.filter(pk=self.liked.pk).update(views=500)
+        cache.clear()
+        slugs = [faq['slug'] for faq in self.client.get('/api/faq/api/faqs/popular/').json()]
+        self.assertEqual(slugs, ['liked', 'other'])
+
+        # Any recent activity ranks above lifetime totals
+        rollup.record(BlogPost, {self.fresh.pk: 1})
+        trending.update_trending()
+        cache.clear()
+        slugs = [post['slug'] for post in self.client.get('/api/blog/posts/?ordering=trending').json()['results']]
+        self.assertEqual(slugs, ['fresh', 'stale'])
+
+    def test_rows_committed_late_below_the_cursor_are_read(self):
+        rollup.record(BlogPost, {self.fresh.pk: 10})
+        late = DailyViewCount.objects.create(item_type='blog.blogpost', object_id=self.stale.pk, day=timezone.localdate())
+        rollup.record(FAQ, {self.liked.pk: 10})
+        # As if the stale post's flush had not committed yet when the first run read the tables
+        late.delete()
+        self.assertEqual(trending.update_trending()['blog.BlogPost'], 1)
+        DailyViewCount.objects.create(
+            pk=late.pk, item_type='blog.blogpost', object_id=self.stale.pk, day=timezone.localdate(), views=3,
+        )
+        # Within the lag every run re-reads the rows above the last settled id
+        self.assertEqual(trending.update_trending()['blog.BlogPost'], 2)
+        self.assertGreater(BlogPost.objects.get(pk=self.stale.pk).trending_score, 0)
+
+    def test_trending_lists_skip_the_whole_table_aggregate(self):
+        for url in (
+            '/api/blog/posts/?ordering=trending&pagination=cursor', '/api/faq/api/faqs/popular/',
+            '/api/company/reviews/popular/',
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertIn('ETag', response)
+            sql = ' '.join(query['sql'] for query in queries)
+            self.assertNotIn('SUM(', sql, url)
+            self.assertNotIn('MAX(', sql, url)
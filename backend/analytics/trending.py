@@ -0,0 +1,185 @@
+"""
+Time-decayed trending scores for blog posts, FAQs and company reviews.
+
+An item's score combines its recent views with how helpful voters found it:
+
+    trending_score = log2(decayed views) + log2(1 + Wilson lower bound of the helpful share)
+
+Views come from the daily rollups (analytics/rollup.py) and decay with a
+half-life of ``HALF_LIFE_DAYS``. The decay is forward: a view on day ``d``
+weighs ``2 ** ((d - EPOCH) / HALF_LIFE_DAYS)``, which differs from the usual
+``2 ** -(age / HALF_LIFE_DAYS)`` by a factor shared by every item. Items
+therefore rank the same either way, but a stored score stays valid as time
+passes and only needs recomputing when the item gets views or votes. The log
+keeps scores small; one point is a doubling. The Wilson bound (0 with no
+votes) scales the score by up to 2 for well-rated items without letting a
+handful of votes dominate. Reviews have no votes and rank by views alone.
+
+``update_trending()`` (``manage.py update_trending``, run every few minutes)
+recomputes the items that got rollup rows or votes since its last run: rows
+with an id above the table's ``TrendingCursor``. Ids are handed out before
+commit, so a flush still in progress can commit rows below the highest id
+already visible. The cursor therefore only moves up to the highest id seen
+at least ``CURSOR_LAG_SECONDS`` earlier, and rows above it are read again by
+every run until then. Rescoring is idempotent, so reading a row twice only
+costs time. Compaction re-inserts merged rows under new ids, which rescores
+those items once more; the rows it deletes change no totals.
+
+Scores are written with ``bulk_update()``, which leaves ``updated_at`` and
+the response-cache generations alone, so cached responses ordered by score
+may lag by up to the cache timeout.
+
+Configuration lives in ``settings.TRENDING``:
+
+    TRENDING = {
+        'HALF_LIFE_DAYS': 7,        # run `update_trending --full` after changing it
+        'Z': 1.96,                  # confidence of the Wilson bound
+        'CURSOR_LAG_SECONDS': 300,  # longer than any flush or vote transaction
+    }
+"""
+import datetime
+import math
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from . import rollup
+from .models import DailyViewCount, TrendingCursor
+
+DEFAULTS = {
+    'HALF_LIFE_DAYS': 7,
+    'Z': 1.96,
+    'CURSOR_LAG_SECONDS': 300,
+    'BATCH_SIZE': 500,
+}
+
+EPOCH = datetime.date(2025, 1, 1)
+
+# Scored model -> (vote model, its foreign key to the scored model), or None without votes
+MODELS = {
+    'blog.BlogPost': ('blog.BlogFeedback', 'blog_post'),
+    'faq.FAQ': ('faq.FAQFeedback', 'faq'),
+    'company.CompanyReview': None,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'TRENDING', {}))
+    return config
+
+
+def wilson_lower_bound(positive, negative, z=1.96):
+    """Lower bound of the Wilson score interval for the share of positive votes."""
+    total = positive + negative
+    if not total:
+        return 0.0
+    share = positive / total
+    centre = share + z * z / (2 * total)
+    spread = z * math.sqrt((share * (1 - share) + z * z / (4 * total)) / total)
+    return (centre - spread) / (1 + z * z / total)
+
+
+def decayed_views(days, half_life):
+    """``log2`` of the forward-decayed sum of ``[(day, views), ...]``; 0 without views."""
+    terms = [math.log2(views) + (day - EPOCH).days / half_life for day, views in days if views > 0]
+    if not terms:
+        return 0.0
+    top = max(terms)
+    return top + math.log2(sum(2 ** (term - top) for term in terms))
+
+
+def score(days, helpful=0, not_helpful=0, config=None):
+    """Trending score of an item with views ``[(day, views), ...]`` and the given votes; 0 if never viewed."""
+    config = config or get_config()
+    if not any(views for _, views in days):
+        return 0.0
+    return (
+        decayed_views(days, config['HALF_LIFE_DAYS'])
+        + math.log2(1 + wilson_lower_bound(helpful, not_helpful, config['Z']))
+    )
+
+
+def _batches(pks, size):
+    pks = sorted(pks)
+    for start in range(0, len(pks), size):
+        yield pks[start:start + size]
+
+
+def rescore(model, pks, config=None):
+    """Recompute and store the scores of ``pks``; returns the number of rows written."""
+    config = config or get_config()
+    has_votes = MODELS.get(model._meta.label) is not None
+    written = 0
+    for batch in _batches(pks, config['BATCH_SIZE']):
+        days = {}
+        rows = (
+            DailyViewCount.objects.filter(item_type=rollup.item_type(model), object_id__in=batch)
+            .values('object_id', 'day').annotate(total=Sum('views')).values_list('object_id', 'day', 'total')
+        )
+        for pk, day, total in rows:
+            days.setdefault(pk, []).append((day, total))
+        fields = ('pk', 'helpful_count', 'not_helpful_count') if has_votes else ('pk',)
+        items = [
+            model(pk=row[0], trending_score=score(days.get(row[0], []), *row[1:], config=config))
+            for row in model._default_manager.filter(pk__in=batch).values_list(*fields)
+        ]
+        model._default_manager.bulk_update(items, ['trending_score'])
+        written += len(items)
+    return written
+
+
+def _advance(cursor, end, now, lag):
+    """Move ``cursor`` up to the highest id seen at least ``lag`` before ``now``; ``end`` is seen now."""
+    if not lag:
+        cursor.position = end
+    elif cursor.pending_at is None or now - cursor.pending_at >= lag:
+        cursor.position = max(cursor.position, cursor.pending)
+        cursor.pending, cursor.pending_at = end, now
+
+
+def update_trending(full=False):
+    """Rescore the items viewed or voted on since the last run (every item with ``full``).
+
+    Returns ``{model label: rows written}``.
+    """
+    config = get_config()
+    now = timezone.now()
+    cursors = {cursor.name: cursor for cursor in TrendingCursor.objects.all()}
+    tables = [DailyViewCount] + [apps.get_model(votes[0]) for votes in MODELS.values() if votes]
+    # Rows appended while this runs are picked up next time
+    ends = {
+        table._meta.label_lower: table._default_manager.aggregate(end=Max('pk'))['end'] or 0
+        for table in tables
+    }
+
+    def new_rows(table):
+        name = table._meta.label_lower
+        cursor = cursors.get(name)
+        return table._default_manager.filter(pk__gt=cursor.position if cursor else 0, pk__lte=ends[name])
+
+    written = {}
+    for label, votes in MODELS.items():
+        model = apps.get_model(label)
+        if full:
+            pks = set(model._default_manager.values_list('pk', flat=True))
+        else:
+            pks = set(
+                new_rows(DailyViewCount).filter(item_type=rollup.item_type(model))
+                .values_list('object_id', flat=True).distinct()
+            )
+            if votes:
+                vote_model, field = apps.get_model(votes[0]), votes[1]
+                pks |= set(new_rows(vote_model).values_list(f'{field}_id', flat=True).distinct())
+        written[label] = rescore(model, pks, config)
+
+    lag = datetime.timedelta(seconds=config['CURSOR_LAG_SECONDS'])
+    with transaction.atomic():
+        for name, end in ends.items():
+            cursor = cursors.get(name) or TrendingCursor(name=name)
+            _advance(cursor, end, now, lag)
+            cursor.save()
+    return written
@@ -0,0 +1,73 @@
+"""
+Client IP resolution behind reverse proxies.
+
+``X-Forwarded-For`` is only believed as far as it was written by proxies we
+run. Starting from ``REMOTE_ADDR``, hops are walked right to left while the
+current hop is in ``settings.TRUSTED_PROXIES``. The first untrusted hop is
+the client. With no trusted proxies configured the header is ignored, so a
+client cannot choose its own address by sending one.
+
+Behind a proxy that leaves every client with the proxy's address (one shared
+throttle bucket, one vote per site), so the first request that arrives with
+``X-Forwarded-For`` while ``TRUSTED_PROXIES`` is empty logs a warning.
+
+    TRUSTED_PROXIES = ['10.0.0.0/8', '127.0.0.1']  # addresses or CIDR ranges
+"""
+import functools
+import ipaddress
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_warned_untrusted_header = False
+
+
+@functools.lru_cache(maxsize=8)
+def _networks(proxies):
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False) for proxy in proxies if proxy.strip())
+
+
+def _parse(value):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def is_trusted_proxy(address):
+    networks = _networks(tuple(getattr(settings, 'TRUSTED_PROXIES', ())))
+    return address is not None and any(address in network for network in networks)
+
+
+def _warn_untrusted_header(remote):
+    global _warned_untrusted_header
+    if _warned_untrusted_header:
+        return
+    _warned_untrusted_header = True
+    logger.warning(
+        'Ignoring X-Forwarded-For from %s because TRUSTED_PROXIES is empty; if the app runs behind a '
+        'proxy, every client is seen as the proxy. Set TRUSTED_PROXIES to its address or subnet.',
+        remote,
+    )
+
+
+def get_client_ip(request):
+    """The address of the client that sent ``request``, as a string."""
+    remote = request.META.get('REMOTE_ADDR', '')
+    client = _parse(remote)
+    if not is_trusted_proxy(client):
+        if 'HTTP_X_FORWARDED_FOR' in request.META and not getattr(settings, 'TRUSTED_PROXIES', ()):
+            _warn_untrusted_header(remote)
+        return remote
+    hops = [hop for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    for hop in reversed(hops):
+        address = _parse(hop)
+        if address is None:
+            # Garbage in the header: the last proxy we trust is as far as we can see
+            break
+        client = address
+        if not is_trusted_proxy(address):
+            break
+    return str(client)
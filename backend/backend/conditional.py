@@ -0,0 +1,229 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for read-only API views.
+
+Detail validators come from the object's pk, ``updated_at`` and volatile
+columns (counters updated without ``save()``); list
+validators from one aggregate over the filtered queryset: ``COUNT(*)`` plus
+``MAX(updated_at)``. Both also mix in the response-cache generations of the
+view's ``cache_models``, so a change to a related model (a renamed category,
+a deleted row) produces a new ETag too. A request whose ``If-None-Match`` /
+``If-Modified-Since`` still matches gets a 304 before anything is serialized.
+
+Lists only get an ETag: deleting a row leaves ``MAX(updated_at)`` where it
+was, so a ``Last-Modified`` would answer ``If-Modified-Since`` with a stale
+304.
+
+Keyset pages and lists ordered by one indexed column (trending) are a single
+index scan, and an aggregate over every row would cost more than the page.
+Their ETag comes from the rows of the page instead (``rows_validators``): a
+matching request still reads the page but skips serialization.
+
+Class-based views use ``ConditionalGetMixin``; function views use the
+``conditional`` decorator with a function returning ``(etag, last_modified)``.
+"""
+import functools
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .response_cache import get_generations
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    # Weak: the same representation may be rendered as JSON or browsable HTML
+    return f'W/"{digest}"'
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def _has_field(model, name):
+    return any(field.name == name for field in model._meta.concrete_fields)
+
+
+def object_validators(obj, models=(), volatile_fields=()):
+    """``(etag, last_modified)`` for a single object.
+
+    Loaded ``volatile_fields`` go into the ETag. They change without touching
+    ``updated_at``, so such objects get no ``Last-Modified``.
+    """
+    updated_at = getattr(obj, 'updated_at', None)
+    deferred = obj.get_deferred_fields()
+    volatile = [getattr(obj, name) for name in volatile_fields if name not in deferred and hasattr(obj, name)]
+    etag = make_etag('object', obj._meta.label_lower, obj.pk, updated_at, *volatile, *get_generations(models))
+    return etag, None if volatile else _timestamp(updated_at)
+
+
+def _aggregate(queryset, volatile_fields=()):
+    model = queryset.model
+    aggregates = {'count': Count('pk')}
+    if _has_field(model, 'updated_at'):
+        aggregates['last'] = Max('updated_at')
+    for field in volatile_fields:
+        if _has_field(model, field):
+            aggregates[field] = Sum(field)
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def queryset_validators(*querysets, models=(), volatile_fields=(), _values=None):
+    """``(etag, None)`` for one or more querysets, one aggregate each.
+
+    ``volatile_fields`` are summed into the ETag; use it for columns that are
+    updated without ``save()`` (flushed view counters) when the list is
+    ordered or filtered by them.
+    """
+    parts = ['list']
+    for queryset in querysets:
+        values = _aggregate(queryset, volatile_fields)
+        if _values is not None:
+            _values.append(values)
+        parts += [queryset.model._meta.label_lower, *(values[key] for key in sorted(values))]
+    return make_etag(*parts, *get_generations(models)), None
+
+
+def rows_validators(rows, models=(), volatile_fields=(), extra=()):
+    """``(etag, None)`` for already loaded rows, without another query.
+
+    Each row contributes its pk, ``updated_at`` and ``volatile_fields`` when
+    they were loaded; ``extra`` adds page state such as the total count.
+    """
+    parts = ['rows', *extra]
+    for obj in rows:
+        deferred = obj.get_deferred_fields()
+        parts += [obj._meta.label_lower, obj.pk]
+        parts += [getattr(obj, name) for name in ('updated_at', *volatile_fields)
+                  if name not in deferred and hasattr(obj, name)]
+    return make_etag(*parts, *get_generations(models)), None
+
+
+def set_validators(response, etag, last_modified):
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response if the request's validators still match, else None."""
+    if request.method not in SAFE_METHODS:
+        return None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """Answer matching conditional GETs on ``retrieve`` and paginated ``list`` with 304.
+
+    Custom list actions call ``check_not_modified(queryset, ...)`` before
+    serializing, or ``check_rows_not_modified(rows)`` for a short ranked
+    list; views that override ``get_object`` call
+    ``check_object_not_modified(obj)``. ``conditional_volatile_fields`` is
+    passed through to the object and list validators.
+    """
+    conditional_volatile_fields = ()
+    # ?ordering= terms (aliases included) whose pages are validated from their own rows
+    conditional_row_orderings = ()
+
+    _validators = None
+    # COUNT(*) of the list queryset, reused by KeysetPagination instead of a second count
+    conditional_count = None
+
+    def get_cache_models(self):
+        return getattr(self, 'cache_models', ())
+
+    def get_object(self):
+        obj = super().get_object()
+        if getattr(self, 'action', None) in (None, 'retrieve'):
+            self.check_object_not_modified(obj)
+        return obj
+
+    def check_object_not_modified(self, obj):
+        if obj is not None:
+            self._check(*object_validators(obj, self.get_cache_models(), self.conditional_volatile_fields))
+
+    def uses_page_validators(self, queryset):
+        """Whether list validators come from the page's rows instead of a whole-queryset aggregate."""
+        is_keyset = getattr(self.paginator, 'is_keyset', None)
+        if is_keyset is not None and is_keyset(queryset, self.request):
+            return True
+        terms = self.request.query_params.get('ordering', '').split(',')
+        return any(term.strip().lstrip('-') in self.conditional_row_orderings for term in terms)
+
+    def paginate_queryset(self, queryset):
+        if self.paginator is not None and self.uses_page_validators(queryset):
+            page = super().paginate_queryset(queryset)
+            if page is not None:
+                self.check_rows_not_modified(page, extra=getattr(self.paginator, 'validator_parts', tuple)())
+            return page
+        values = []
+        self.check_not_modified(queryset, _values=values)
+        if values:
+            self.conditional_count = values[0]['count']
+        return super().paginate_queryset(queryset)
+
+    def check_not_modified(self, *querysets, _values=None):
+        if self.request.method not in SAFE_METHODS:
+            return
+        self._check(*queryset_validators(
+            *querysets, models=self.get_cache_models(),
+            volatile_fields=self.conditional_volatile_fields, _values=_values,
+        ))
+
+    def check_rows_not_modified(self, rows, extra=()):
+        if self.request.method not in SAFE_METHODS:
+            return
+        self._check(*rows_validators(
+            rows, models=self.get_cache_models(), volatile_fields=self.conditional_volatile_fields, extra=extra,
+        ))
+
+    def _check(self, etag, last_modified):
+        if self.request.method not in SAFE_METHODS:
+            return
+        self._validators = (etag, last_modified)
+        response = not_modified(self.request, etag, last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._validators and response.status_code == 200:
+            set_validators(response, *self._validators)
+        return response
+
+
+def conditional(get_validators):
+    """Decorator for function views; ``get_validators(request, *args, **kwargs)``
+    returns ``(etag, last_modified)``."""
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return view_func(request, *args, **kwargs)
+            etag, last_modified = get_validators(request, *args, **kwargs)
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code == 200:
+                    set_validators(response, etag, last_modified)
+            return response
+        return wrapped
+    return decorator
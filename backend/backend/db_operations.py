@@ -0,0 +1,40 @@
+from django.db.migrations.operations.base import Operation
+
+
+class PostgresOnly(Operation):
+    """Run a wrapped migration operation only on PostgreSQL.
+
+    The model state is always updated, so Postgres-specific indexes (GIN,
+    trigram) can be declared in ``Meta.indexes`` while local SQLite databases
+    still migrate cleanly without them.
+    """
+
+    reduces_to_sql = False
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def deconstruct(self):
+        return (self.__class__.__qualname__, [self.operation], {})
+
+    @property
+    def reversible(self):
+        return self.operation.reversible
+
+    def state_forwards(self, app_label, state):
+        self.operation.state_forwards(app_label, state)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.operation.database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.operation.database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f'{self.operation.describe()} (PostgreSQL only)'
+
+    @property
+    def migration_name_fragment(self):
+        return self.operation.migration_name_fragment
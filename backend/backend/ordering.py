@@ -0,0 +1,35 @@
+"""
+``?ordering=`` with public names for multi-column or renamed sort keys.
+
+A view lists the alias in ``ordering_fields`` and maps it in
+``ordering_aliases``:
+
+    ordering_fields = ['published_at', 'views', 'trending']
+    ordering_aliases = {'trending': ('-trending_score', '-id')}
+
+``?ordering=trending`` then sorts by the mapped fields, and ``-trending``
+reverses every one of them.
+"""
+from rest_framework import filters
+
+
+def _reverse(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class OrderingFilter(filters.OrderingFilter):
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        aliases = getattr(view, 'ordering_aliases', {})
+        if not ordering or not aliases:
+            return ordering
+        expanded = []
+        for term in ordering:
+            fields = aliases.get(term.lstrip('-'))
+            if fields is None:
+                expanded.append(term)
+            elif term.startswith('-'):
+                expanded += [_reverse(field) for field in fields]
+            else:
+                expanded += fields
+        return expanded
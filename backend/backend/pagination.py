@@ -0,0 +1,210 @@
+"""
+Opt-in keyset (cursor) pagination.
+
+``?pagination=cursor`` switches a list endpoint from page numbers to keyset
+paging over the queryset's ordering, with the primary key appended as a tie
+breaker, e.g. ``(-published_at, -id)`` for blog posts. Each page is a single
+range query: no ``COUNT(*)`` and no ``OFFSET``, and rows published while a
+client is paging cannot shift later pages. The ``next``/``previous`` links
+carry an opaque ``cursor`` parameter.
+
+Ordering fields must be non-null model fields (related paths such as
+``category__order`` are fine) or annotations.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework import pagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # Keep full microsecond precision; DjangoJSONEncoder rounds to milliseconds
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CountedPaginator(Paginator):
+    """Paginator that trusts a row count the caller already has."""
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.__dict__['count'] = count
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """Page numbers, reusing a row count the view already computed.
+
+    ``ConditionalGetMixin`` counts the filtered queryset for its ETag and
+    leaves the result on ``view.conditional_count``.
+    """
+    known_count = None
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountedPaginator(object_list, per_page, count=self.known_count)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.known_count = getattr(view, 'conditional_count', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def validator_parts(self):
+        """What besides its rows tells this page apart (see ``ConditionalGetMixin``)."""
+        return (self.page.paginator.count, self.page.number)
+
+
+class KeysetPagination(PageNumberPagination):
+    mode_query_param = 'pagination'
+    mode_value = 'cursor'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+
+    def is_keyset(self, queryset, request):
+        return self.get_ordering(queryset) is not None and (
+            request.query_params.get(self.mode_query_param) == self.mode_value
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(queryset)
+        self.keyset = self.is_keyset(queryset, request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.display_page_controls = False
+        self.page_size = self.get_page_size(request)
+        self.ordering = ordering
+        self.model = queryset.model
+
+        forward, values = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, forward))
+        order_by = [f'-{field}' if desc == forward else field for field, desc in ordering]
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        self.page_rows = rows
+        self.has_next = has_more if forward else values is not None
+        self.has_previous = values is not None if forward else has_more
+        return rows
+
+    def validator_parts(self):
+        if not self.keyset:
+            return super().validator_parts()
+        return (self.has_next, self.has_previous)
+
+    def get_ordering(self, queryset):
+        """Return the ordering as ``[(field, descending), ...]`` ending in the pk."""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            return None
+        result = []
+        for field in ordering:
+            desc = field.startswith('-')
+            name = field.lstrip('-')
+            if name in ('pk', 'id', queryset.model._meta.pk.name):
+                result.append(('pk', desc))
+                return result
+            result.append((name, desc))
+        result.append(('pk', result[0][1] if result else False))
+        return result
+
+    def keyset_filter(self, values, forward):
+        """Rows strictly after (or before) ``values`` in the keyset ordering."""
+        condition = Q()
+        equal = Q()
+        for (field, desc), value in zip(self.ordering, values):
+            lookup = 'lt' if desc == forward else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        # Leading-column bound so the planner can range-scan the first index column
+        first_field, first_desc = self.ordering[0]
+        bound = 'lte' if first_desc == forward else 'gte'
+        return Q(**{f'{first_field}__{bound}': values[0]}) & condition
+
+    def row_values(self, obj):
+        values = []
+        for field, _ in self.ordering:
+            value = obj
+            for part in field.split('__'):
+                value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def to_python(self, field, value):
+        model = self.model
+        target = None
+        try:
+            for part in field.split('__'):
+                target = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+                model = target.related_model
+        except (AttributeError, FieldDoesNotExist):
+            return value
+        if target.is_relation:
+            target = target.target_field
+        return target.to_python(value)
+
+    def encode_cursor(self, obj, forward):
+        payload = {'v': self.row_values(obj)}
+        if not forward:
+            payload['r'] = 1
+        data = json.dumps(payload, cls=CursorEncoder, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        url = replace_query_param(url, self.mode_query_param, self.mode_value)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return True, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            values = payload['v']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [self.to_python(field, value) for (field, _), value in zip(self.ordering, values)]
+            if None in values:  # ordering fields are non-null, and filters reject None
+                raise ValueError
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return not payload.get('r'), values
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page_rows:
+            return None
+        return self.encode_cursor(self.page_rows[-1], forward=True)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_rows:
+            return None
+        return self.encode_cursor(self.page_rows[0], forward=False)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
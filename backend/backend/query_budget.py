@@ -0,0 +1,100 @@
+"""
+Per-request SQL instrumentation and query budgets.
+
+``QueryBudgetMiddleware`` counts the queries a request runs and the time spent
+in the database. With ``EXPOSE`` on (the default under ``DEBUG``), it adds the
+numbers to the response as ``X-DB-Queries``, ``X-DB-Time`` (milliseconds) and a
+``Server-Timing`` entry, which browser dev tools show next to the request.
+
+Budgets are declared per URL name in ``settings.QUERY_BUDGET['BUDGETS']``:
+
+    QUERY_BUDGET = {
+        'EXPOSE': DEBUG,
+        'BUDGETS': {'insurance-company-list': 3, ...},
+    }
+
+A request over its budget is logged as a warning and, when exposed, flagged
+with ``X-DB-Budget: exceeded``. Tests assert budgets on seeded data with
+``backend.testing.QueryBudgetTestCase``.
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'EXPOSE': False,
+    'BUDGETS': {},
+}
+
+
+def get_config():
+    config = dict(DEFAULTS, EXPOSE=settings.DEBUG)
+    config.update(getattr(settings, 'QUERY_BUDGET', {}))
+    return config
+
+
+def get_budget(url_name):
+    return get_config()['BUDGETS'].get(url_name)
+
+
+class QueryCounter:
+    """Count queries and DB time on every connection while active; the SQL itself is not kept."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        # Wrapping doesn't open a connection; ones opened later are covered too
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        config = get_config()
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.url_name if match else None
+        budget = config['BUDGETS'].get(url_name)
+        exceeded = budget is not None and counter.count > budget
+        if exceeded:
+            logger.warning(
+                'Query budget exceeded for %s (%s): %d queries, budget %d',
+                url_name, request.path, counter.count, budget,
+            )
+        if config['EXPOSE']:
+            response['X-DB-Queries'] = str(counter.count)
+            response['X-DB-Time'] = str(counter.duration_ms)
+            response['Server-Timing'] = f'db;dur={counter.duration_ms};desc="{counter.count} queries"'
+            if exceeded:
+                response['X-DB-Budget'] = 'exceeded'
+        return response
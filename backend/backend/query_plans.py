@@ -0,0 +1,177 @@
+"""
+EXPLAIN checks for the published-content hot paths.
+
+Each check builds a queryset shaped like one a public endpoint runs (first
+page, the endpoint's filters and ordering) and names the index the planner is
+expected to pick for it. ``check_plans()`` EXPLAINs them on the current
+database and flags the ones that scan the model's table sequentially or use
+another index, which is how a missing or unusable index shows up once tables
+grow:
+
+    python manage.py generate_dataset --posts 100000 --blog-feedback 1000000
+    python manage.py check_query_plans
+
+Plans depend on table size and statistics, so checks on tables smaller than
+``min_rows`` are skipped rather than failed, and the command runs ``ANALYZE``
+first. On SQLite the planner picks a usable index regardless of size, so the
+test suite runs the same checks on its seeded data.
+"""
+import re
+from typing import Callable, NamedTuple
+
+from django.db import connection
+from django.db.models import Count
+
+PAGE_SIZE = 10
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    build: Callable  # () -> QuerySet, or None when the data has nothing to filter on
+    indexes: tuple  # any of these; empty accepts any index on the model's table
+
+
+class PlanResult(NamedTuple):
+    name: str
+    status: str  # 'ok', 'failed' or 'skipped'
+    rows: int
+    plan: str
+    detail: str = ''
+
+
+def _blog_posts():
+    from blog.models import BlogPost
+    return BlogPost.objects.filter(is_published=True)
+
+
+def _busiest(queryset, field):
+    """The ``field`` value with the most rows in ``queryset``, e.g. the largest category."""
+    row = queryset.order_by().values(field).annotate(total=Count('pk')).order_by('-total').first()
+    return row[field] if row else None
+
+
+def _post_category():
+    category_id = _busiest(_blog_posts(), 'category')
+    if category_id is None:
+        return None
+    from blog.models import Category
+    slug = Category.objects.filter(pk=category_id).values_list('slug', flat=True).first()
+    return _blog_posts().filter(category__slug=slug).order_by('-published_at')[:PAGE_SIZE]
+
+
+def _post_parent_category():
+    parent_id = _busiest(_blog_posts().filter(category__parent__isnull=False), 'category__parent')
+    if parent_id is None:
+        return None
+    from blog.models import Category
+    path = Category.objects.filter(pk=parent_id).values_list('path', flat=True).first()
+    return (
+        _blog_posts().filter(category_path__startswith=path).exclude(category_path=path)
+        .order_by('-published_at')[:PAGE_SIZE]
+    )
+
+
+def _faqs():
+    from faq.models import FAQ
+    return FAQ.objects.filter(is_published=True)
+
+
+def _faq_category():
+    category_id = _busiest(_faqs(), 'category')
+    if category_id is None:
+        return None
+    return _faqs().filter(category_id=category_id).order_by('category_order', 'order', '-created_at')[:PAGE_SIZE]
+
+
+def _reviews():
+    from company.models import CompanyReview
+    return CompanyReview.objects.filter(is_published=True)
+
+
+def _company_reviews():
+    company_id = _busiest(_reviews(), 'company')
+    if company_id is None:
+        return None
+    from company.models import InsuranceCompany
+    slug = InsuranceCompany.objects.filter(pk=company_id).values_list('slug', flat=True).first()
+    return _reviews().filter(company__slug=slug).order_by('-published_at')[:PAGE_SIZE]
+
+
+def _insurers():
+    from company.models import InsuranceCompany
+    return InsuranceCompany.objects.filter(is_active=True).order_by('order', 'name')[:PAGE_SIZE]
+
+
+PLAN_CHECKS = [
+    PlanCheck('blog-list', lambda: _blog_posts().order_by('-published_at')[:PAGE_SIZE], ('blogpost_published_idx',)),
+    PlanCheck('blog-list-cursor', lambda: _blog_posts().order_by('-published_at', '-id')[:PAGE_SIZE + 1],
+              ('blogpost_published_idx',)),
+    PlanCheck('blog-list-trending',
+              lambda: _blog_posts().order_by('-trending_score', '-views', '-helpful_count', '-id')[:PAGE_SIZE],
+              ('blogpost_trending_idx',)),
+    PlanCheck('blog-list-category', _post_category, ('blogpost_category_pub_idx',)),
+    # Below a parent: a prefix range on the path, or a walk of the published index when the parent is large
+    PlanCheck('blog-list-parent', _post_parent_category, ('blogpost_category_path_idx', 'blogpost_published_idx')),
+    PlanCheck('faq-list', lambda: _faqs().order_by('category_order', 'order', '-created_at')[:PAGE_SIZE],
+              ('faq_published_order_idx',)),
+    PlanCheck('faq-category', _faq_category, ('faq_category_published_idx',)),
+    PlanCheck('faq-recent', lambda: _faqs().order_by('-created_at')[:5], ('faq_recent_idx',)),
+    PlanCheck('faq-popular', lambda: _faqs().order_by('-trending_score', '-views', '-helpful_count', '-id')[:10],
+              ('faq_trending_idx',)),
+    PlanCheck('review-list', lambda: _reviews().order_by('-published_at')[:PAGE_SIZE], ('review_published_idx',)),
+    PlanCheck('review-popular', lambda: _reviews().order_by('-trending_score', '-id')[:PAGE_SIZE],
+              ('review_trending_idx',)),
+    PlanCheck('review-company', _company_reviews, ('review_company_published_idx',)),
+    PlanCheck('insurer-list', _insurers, ('insurer_active_order_idx',)),
+]
+
+
+def explain(queryset):
+    return queryset.explain()
+
+
+def uses_index(plan, index_names):
+    return any(re.search(rf'\b{re.escape(name)}\b', plan) for name in index_names)
+
+
+def sequential_scans(plan):
+    """Tables the plan reads in full: ``Seq Scan on t`` (PostgreSQL), ``SCAN t`` without an index (SQLite)."""
+    tables = re.findall(r'Seq Scan on (\w+)', plan)
+    tables += [
+        match.group(1) for match in re.finditer(r'\bSCAN (\w+)(.*)', plan)
+        if 'USING' not in match.group(2)
+    ]
+    return tables
+
+
+def analyze(models):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for model in models:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        else:
+            cursor.execute('ANALYZE')
+
+
+def check_plans(checks=None, min_rows=1000, only=None):
+    """EXPLAIN each check; return a ``PlanResult`` per check."""
+    results = []
+    for check in checks or PLAN_CHECKS:
+        if only and check.name not in only:
+            continue
+        queryset = check.build()
+        if queryset is None:
+            results.append(PlanResult(check.name, 'skipped', 0, '', 'no matching rows'))
+            continue
+        table = queryset.model._meta.db_table
+        rows = queryset.model._default_manager.count()
+        plan = explain(queryset)
+        if rows < min_rows:
+            results.append(PlanResult(check.name, 'skipped', rows, plan, f'{rows} rows < {min_rows}'))
+        elif table in sequential_scans(plan):
+            results.append(PlanResult(check.name, 'failed', rows, plan, f'sequential scan on {table}'))
+        elif check.indexes and not uses_index(plan, check.indexes):
+            results.append(PlanResult(check.name, 'failed', rows, plan, f'expected {" or ".join(check.indexes)}'))
+        else:
+            results.append(PlanResult(check.name, 'ok', rows, plan))
+    return results
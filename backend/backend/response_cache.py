@@ -0,0 +1,198 @@
+"""
+Server-side cache for read-only API responses.
+
+A cached entry is keyed by the normalized request URL (scheme, host, path and
+sorted query parameters), the negotiated format and the current *generation*
+of every model the view reads. Saving or deleting a watched model bumps its
+generation, so stale entries are never read again and simply expire.
+
+Views opt in with ``CachedResponseMixin`` (class-based) or the
+``cache_response`` decorator (function views) and list the models they depend
+on. Apps register their models with ``watch()`` from their signals module.
+
+Only anonymous JSON requests are cached: a request with a logged-in user or
+an ``Authorization`` header, or one asking for the browsable API, always goes
+to the view, so per-user pages (usernames, CSRF tokens) are never shared and
+authentication and permissions still run.
+
+Settings (``RESPONSE_CACHE``): ``ENABLED``, ``TIMEOUT`` (seconds) and
+``ALIAS`` (which entry of ``CACHES`` to use; locmem, file or Redis).
+"""
+import functools
+import hashlib
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TIMEOUT': 600,
+    'ALIAS': 'default',
+    'KEY_PREFIX': 'respcache',
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def _label(model):
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    return model._meta.concrete_model._meta.label_lower
+
+
+def _generation_key(label):
+    return f"{get_config()['KEY_PREFIX']}:gen:{label}"
+
+
+def get_generations(models):
+    labels = sorted({_label(model) for model in models})
+    cache = get_cache()
+    keys = [_generation_key(label) for label in labels]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in found:
+            # A fresh timestamp never matches a generation used before eviction
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        generations.append(str(found[key]))
+    return generations
+
+
+def bump_generation(model):
+    cache = get_cache()
+    key = _generation_key(_label(model))
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def _invalidate(sender, **kwargs):
+    bump_generation(sender)
+
+
+def watch(*models):
+    """Bump a model's generation whenever it (or one of its proxies) is saved or deleted."""
+    concrete = {model._meta.concrete_model for model in models}
+    for sender in apps.get_models():
+        if sender._meta.concrete_model in concrete:
+            uid = f'response-cache:{sender._meta.label_lower}'
+            post_save.connect(_invalidate, sender=sender, dispatch_uid=uid)
+            post_delete.connect(_invalidate, sender=sender, dispatch_uid=uid)
+
+
+def _format(request):
+    # Browsers get the browsable API, everyone else JSON
+    return request.GET.get('format') or ('html' if 'text/html' in request.headers.get('Accept', '') else 'json')
+
+
+def is_cacheable(request):
+    """Anonymous GET for JSON; anything else may differ per user or renderer."""
+    user = getattr(request, 'user', None)
+    return (
+        request.method == 'GET'
+        and _format(request) == 'json'
+        and 'Authorization' not in request.headers
+        and not (user is not None and user.is_authenticated)
+    )
+
+
+def cache_key(request, models):
+    params = sorted((key, request.GET.getlist(key)) for key in request.GET)
+    query = '&'.join(f'{key}={value}' for key, values in params for value in values)
+    parts = [request.scheme, request.get_host(), request.path, query, _format(request), *get_generations(models)]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f"{get_config()['KEY_PREFIX']}:{digest}"
+
+
+def serve_cached(request, models, get_response, on_hit=None):
+    """Return a cached copy of ``get_response()`` for anonymous JSON GET requests."""
+    config = get_config()
+    if not config['ENABLED'] or not is_cacheable(request):
+        response = get_response()
+        return response[0] if isinstance(response, tuple) else response
+
+    cache = get_cache()
+    key = cache_key(request, models)
+    entry = cache.get(key)
+    if entry is not None:
+        if on_hit is not None:
+            on_hit(entry.get('meta'))
+        response = HttpResponse(entry['content'], status=entry['status'])
+        for header, value in entry['headers']:
+            response[header] = value
+        response['X-Response-Cache'] = 'HIT'
+        # Revalidations against a cached entry still get their 304
+        last_modified = response.get('Last-Modified')
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+            response=response,
+        ) or response
+
+    response, meta = get_response(), None
+    if isinstance(response, tuple):
+        response, meta = response
+    if response.status_code != 200 or getattr(response, 'streaming', False) or getattr(response, 'skip_response_cache', False):
+        return response
+
+    def store(rendered):
+        cache.set(key, {
+            'content': rendered.content,
+            'status': rendered.status_code,
+            'headers': list(rendered.items()),
+            'meta': meta,
+        }, config['TIMEOUT'])
+
+    if hasattr(response, 'add_post_render_callback'):
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+    response['X-Response-Cache'] = 'MISS'
+    return response
+
+
+class CachedResponseMixin:
+    """Cache GET responses of a DRF view until one of ``cache_models`` changes.
+
+    A view may set ``response.skip_response_cache = True`` to keep a response
+    out of the cache, and stash ``self.response_cache_meta`` to have it handed
+    back to ``response_cache_hit()`` when the entry is served.
+    """
+    cache_models = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        def get_response():
+            response = super(CachedResponseMixin, self).dispatch(request, *args, **kwargs)
+            return response, getattr(self, 'response_cache_meta', None)
+
+        return serve_cached(request, self.cache_models, get_response, on_hit=self.response_cache_hit)
+
+    def response_cache_hit(self, meta):
+        pass
+
+
+def cache_response(*models):
+    """Decorator form of ``CachedResponseMixin`` for function views."""
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            return serve_cached(request, models, lambda: view_func(request, *args, **kwargs))
+        return wrapped
+    return decorator
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from urllib.parse import urlparse, parse_qsl
 
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # search lookups (trigram, full text)
     'rest_framework',
     'corsheaders',
     'ckeditor',            # django-ckeditor
@@ -54,11 +56,14 @@ INSTALLED_APPS = [
     "faq",         # FAQ app
     "company",     # company app
     "pages",       # static pages app
+    "analytics",   # view counters
+    "related",     # related posts and FAQs
 
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # must be high
+    'backend.query_budget.QueryBudgetMiddleware',  # SQL count/time per request
     'django.middleware.security.SecurityMiddleware',
     'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,19 +106,61 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 
-# Database (Neon Postgres via DATABASE_URL)
-tmpPostgres = urlparse(os.getenv("DATABASE_URL"))
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': tmpPostgres.path.replace('/', ''),
-        'USER': tmpPostgres.username,
-        'PASSWORD': tmpPostgres.password,
-        'HOST': tmpPostgres.hostname,
-        'PORT': tmpPostgres.port or 5432,
-        'OPTIONS': dict(parse_qsl(tmpPostgres.query)),
+# Database (Neon Postgres via DATABASE_URL; local SQLite when it is unset and USE_SQLITE is on)
+if os.getenv("DATABASE_URL") or not USE_SQLITE:
+    tmpPostgres = urlparse(os.getenv("DATABASE_URL"))
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': tmpPostgres.path.replace('/', ''),
+            'USER': tmpPostgres.username,
+            'PASSWORD': tmpPostgres.password,
+            'HOST': tmpPostgres.hostname,
+            'PORT': tmpPostgres.port or 5432,
+            'OPTIONS': dict(parse_qsl(tmpPostgres.query)),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        }
     }
+
+
+# Cache (locmem by default; 'file' or 'redis' to share it between processes)
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+# Invalidation (response-cache generations, site shell, category catalogs) only reaches the
+# process that saved the model, so several workers must share one cache
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', cast=int, default=1)  # gunicorn's worker count
+if CACHE_BACKEND == 'locmem' and WEB_CONCURRENCY > 1 and not DEBUG:
+    raise ImproperlyConfigured("WEB_CONCURRENCY > 1 needs a shared cache: set CACHE_BACKEND to 'file' or 'redis'")
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'insurance',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(BASE_DIR, '.cache')),
+    },
+    # Any Redis-compatible server (Redis, Valkey, KeyDB); needs the redis package
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# Server-side cache for read-only API responses (see backend/response_cache.py)
+RESPONSE_CACHE = {
+    # Off by default on a per-process cache in production, where workers would serve each other's stale lists
+    'ENABLED': config('RESPONSE_CACHE_ENABLED', cast=bool, default=DEBUG or CACHE_BACKEND != 'locmem'),
+    'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', cast=int, default=600),  # seconds
 }
 
 
@@ -165,14 +212,108 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
 # Django REST Framework config (pagination)
+# Test runner without the background view-counter flusher (see backend/testing.py)
+TEST_RUNNER = 'backend.testing.TestRunner'
+
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,   # you can change
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
 }
 
+# Per-request SQL instrumentation and query budgets per URL name (see backend/query_budget.py).
+# Budgets are for a cold request (response cache off) and checked by the app tests.
+QUERY_BUDGET = {
+    'EXPOSE': config('QUERY_BUDGET_EXPOSE', cast=bool, default=DEBUG),  # X-DB-Queries / Server-Timing headers
+    'BUDGETS': {
+        'post-list': 3,  # + the category index on a cold cache (parent filters)
+        'post-detail': 3,
+        'category-list': 2,
+        'category-tree': 1,
+        'blog-posts-by-category': 2,
+        'states-list': 3,
+        'faq-list': 3,
+        'faq-detail': 3,
+        'faq-popular': 2,
+        'faq-featured': 2,
+        'faq-recent': 2,
+        'faq-category-list': 2,
+        'faq-category-faqs': 3,
+        'faq-search': 2,
+        'recent-content': 4,
+        'insurance-company-list': 3,
+        'insurance-company-detail': 2,
+        'company-review-by-company': 2,
+        'company-review-detail': 1,
+        'company-review-popular': 2,
+        'all-static-pages': 2,
+        'navbar-pages': 2,
+        'footer-pages': 2,
+        'static-page-detail': 1,
+        'team-members': 2,
+        'company-info': 1,
+        'site-shell': 6,
+        'car-insurance-quotes': 1,
+    },
+}
+
+# Buffered view counting (see analytics/buffer.py)
+VIEW_COUNTER = {
+    'BACKEND': config('VIEW_COUNTER_BACKEND', default='memory'),  # 'memory' or 'cache'
+    # Seconds; backend.testing.TestRunner sets 0 (other test runners: VIEW_COUNTER_FLUSH_INTERVAL=0)
+    'FLUSH_INTERVAL': config('VIEW_COUNTER_FLUSH_INTERVAL', cast=int, default=30),
+    'MODELS': ['blog.BlogPost', 'faq.FAQ'],
+    'ROLLUP_MODELS': ['company.CompanyReview', 'pages.StaticPage'],  # daily rollups only, no views column
+}
+
+# Per-day view rollups fed by the flushes above (see analytics/rollup.py);
+# compact nightly with `manage.py compact_view_counts`
+VIEW_ROLLUPS = {
+    'ENABLED': config('VIEW_ROLLUPS_ENABLED', cast=bool, default=True),
+    'RETENTION_DAYS': config('VIEW_ROLLUPS_RETENTION_DAYS', cast=int, default=400),
+}
+# Trending scores from decayed daily views and helpful votes (see analytics/trending.py);
+# refresh every few minutes with `manage.py update_trending`
+TRENDING = {
+    'HALF_LIFE_DAYS': config('TRENDING_HALF_LIFE_DAYS', cast=float, default=7),
+    'CURSOR_LAG_SECONDS': config('TRENDING_CURSOR_LAG_SECONDS', cast=int, default=300),
+}
+
+# Related posts and FAQs on detail pages (see related/builder.py): rebuild nightly with
+# `manage.py build_related --full`, apply saves every few minutes with `manage.py build_related`
+RELATED_CONTENT = {
+    'TOP_K': config('RELATED_TOP_K', cast=int, default=5),
+    'INDEX_PATH': config('RELATED_INDEX_PATH', default=os.path.join(BASE_DIR, 'related-index.npz')),
+}
+
+# Proxies whose X-Forwarded-For is believed when resolving client IPs (see backend/client_ip.py);
+# addresses or CIDR ranges, e.g. the load balancer's subnet
+TRUSTED_PROXIES = config('TRUSTED_PROXIES', cast=Csv(), default='')
+
+# Per-IP token buckets on the public write endpoints (see backend/throttling.py)
+RATE_LIMITS = {
+    'ENABLED': config('RATE_LIMITS_ENABLED', cast=bool, default=True),
+    'SCOPES': {
+        'feedback': {'rate': config('RATE_LIMIT_FEEDBACK', default='60/hour'), 'burst': 10},
+        'contact': {'rate': config('RATE_LIMIT_CONTACT', default='5/hour'), 'burst': 3},
+        'view': {'rate': config('RATE_LIMIT_VIEW', default='120/min'), 'burst': 30},
+    },
+}
+
+# Helpful/not-helpful votes (see analytics/feedback.py); repeat votes are turned
+# away from the cache for this long before reaching the database
+FEEDBACK = {
+    'DEDUP_TIMEOUT': config('FEEDBACK_DEDUP_TIMEOUT', cast=int, default=24 * 60 * 60),  # seconds
+}
+
+# Cacheable FAQ detail responses; off, they skip the response cache and show the buffered views too
+FAQ_DEFERRED_VIEWS = config('FAQ_DEFERRED_VIEWS', cast=bool, default=True)
+
+# Reviews embedded per insurer in /api/company/insurers/?include=reviews
+COMPANY_REVIEWS_PER_INSURER = config('COMPANY_REVIEWS_PER_INSURER', cast=int, default=3)
+
 # CKEditor settings (simple)
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_CONFIGS = {
@@ -0,0 +1,108 @@
+"""
+Test helpers: the test runner, a small seeded dataset and query-budget assertions.
+
+``TestRunner`` (``settings.TEST_RUNNER``) runs the suite with the view
+counter's background flusher off: tests flush explicitly, and a flusher
+thread or its flush at exit would outlive the test database. Other runners
+get the same with ``VIEW_COUNTER_FLUSH_INTERVAL=0`` in the environment.
+
+``QueryBudgetTestCase.assertQueryBudget()`` requests a named URL with the
+response cache off and fails, listing the captured SQL, when the request runs
+more queries than ``settings.QUERY_BUDGET['BUDGETS']`` allows for that URL
+name. The seeded data has several rows per relation, so an N+1 shows up as a
+count above the budget.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from .query_budget import get_budget
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._no_flusher = override_settings(VIEW_COUNTER={**settings.VIEW_COUNTER, 'FLUSH_INTERVAL': 0})
+        self._no_flusher.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._no_flusher.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+def seed_dataset(size=4):
+    """Create ``size`` rows per relation across blog, FAQ, company and pages."""
+    from blog.models import BlogPost, Category
+    from company.models import CompanyReview, InsuranceCompany
+    from faq.models import FAQ, FAQCategory
+    from pages.models import CarInsuranceQuotesPage, CompanyInfo, TeamMember
+
+    author = get_user_model().objects.create(username='seed-editor')
+    states = Category.objects.create(name='States', type='main')
+    for i in range(size):
+        category = Category.objects.create(name=f'State {i}', type='sub', parent=states)
+        for j in range(size):
+            BlogPost.objects.create(
+                title=f'Post {i}-{j}', slug=f'post-{i}-{j}', author=author, category=category,
+                summary='Summary', content='<p>Body</p>' * 50,
+            )
+
+    for i in range(size):
+        faq_category = FAQCategory.objects.create(name=f'FAQ category {i}', order=i)
+        for j in range(size):
+            FAQ.objects.create(
+                category=faq_category, question=f'Question {i}-{j}?', answer='<p>Answer</p>',
+                is_featured=j == 0, order=j,
+            )
+
+    for i in range(size):
+        company = InsuranceCompany.objects.create(name=f'Insurer {i}', slug=f'insurer-{i}', order=i)
+        for j in range(size):
+            CompanyReview.objects.create(
+                company=company, title=f'Review {i}-{j}', slug=f'review-{i}-{j}', content='Review', rating=4,
+            )
+
+    for i in range(size):
+        TeamMember.objects.create(name=f'Member {i}', position='Editor', bio='Bio', order=i)
+    CompanyInfo.objects.create(
+        description='Insurance comparison', address='1 Main St', phone='555-0100',
+        email='info@example.com', website='https://example.com', business_hours='9-5',
+    )
+    CarInsuranceQuotesPage.objects.create(title='Car Insurance Quotes')
+    call_command('seed_static_pages', stdout=StringIO())
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class QueryBudgetTestCase(TestCase):
+    """Seeds ``seed_dataset()`` once per class; override ``setUpTestData`` to change it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset()
+
+    def setUp(self):
+        # Budgets are for a cold request: no cached catalogs or site shell
+        for cache in caches.all():
+            cache.clear()
+
+    def assertQueryBudget(self, url_name, args=None, kwargs=None, query=''):
+        budget = get_budget(url_name)
+        if budget is None:
+            self.fail(f'No query budget declared for {url_name!r} in QUERY_BUDGET["BUDGETS"]')
+        url = reverse(url_name, args=args, kwargs=kwargs)
+        self.assertEqual(resolve(url).url_name, url_name)
+        with CaptureQueriesContext(connections['default']) as captured:
+            response = self.client.get(f'{url}?{query}' if query else url)
+        self.assertEqual(response.status_code, 200, f'GET {url} returned {response.status_code}')
+        if len(captured) > budget:
+            queries = '\n'.join(f'{n}. {q["sql"]}' for n, q in enumerate(captured.captured_queries, 1))
+            self.fail(f'{url_name} ran {len(captured)} queries, budget is {budget}:\n{queries}')
+        return response
@@ -0,0 +1,103 @@
+"""
+Per-IP token-bucket throttling for the public write endpoints.
+
+Each (scope, client IP) pair owns a bucket of ``burst`` tokens that refills at
+``rate``. A request spends one token and is answered with 429 and a
+``Retry-After`` when none is left. A bucket is two numbers in the cache
+(tokens, last refill), so memory per key stays constant whatever the rate,
+unlike DRF's rate throttles, which store a timestamp per request. Idle
+buckets expire once they would be full again.
+
+Limits are configured per scope in ``settings.RATE_LIMITS``:
+
+    RATE_LIMITS = {
+        'ENABLED': True,
+        'CACHE_ALIAS': 'default',
+        'SCOPES': {
+            'feedback': {'rate': '30/hour', 'burst': 10},
+            ...
+        },
+    }
+
+Clients are identified with ``backend.client_ip.get_client_ip``. The read,
+update and write of a bucket are not atomic. Concurrent requests from one
+address can each spend the same token, which is acceptable for damping abuse.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .client_ip import get_client_ip
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'throttle',
+    'SCOPES': {},
+}
+
+PERIODS = {
+    's': 1, 'sec': 1, 'second': 1,
+    'm': 60, 'min': 60, 'minute': 60,
+    'h': 3600, 'hour': 3600,
+    'd': 86400, 'day': 86400,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RATE_LIMITS', {}))
+    return config
+
+
+def parse_rate(rate):
+    """``'30/hour'`` -> tokens per second."""
+    count, _, period = rate.partition('/')
+    return int(count) / PERIODS[period.strip().lower()]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        config = get_config()
+        limit = config['SCOPES'].get(self.scope)
+        if not config['ENABLED'] or limit is None:
+            return True
+
+        rate = parse_rate(limit['rate'])
+        burst = limit.get('burst', 1)
+        cache = caches[config['CACHE_ALIAS']]
+        key = f"{config['KEY_PREFIX']}:{self.scope}:{get_client_ip(request)}"
+
+        now = time.time()
+        tokens, last = cache.get(key) or (burst, now)
+        tokens = min(burst, tokens + (now - last) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_seconds = (1 - tokens) / rate
+        cache.set(key, (tokens, now), math.ceil((burst - tokens) / rate) + 1)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class FeedbackThrottle(TokenBucketThrottle):
+    scope = 'feedback'
+
+
+class ContactThrottle(TokenBucketThrottle):
+    scope = 'contact'
+
+
+class ViewCountThrottle(TokenBucketThrottle):
+    scope = 'view'
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+"""
+In-process endpoint benchmarks.
+
+Boots the Django app in this process, points it at a benchmark database
+(a SQLite file by default, or a local Postgres with ``--database-url``),
+generates a dataset there if needed and drives every public read endpoint
+through the full middleware stack with Django's test client.
+
+Per endpoint it reports latency percentiles (p50/p95/p99), requests per
+second, SQL queries per request and the peak memory allocated while
+serving one request, and writes everything to JSON:
+
+    python benchmarks/endpoints.py --scale small --output before.json
+    python benchmarks/endpoints.py --scale small --output after.json --compare before.json
+
+The response cache is off unless ``--response-cache`` is given, so the
+numbers measure the database and serialization work.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlparse
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCALES = {
+    'tiny': {'posts': 200, 'blog_feedback': 2000, 'faqs': 100, 'faq_feedback': 1000, 'insurers': 20, 'reviews': 200},
+    'small': {'posts': 2000, 'blog_feedback': 20000, 'faqs': 1000, 'faq_feedback': 10000, 'insurers': 100, 'reviews': 2000},
+    'medium': {'posts': 20000, 'blog_feedback': 200000, 'faqs': 5000, 'faq_feedback': 50000, 'insurers': 200, 'reviews': 5000},
+    'large': {'posts': 100000, 'blog_feedback': 1000000, 'faqs': 10000, 'faq_feedback': 100000, 'insurers': 500, 'reviews': 20000},
+}
+PREFIX = 'bench'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small', help='Dataset size to generate')
+    parser.add_argument('--sqlite', help='SQLite file to use (default: a per-scale file in the temp directory)')
+    parser.add_argument('--database-url', help='Benchmark against this Postgres instead of SQLite')
+    parser.add_argument('--generate', action='store_true', help='(Re)generate the dataset even if it exists')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint')
+    parser.add_argument('--only', nargs='*', help='Run only these endpoint names')
+    parser.add_argument('--response-cache', action='store_true', help='Keep the server-side response cache on')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Print the change against an earlier JSON result')
+    return parser.parse_args(argv)
+
+
+def setup_django(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    from django.conf import settings
+
+    # Replace the database before anything connects (.env may point at a remote one)
+    if args.database_url:
+        url = urlparse(args.database_url)
+        settings.DATABASES = {'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': url.path.lstrip('/'),
+            'USER': url.username,
+            'PASSWORD': url.password,
+            'HOST': url.hostname or dict(parse_qsl(url.query)).get('host', ''),
+            'PORT': url.port or 5432,
+        }}
+    else:
+        path = args.sqlite or os.path.join(os.environ.get('TMPDIR', '/tmp'), f'insurance-bench-{args.scale}.sqlite3')
+        settings.DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}}
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    settings.RESPONSE_CACHE = dict(getattr(settings, 'RESPONSE_CACHE', {}), ENABLED=args.response_cache)
+    settings.VIEW_COUNTER = dict(getattr(settings, 'VIEW_COUNTER', {}), FLUSH_INTERVAL=0)
+
+    import django
+    django.setup()
+
+
+def prepare_dataset(args):
+    from io import StringIO
+
+    from django.core.management import call_command
+    from blog.models import BlogPost
+    from pages.models import CarInsuranceQuotesPage, StaticPage
+
+    call_command('migrate', verbosity=0)
+    if args.generate or not BlogPost.objects.filter(slug__startswith=f'{PREFIX}-').exists():
+        print(f'Generating {args.scale} dataset...', file=sys.stderr)
+        call_command(
+            'generate_dataset', prefix=PREFIX, seed=args.seed, flush=True, stdout=StringIO(), **SCALES[args.scale],
+        )
+    if not StaticPage.objects.exists():
+        call_command('seed_static_pages', stdout=StringIO())
+    if not CarInsuranceQuotesPage.objects.exists():
+        CarInsuranceQuotesPage.objects.create(title='Car Insurance Quotes')
+
+
+def endpoints(rng):
+    """``{name: [url, ...]}``; detail endpoints rotate over a sample of rows."""
+    from django.conf import settings
+    from blog.models import BlogPost
+    from company.models import InsuranceCompany
+    from faq.models import FAQ
+    from pages.models import StaticPage
+
+    def sample(queryset, size=50):
+        values = list(queryset.order_by('pk').values_list('slug', flat=True)[:2000])
+        return rng.sample(values, min(size, len(values)))
+
+    posts = sample(BlogPost.objects.filter(is_published=True))
+    faqs = sample(FAQ.objects.filter(is_published=True))
+    insurers = sample(InsuranceCompany.objects.filter(is_active=True))
+    pages = list(StaticPage.objects.filter(is_active=True).values_list('page_type', flat=True))
+    # Halfway through the post list: OFFSET cost grows with the dataset
+    middle_page = max(1, BlogPost.objects.filter(is_published=True).count() // settings.REST_FRAMEWORK['PAGE_SIZE'] // 2)
+    return {
+        'blog-list': ['/api/blog/posts/'],
+        'blog-list-deep-page': [f'/api/blog/posts/?page={middle_page}'],
+        'blog-list-cursor': ['/api/blog/posts/?pagination=cursor'],
+        'blog-list-category': [f'/api/blog/posts/?category__parent={PREFIX}-states'],
+        'blog-detail': [f'/api/blog/posts/{slug}/' for slug in posts],
+        'blog-search': ['/api/blog/posts/?search=deductible%20discount', '/api/blog/posts/?search=teen%20driver'],
+        'blog-categories': ['/api/blog/categories/'],
+        'blog-category-tree': ['/api/blog/categories/tree/'],
+        'faq-list': ['/api/faq/api/faqs/'],
+        'faq-detail': [f'/api/faq/api/faqs/{slug}/' for slug in faqs],
+        'faq-search': ['/api/faq/api/search/?q=premium%20claim', '/api/faq/api/search/?q=uninsured'],
+        'faq-popular': ['/api/faq/api/faqs/popular/'],
+        'faq-categories': ['/api/faq/api/categories/'],
+        'insurers': ['/api/company/insurers/'],
+        'insurer-detail': [f'/api/company/insurers/{slug}/' for slug in insurers],
+        'static-pages': ['/api/pages/'],
+        'static-page-detail': [f'/api/pages/{page_type}/' for page_type in pages],
+        'nav': ['/api/pages/nav/'],
+        'footer': ['/api/pages/footer/'],
+        'site-shell': ['/api/site-shell/'],
+        'car-insurance-quotes': ['/api/car-insurance-quotes/'],
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = (len(sorted_values) - 1) * pct / 100
+    low = int(index)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (index - low)
+
+
+def run_endpoint(client, urls, requests, warmup):
+    from backend.query_budget import QueryCounter
+
+    for i in range(warmup):
+        client.get(urls[i % len(urls)])
+
+    latencies, queries, errors, statuses = [], [], 0, {}
+    started = time.perf_counter()
+    for i in range(requests):
+        url = urls[i % len(urls)]
+        with QueryCounter() as counter:
+            t0 = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append(counter.count)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        errors += response.status_code >= 400
+    wall = time.perf_counter() - started
+
+    # Separate pass: tracemalloc slows every allocation, so it stays out of the timings
+    tracemalloc.start()
+    peak = 0
+    for url in urls[:5]:
+        tracemalloc.reset_peak()
+        client.get(url)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'status': {str(code): count for code, count in sorted(statuses.items())},
+        'rps': round(requests / wall, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'queries': {'mean': round(statistics.fmean(queries), 2), 'max': max(queries)},
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def metadata(args):
+    import django
+    from django.db import connection
+    from blog.models import BlogFeedback, BlogPost
+    from faq.models import FAQ
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'database': connection.vendor,
+        'scale': args.scale,
+        'rows': {
+            'posts': BlogPost.objects.count(),
+            'blog_feedback': BlogFeedback.objects.count(),
+            'faqs': FAQ.objects.count(),
+        },
+        'requests_per_endpoint': args.requests,
+        'response_cache': args.response_cache,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+    }
+
+
+def print_results(results, baseline=None):
+    base = (baseline or {}).get('endpoints', {})
+    header = f"{'endpoint':24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>8} {'queries':>8} {'peak KB':>9} {'err':>4}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results['endpoints'].items():
+        latency = result['latency_ms']
+        line = (
+            f"{name:24} {latency['p50']:9.2f} {latency['p95']:9.2f} {latency['p99']:9.2f} "
+            f"{result['rps']:8.1f} {result['queries']['mean']:8.1f} {result['peak_memory_kb']:9.1f} {result['errors']:4d}"
+        )
+        if name in base:
+            before = base[name]
+
+            def change(new, old):
+                return f'{(new - old) / old * 100:+.0f}%' if old else 'n/a'
+            line += (
+                f"   p50 {change(latency['p50'], before['latency_ms']['p50'])}"
+                f" p95 {change(latency['p95'], before['latency_ms']['p95'])}"
+                f" rps {change(result['rps'], before['rps'])}"
+                f" queries {result['queries']['mean'] - before['queries']['mean']:+.1f}"
+            )
+        print(line)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django(args)
+    prepare_dataset(args)
+
+    from django.test import Client
+
+    client = Client()
+    rng = random.Random(args.seed)
+    selected = endpoints(rng)
+    if args.only:
+        selected = {name: urls for name, urls in selected.items() if name in args.only}
+
+    results = {'meta': metadata(args), 'endpoints': {}}
+    for name, urls in selected.items():
+        if not urls:
+            continue
+        print(f'{name}...', file=sys.stderr)
+        results['endpoints'][name] = run_endpoint(client, urls, args.requests, args.warmup)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+            fh.write('\n')
+
+
+if __name__ == '__main__':
+    main()
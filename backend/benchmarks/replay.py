@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+"""
+Traffic replay load generator for a running server (stdlib only).
+
+Requests come from an access log (``--log``; combined/common log format or
+one ``METHOD /path`` / ``/path`` per line) or a weighted profile
+(``--profile profile.json``, default: the built-in mix below). Two modes:
+
+* closed loop: ``--concurrency N`` clients send back-to-back requests;
+* open loop: ``--rate R`` Poisson arrivals per second, independent of how
+  fast the server answers. ``--rate 20,40,80,160`` runs one step per rate to
+  find the saturation point. ``--concurrency`` caps in-flight requests and
+  arrivals over the cap are counted as dropped.
+
+Each step reports achieved throughput, latency percentiles, errors (5xx and
+transport failures), 4xx and drop counts and a per-route breakdown. A step
+is saturated when it serves less than 90% of the offered rate, errors
+exceed 1% or p99 exceeds ``--slo-ms``.
+
+    python benchmarks/replay.py --url http://127.0.0.1:8000 --concurrency 32 --duration 30
+    python benchmarks/replay.py --rate 25,50,100,200 --duration 20 --output steps.json
+    python benchmarks/replay.py --log access.log --rate 100
+
+A profile maps URL templates to weights; ``{name}`` placeholders are filled
+from ``params``:
+
+    {"routes": {"/api/blog/posts/": 30, "/api/pages/{page_type}/": 15},
+     "params": {"page_type": ["about", "privacy", "terms"]}}
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import ssl
+import statistics
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+DEFAULT_PROFILE = {
+    'routes': {
+        '/api/blog/posts/': 30,
+        '/api/blog/posts/?page={page}': 5,
+        '/api/blog/posts/?category__parent={parent}': 5,
+        '/api/blog/posts/{post}/': 10,
+        '/api/pages/{page_type}/': 15,
+        '/api/pages/nav/': 10,
+        '/api/pages/footer/': 10,
+        '/api/faq/api/search/?q={query}': 10,
+        '/api/faq/api/faqs/': 3,
+        '/api/company/insurers/': 2,
+    },
+    'params': {
+        'page': [2, 3, 4, 5],
+        'parent': ['states', 'coverage'],
+        'post': ['how-to-compare-car-insurance-quotes'],
+        'page_type': ['about', 'privacy', 'terms', 'contact', 'disclosure'],
+        'query': ['deductible', 'teen driver', 'sr22', 'claim', 'uninsured motorist', 'discount'],
+    },
+}
+
+LOG_LINE = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+)(?: HTTP/[\d.]+)?"')
+PLAIN_LINE = re.compile(r'^(?:(?P<method>[A-Z]+)\s+)?(?P<path>/\S*)')
+
+
+def load_log(path):
+    requests = []
+    with open(path) as fh:
+        for line in fh:
+            match = LOG_LINE.search(line) or PLAIN_LINE.match(line.strip())
+            if match and (match.group('method') or 'GET') == 'GET':
+                requests.append(match.group('path'))
+    if not requests:
+        raise SystemExit(f'No GET requests found in {path}')
+    return requests
+
+
+class Profile:
+    def __init__(self, spec, rng):
+        self.rng = rng
+        self.templates = list(spec['routes'])
+        self.weights = list(spec['routes'].values())
+        self.params = spec.get('params', {})
+
+    def __call__(self):
+        template = self.rng.choices(self.templates, weights=self.weights)[0]
+        return template.format_map({key: self.rng.choice(values) for key, values in self.params.items()}), template
+
+
+class LogReplay:
+    def __init__(self, paths):
+        self.paths = paths
+        self.index = 0
+
+    def __call__(self):
+        path = self.paths[self.index % len(self.paths)]
+        self.index += 1
+        return path, route_of(path)
+
+
+def route_of(path):
+    """Group paths for the per-route report: strip the query and slugs after the last known segment."""
+    base = path.split('?', 1)[0]
+    return re.sub(r'/[^/]*[\d-][^/]*/$', '/<slug>/', base)
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client connection."""
+
+    def __init__(self, target, keep_alive=True):
+        self.target = target
+        self.keep_alive = keep_alive
+        self.reader = self.writer = None
+
+    async def open(self):
+        parts = self.target
+        context = ssl.create_default_context() if parts.scheme == 'https' else None
+        port = parts.port or (443 if context else 80)
+        self.reader, self.writer = await asyncio.open_connection(parts.hostname, port, ssl=context)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def get(self, path, headers):
+        if self.writer is None:
+            await self.open()
+        host = self.target.netloc
+        connection = 'keep-alive' if self.keep_alive else 'close'
+        lines = [f'GET {path} HTTP/1.1', f'Host: {host}', f'Connection: {connection}', 'Accept: application/json']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by server')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                chunk_size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(chunk_size + 2)
+                size += chunk_size
+                if chunk_size == 0:
+                    break
+        elif 'content-length' in response_headers:
+            size = int(response_headers['content-length'])
+            await self.reader.readexactly(size)
+        elif status not in (204, 304):
+            body = await self.reader.read()
+            size = len(body)
+            self.close()
+        if not self.keep_alive or response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, size
+
+
+class Step:
+    """Results of one load step."""
+
+    def __init__(self, name, offered_rate=None):
+        self.name = name
+        self.offered_rate = offered_rate
+        self.latencies = []
+        self.routes = defaultdict(list)
+        self.statuses = defaultdict(int)
+        self.errors = 0
+        self.client_errors = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.started = self.finished = None
+
+    def record(self, route, latency, status=None, size=0, error=None):
+        if error is not None:
+            self.errors += 1
+            self.timeouts += isinstance(error, asyncio.TimeoutError)
+            self.statuses[type(error).__name__] += 1
+            return
+        self.statuses[str(status)] += 1
+        if status >= 500:
+            self.errors += 1
+        elif status >= 400:
+            self.client_errors += 1
+        self.latencies.append(latency)
+        self.routes[route].append(latency)
+        self.bytes += size
+
+    def summary(self, slo_ms):
+        elapsed = (self.finished - self.started) or 1e-9
+        completed = sum(self.statuses.values())
+        served = len(self.latencies)
+        result = {
+            'step': self.name,
+            'offered_rps': self.offered_rate,
+            'achieved_rps': round(served / elapsed, 1),
+            'requests': completed,
+            'errors': self.errors,
+            'error_rate': round(self.errors / completed, 4) if completed else 0,
+            'client_errors': self.client_errors,
+            'timeouts': self.timeouts,
+            'dropped': self.dropped,
+            'status': dict(sorted(self.statuses.items())),
+            'mb_received': round(self.bytes / 1e6, 2),
+            'latency_ms': latency_summary(self.latencies),
+            'routes': {
+                route: {'requests': len(values), **latency_summary(values)}
+                for route, values in sorted(self.routes.items(), key=lambda item: -len(item[1]))
+            },
+        }
+        reasons = []
+        if self.offered_rate and result['achieved_rps'] < 0.9 * self.offered_rate:
+            reasons.append('throughput below 90% of offered rate')
+        if result['error_rate'] > 0.01:
+            reasons.append('error rate above 1%')
+        p99 = result['latency_ms'].get('p99')
+        if slo_ms and p99 is not None and p99 > slo_ms:
+            reasons.append(f'p99 above {slo_ms} ms')
+        result['saturated'] = bool(reasons)
+        result['saturation_reasons'] = reasons
+        return result
+
+
+def latency_summary(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))], 2)
+    return {
+        'p50': pct(50), 'p90': pct(90), 'p95': pct(95), 'p99': pct(99),
+        'mean': round(statistics.fmean(ordered), 2), 'max': round(ordered[-1], 2),
+    }
+
+
+class Pool:
+    """At most ``size`` keep-alive connections, reused across requests."""
+
+    def __init__(self, target, size, keep_alive=True):
+        self.target = target
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait(Connection(target, keep_alive))
+
+    async def request(self, path, headers, timeout):
+        connection = await self.idle.get()
+        try:
+            return await asyncio.wait_for(connection.get(path, headers), timeout)
+        except BaseException:
+            # A half-read response leaves the stream unusable
+            connection.close()
+            raise
+        finally:
+            self.idle.put_nowait(connection)
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+async def send(pool, next_request, step, args):
+    path, route = next_request()
+    started = time.perf_counter()
+    try:
+        status, size = await pool.request(path, args.header_map, args.timeout)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as exc:
+        step.record(route, None, error=exc)
+    else:
+        step.record(route, (time.perf_counter() - started) * 1000, status, size)
+
+
+async def closed_loop(target, next_request, args):
+    step = Step(f'closed-{args.concurrency}')
+    pool = Pool(target, args.concurrency, not args.new_connections)
+    deadline = time.perf_counter() + args.duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            await send(pool, next_request, step, args)
+
+    step.started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    step.finished = time.perf_counter()
+    pool.close()
+    return step
+
+
+async def open_loop(target, next_request, rate, args, rng):
+    step = Step(f'rate-{rate:g}', offered_rate=rate)
+    pool = Pool(target, args.concurrency, not args.new_connections)
+    in_flight = set()
+    step.started = time.perf_counter()
+    deadline = step.started + args.duration
+    next_arrival = step.started
+    while True:
+        next_arrival += rng.expovariate(rate)
+        if next_arrival >= deadline:
+            break
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= args.concurrency:
+            # The server is not keeping up; an open-loop client doesn't wait
+            step.dropped += 1
+            continue
+        task = asyncio.ensure_future(send(pool, next_request, step, args))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    step.finished = time.perf_counter()
+    pool.close()
+    return step
+
+
+def print_step(result):
+    latency = result['latency_ms']
+    offered = f"{result['offered_rps']:g}" if result['offered_rps'] else '-'
+    print(
+        f"{result['step']:>14}  offered {offered:>6}  achieved {result['achieved_rps']:8.1f} rps  "
+        f"p50 {latency.get('p50', 0):8.1f}  p95 {latency.get('p95', 0):8.1f}  p99 {latency.get('p99', 0):8.1f} ms  "
+        f"errors {result['error_rate']:6.2%}  4xx {result['client_errors']:5d}  dropped {result['dropped']:5d}"
+        + ('  SATURATED: ' + ', '.join(result['saturation_reasons']) if result['saturated'] else '')
+    )
+
+
+def print_routes(result, limit=10):
+    for route, stats in list(result['routes'].items())[:limit]:
+        print(f"    {route:50} {stats['requests']:7d}  p50 {stats['p50']:8.1f}  p95 {stats['p95']:8.1f}  p99 {stats['p99']:8.1f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--log', help='Replay GET requests from an access log, in order')
+    source.add_argument('--profile', help='Weighted request mix as JSON (default: built-in mix)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Connections (closed loop) or in-flight cap (open loop)')
+    parser.add_argument('--rate', help='Open-loop arrival rate(s) per second, comma separated for a step ramp')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per step')
+    parser.add_argument('--timeout', type=float, default=10, help='Per-request timeout in seconds')
+    parser.add_argument('--slo-ms', type=float, help='Mark a step saturated when p99 exceeds this')
+    parser.add_argument(
+        '--new-connections', action='store_true',
+        help='Open a connection per request (runserver adds ~40 ms to reused keep-alive connections)',
+    )
+    parser.add_argument('--header', action='append', default=[], help='Extra request header, "Name: value"')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write step results to this JSON file')
+    args = parser.parse_args(argv)
+    args.header_map = dict(
+        (name.strip(), value.strip()) for name, _, value in (header.partition(':') for header in args.header)
+    )
+    return args
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    target = urlsplit(args.url)
+    if args.log:
+        next_request = LogReplay(load_log(args.log))
+    else:
+        spec = DEFAULT_PROFILE
+        if args.profile:
+            with open(args.profile) as fh:
+                spec = json.load(fh)
+        next_request = Profile(spec, rng)
+
+    results = []
+    if args.rate:
+        for rate in (float(value) for value in args.rate.split(',')):
+            step = await open_loop(target, next_request, rate, args, rng)
+            results.append(step.summary(args.slo_ms))
+            print_step(results[-1])
+    else:
+        step = await closed_loop(target, next_request, args)
+        results.append(step.summary(args.slo_ms))
+        print_step(results[-1])
+    print_routes(results[-1])
+
+    saturated = next((result for result in results if result['saturated']), None)
+    if args.rate:
+        if saturated:
+            print(f"Saturation at {saturated['offered_rps']:g} req/s offered ({', '.join(saturated['saturation_reasons'])})")
+        else:
+            print('No saturation in the tested range')
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({
+                'url': args.url,
+                'source': args.log or args.profile or 'default profile',
+                'concurrency': args.concurrency,
+                'duration': args.duration,
+                'saturation_rps': saturated['offered_rps'] if saturated else None,
+                'steps': results,
+            }, fh, indent=2)
+            fh.write('\n')
+
+
+def main(argv=None):
+    try:
+        asyncio.run(run(parse_args(argv)))
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == '__main__':
+    main()
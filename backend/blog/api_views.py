@@ -1,15 +1,38 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .models import Category
+from backend.conditional import conditional, make_etag, queryset_validators
+from backend.response_cache import cache_response
+from . import catalog
+from .models import BlogPost, Category
 
+
+def state_categories():
+    states = catalog.find_category(name="States", type="main")
+    if states is None:
+        return Category.objects.none()
+    return Category.objects.filter(parent_id=states['id'])
+
+
+def states_validators(request):
+    return queryset_validators(state_categories(), models=(Category,))
+
+
+@cache_response(Category)
+@conditional(states_validators)
 @api_view(['GET'])
 def states_list(request):
-    try:
-        main_category = Category.objects.get(name="States", type="main")
-        states = main_category.subcategories.all()
-        data = [
-            {"id": s.id, "name": s.name, "slug": s.slug} for s in states
-        ]
-        return Response(data)
-    except Category.DoesNotExist:
-        return Response([])
+    states = state_categories().values('id', 'name', 'slug')
+    return Response(list(states))
+
+
+def category_tree_validators(request):
+    return make_etag('category-tree', catalog.tree_version()), None
+
+
+@cache_response(Category, BlogPost)
+@conditional(category_tree_validators)
+@api_view(['GET'])
+def category_tree(request):
+    """Main categories with nested subcategories and published post counts."""
+    version, tree = catalog.get_category_tree()
+    return Response({'version': version, 'categories': tree})
@@ -0,0 +1,118 @@
+"""
+Materialized category paths and a cached category index.
+
+Every category stores its ancestry as a path of ids, root first, e.g.
+``/3/17/`` for category 17 under category 3, and every post copies its
+category's path into ``BlogPost.category_path``. "Posts under category X"
+is then a prefix match on one indexed column instead of a self-join per
+level. Paths are rewritten when a category is re-parented (see
+``Category.save()``).
+
+The filters need the ancestor's path from its slug or name, so all
+categories are read with one query and kept in the cache until a category is
+saved or deleted (see blog/signals.py).
+
+The nested category tree with published post counts is also read with one
+query. It is cached under a version derived from the response-cache
+generations of ``Category`` and ``BlogPost``, so saving either one (moving a
+post to another category included) switches to a fresh entry.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+CACHE_KEY = 'blog:category-index'
+TREE_CACHE_KEY = 'blog:category-tree'
+CACHE_TIMEOUT = 60 * 60
+
+
+def build_paths(rows):
+    """Return ``{id: path}`` for ``[(id, parent_id), ...]`` covering whole trees."""
+    parents = dict(rows)
+    paths = {}
+
+    def path(pk, seen=()):
+        if pk not in paths:
+            parent = parents.get(pk)
+            if parent is None or parent in seen:
+                paths[pk] = f'/{pk}/'
+            else:
+                paths[pk] = f'{path(parent, seen + (pk,))}{pk}/'
+        return paths[pk]
+
+    for pk in parents:
+        path(pk)
+    return paths
+
+
+def get_categories():
+    """Return ``[{'id', 'name', 'slug', 'type', 'parent_id', 'path'}, ...]`` for every category."""
+    categories = cache.get(CACHE_KEY)
+    if categories is None:
+        from .models import Category
+
+        categories = list(Category.objects.order_by('pk').values('id', 'name', 'slug', 'type', 'parent_id', 'path'))
+        cache.set(CACHE_KEY, categories, CACHE_TIMEOUT)
+    return categories
+
+
+def find_category(**lookup):
+    """The cached category matching every ``field=value`` in ``lookup``, or None."""
+    for category in get_categories():
+        if all(category[field] == value for field, value in lookup.items()):
+            return category
+    return None
+
+
+def tree_version():
+    from backend.response_cache import get_generations
+    from .models import BlogPost, Category
+
+    return hashlib.md5('|'.join(get_generations([Category, BlogPost])).encode()).hexdigest()[:16]
+
+
+def build_tree(rows):
+    """Nest ``[{'id', 'parent_id', 'post_count', ...}, ...]`` into root nodes with ``children``.
+
+    ``post_count`` counts the node's own posts, ``total_post_count`` adds the
+    posts of every descendant.
+    """
+    nodes = {row['id']: dict(row, children=[]) for row in rows}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node['parent_id'])
+        (parent['children'] if parent else roots).append(node)
+
+    def total(node):
+        node['total_post_count'] = node['post_count'] + sum(total(child) for child in node['children'])
+        return node['total_post_count']
+
+    for node in roots:
+        total(node)
+    for node in nodes.values():
+        del node['parent_id']
+    return roots
+
+
+def get_category_tree():
+    """Return ``(version, tree)``; the tree is read with a single query per version."""
+    version = tree_version()
+    key = f'{TREE_CACHE_KEY}:{version}'
+    tree = cache.get(key)
+    if tree is None:
+        from .models import Category
+
+        rows = (
+            Category.objects
+            .annotate(post_count=Count('blogpost', filter=Q(blogpost__is_published=True)))
+            .order_by('name')
+            .values('id', 'name', 'slug', 'type', 'parent_id', 'post_count')
+        )
+        tree = build_tree(rows)
+        cache.set(key, tree, CACHE_TIMEOUT)
+    return version, tree
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import BlogPost
+from blog.search_vector import postgres_enabled, update_search_vector
+
+
+class Command(BaseCommand):
+    help = "Recompute blog post search vectors (run after bulk imports)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not postgres_enabled():
+            self.stdout.write(self.style.WARNING("Full-text search needs PostgreSQL; nothing to do."))
+            return
+
+        batch_size = options["batch_size"]
+        ids = list(BlogPost.objects.order_by("pk").values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            updated += update_search_vector(BlogPost.objects.filter(pk__in=ids[start:start + batch_size]))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search vectors for {updated} posts."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+from backend.db_operations import PostgresOnly
+
+
+def populate_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from blog.search_vector import SEARCH_VECTOR
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    BlogPost.objects.update(search_vector=SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_blogpost_meta_description_blogpost_meta_keywords_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(
+            migrations.AddIndex(
+                model_name='blogpost',
+                index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blogpost_search_vector_gin'),
+            ),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
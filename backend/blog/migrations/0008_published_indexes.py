@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_blogpost_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-id'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-published_at'], name='blogpost_category_pub_idx'),
+        ),
+    ]
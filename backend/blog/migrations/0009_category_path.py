@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:31
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+from backend.db_operations import PostgresOnly
+
+
+def populate_paths(apps, schema_editor):
+    from blog.catalog import build_paths
+    Category = apps.get_model('blog', 'Category')
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    paths = build_paths(Category.objects.values_list('pk', 'parent_id'))
+    categories = [Category(pk=pk, path=path) for pk, path in paths.items()]
+    Category.objects.bulk_update(categories, ['path'], batch_size=500)
+    BlogPost.objects.update(
+        category_path=Coalesce(
+            models.Subquery(Category.objects.filter(pk=models.OuterRef('category_id')).values('path')[:1]),
+            models.Value(''),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_published_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='category_path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+        PostgresOnly(
+            migrations.AddIndex(
+                model_name='blogpost',
+                index=models.Index(condition=models.Q(('is_published', True)), fields=['category_path'], name='blogpost_category_path_idx', opclasses=['varchar_pattern_ops']),
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_category_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-trending_score', '-id'], name='blogpost_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='blogpost_trending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-trending_score', '-views', '-helpful_count', '-id'], name='blogpost_trending_idx'),
+        ),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from ckeditor_uploader.fields import RichTextUploadingField
 from django.utils.text import slugify
 
+from .search_vector import update_search_vector
+
 User = get_user_model()
 
 class Category(models.Model):
@@ -16,11 +21,37 @@ class Category(models.Model):
     slug = models.SlugField(max_length=120, unique=True, blank=True)
     type = models.CharField(max_length=20, choices=CATEGORY_TYPES, default='none')
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='subcategories')
+    # Ancestor ids root first, ending with this category: "/3/17/" (see blog/catalog.py)
+    path = models.CharField(max_length=255, blank=True, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_path()
+
+    def update_path(self):
+        """Recompute this category's path and, if it moved, rewrite the paths below it."""
+        parent_path = ''
+        if self.parent_id is not None:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+        new_path = f'{parent_path or "/"}{self.pk}/'
+        old_path = Category.objects.filter(pk=self.pk).values_list('path', flat=True).get()
+        if new_path == old_path:
+            return
+        if old_path and new_path.startswith(old_path):
+            raise ValueError(f'{self} cannot be moved under its own subcategory')
+        self.path = new_path
+        Category.objects.filter(pk=self.pk).update(path=new_path)
+        if old_path:
+            # Swap the old prefix for the new one on every descendant and post below
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(models.Value(new_path), Substr('path', len(old_path) + 1)),
+            )
+            BlogPost.objects.filter(category_path__startswith=old_path).update(
+                category_path=Concat(models.Value(new_path), Substr('category_path', len(old_path) + 1)),
+            )
 
     def __str__(self):
         if self.parent:
@@ -33,6 +64,8 @@ class BlogPost(models.Model):
     slug = models.SlugField(max_length=255, unique=True)
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    # Copy of category.path: ancestor filters are one prefix match (see blog/catalog.py)
+    category_path = models.CharField(max_length=255, blank=True, editable=False)
     summary = models.TextField(blank=True)
     content = RichTextUploadingField()
     feature_image = models.ImageField(upload_to='blog/images/', null=True, blank=True)
@@ -53,10 +86,48 @@ class BlogPost(models.Model):
     views = models.PositiveIntegerField(default=0)
     helpful_count = models.PositiveIntegerField(default=0)
     not_helpful_count = models.PositiveIntegerField(default=0)
+    # Forward-decayed views and votes, maintained by `manage.py update_trending` (see analytics/trending.py)
+    trending_score = models.FloatField(default=0, editable=False)
     chart_data = models.JSONField(blank=True, null=True)
+    # Weighted full-text document, maintained by save() on PostgreSQL (see blog/search_vector.py)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='blogpost_search_vector_gin'),
+            # Public lists: published rows only, newest first (id breaks ties for keyset paging)
+            models.Index(
+                fields=['-published_at', '-id'], name='blogpost_published_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['category', '-published_at'], name='blogpost_category_pub_idx',
+                condition=models.Q(is_published=True),
+            ),
+            # Prefix matches on the path need a pattern opclass (PostgreSQL only)
+            models.Index(
+                fields=['category_path'], name='blogpost_category_path_idx', opclasses=['varchar_pattern_ops'],
+                condition=models.Q(is_published=True),
+            ),
+            # Lifetime views and votes order the posts without recent views
+            models.Index(
+                fields=['-trending_score', '-views', '-helpful_count', '-id'], name='blogpost_trending_idx',
+                condition=models.Q(is_published=True),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'category' in update_fields:
+            self.category_path = (
+                Category.objects.filter(pk=self.category_id).values_list('path', flat=True).first() or ''
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'category_path'}
+        super().save(*args, **kwargs)
+        if update_fields is None or {'title', 'summary', 'content'} & set(update_fields):
+            update_search_vector(BlogPost.objects.filter(pk=self.pk))
 
     def __str__(self):
         return self.title
@@ -0,0 +1,49 @@
+"""
+Full-text search for blog posts.
+
+On PostgreSQL each post stores a weighted ``search_vector`` (title > summary >
+content) backed by a GIN index; ``?search=`` matches against it, ranks the
+results and returns a highlighted snippet. Other databases fall back to DRF's
+``icontains`` search over ``search_fields``. The vector itself is maintained
+by ``blog.search_vector``.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, FloatField, Func, Value
+from rest_framework import filters
+
+from .search_vector import SEARCH_CONFIG, postgres_enabled
+
+
+def strip_html(expression):
+    return Func(expression, Value('<[^>]+>'), Value(' '), Value('g'), function='regexp_replace')
+
+
+class BlogPostSearchFilter(filters.SearchFilter):
+    """SearchFilter that ranks posts through the stored search vector."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+        if not postgres_enabled():
+            return super().filter_queryset(request, queryset, view).annotate(
+                search_rank=Value(None, output_field=FloatField()),
+                search_snippet=F('summary'),
+            )
+
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            search_snippet=SearchHeadline(
+                strip_html(F('content')),
+                query,
+                config=SEARCH_CONFIG,
+                start_sel='<mark>',
+                stop_sel='</mark>',
+                max_words=35,
+                min_words=15,
+                max_fragments=2,
+            ),
+        )
+        # An explicit ?ordering= still wins (OrderingFilter runs afterwards)
+        return queryset.order_by('-search_rank', '-published_at')
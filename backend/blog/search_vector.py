@@ -0,0 +1,27 @@
+"""
+The stored full-text document for blog posts.
+
+Kept apart from ``blog.search`` (the DRF filter) so models, migrations and
+management commands can maintain ``search_vector`` without importing DRF.
+"""
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+
+SEARCH_CONFIG = 'english'
+
+SEARCH_VECTOR = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('summary', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+)
+
+
+def postgres_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def update_search_vector(queryset):
+    """Recompute ``search_vector`` for every post in ``queryset``."""
+    if not postgres_enabled():
+        return 0
+    return queryset.update(search_vector=SEARCH_VECTOR)
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from backend.client_ip import get_client_ip
+from related.serializers import related_content
 from .models import BlogPost, BlogImage, Category, BlogFeedback
 
 class BlogImageSerializer(serializers.ModelSerializer):
@@ -27,18 +29,44 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             'views', 'helpful_count', 'not_helpful_count', 'author_name', 'author_bio', 'author_image'
         )
 
+    # Columns loaded for a card: leaves content, chart_data and SEO text out of list queries
+    card_fields = (
+        'id', 'title', 'slug', 'summary', 'feature_image', 'published_at',
+        'views', 'helpful_count', 'not_helpful_count', 'author_name', 'author_bio', 'author_image',
+        'author__id', 'author__username',
+        'category__id', 'category__name', 'category__slug', 'category__type',
+        'category__parent__id', 'category__parent__name', 'category__parent__slug',
+    )
+
+    @classmethod
+    def card_queryset(cls, queryset):
+        """Fetch posts, category, parent category and author in a single query."""
+        return queryset.select_related('category__parent', 'author').only(*cls.card_fields)
+
+class BlogPostSearchResultSerializer(BlogPostListSerializer):
+    search_rank = serializers.FloatField(read_only=True, allow_null=True)
+    search_snippet = serializers.CharField(read_only=True)
+
+    class Meta(BlogPostListSerializer.Meta):
+        fields = BlogPostListSerializer.Meta.fields + ('search_rank', 'search_snippet')
+
 class BlogPostDetailSerializer(serializers.ModelSerializer):
     feature_image = serializers.ImageField()
     additional_images = BlogImageSerializer(many=True)
     author_image = serializers.ImageField(required=False, allow_null=True)
     author = serializers.StringRelatedField()
     category = CategorySerializer()
+    related = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogPost
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('published_at','updated_at','views', 'helpful_count', 'not_helpful_count')
 
+    def get_related(self, obj):
+        # Precomputed by `manage.py build_related` (see related/builder.py)
+        return related_content(obj, self.context)
+
 class BlogFeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = BlogFeedback
@@ -48,6 +76,5 @@ class BlogFeedbackSerializer(serializers.ModelSerializer):
         # Get IP address from request
         request = self.context.get('request')
         if request:
-            ip_address = request.META.get('REMOTE_ADDR')
-            validated_data['ip_address'] = ip_address
+            validated_data['ip_address'] = get_client_ip(request)
         return super().create(validated_data)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from backend import response_cache
+
+from . import catalog
+from .models import BlogImage, BlogPost, Category
+
+response_cache.watch(BlogPost, Category, BlogImage)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_index(sender, **kwargs):
+    catalog.invalidate()
+
+
+@receiver(pre_delete, sender=Category)
+def clear_post_category_paths(sender, instance, **kwargs):
+    # Posts are detached with SET_NULL, which bypasses BlogPost.save()
+    BlogPost.objects.filter(category=instance).update(category_path='')
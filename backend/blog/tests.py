@@ -1,3 +1,275 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import skipIf
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend.testing import QueryBudgetTestCase
+
+from . import catalog
+from .models import BlogPost, Category
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class BlogPostListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create(username='editor')
+        states = Category.objects.create(name='States', type='main')
+        for i in range(3):
+            category = Category.objects.create(name=f'State {i}', type='sub', parent=states)
+            for j in range(5):
+                BlogPost.objects.create(
+                    title=f'Post {i}-{j}', slug=f'post-{i}-{j}', author=author,
+                    category=category, content='<p>body</p>' * 200,
+                )
+
+    def test_list_query_count_is_constant(self):
+        # One COUNT for the paginator plus one joined query for the cards;
+        # parent filters read the (here warm) cached category index
+        catalog.get_categories()
+        for url in ('/api/blog/posts/', '/api/blog/posts/?page=2', '/api/blog/posts/?category__parent=states'):
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_cursor_pagination_is_opt_in(self):
+        body = self.client.get('/api/blog/posts/').json()
+        self.assertEqual(body['count'], 15)
+        self.assertIn('page=2', body['next'])
+
+        body = self.client.get('/api/blog/posts/?pagination=cursor').json()
+        self.assertNotIn('count', body)
+        self.assertIn('cursor=', body['next'])
+        self.assertIsNone(body['previous'])
+        second = self.client.get(body['next']).json()
+        self.assertEqual(len(body['results']) + len(second['results']), 15)
+        self.assertIsNone(second['next'])
+        self.assertEqual(
+            {post['slug'] for post in body['results']} & {post['slug'] for post in second['results']}, set()
+        )
+
+    def test_list_does_not_load_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/blog/posts/')
+        card = response.json()['results'][0]
+        self.assertEqual(card['author'], 'editor')
+        self.assertEqual(card['category']['parent'], 'states')
+        self.assertEqual(card['category']['parent_name'], 'States')
+        self.assertNotIn('"blog_blogpost"."content"', queries[-1]['sql'])
+        self.assertNotIn('"blog_blogpost"."chart_data"', queries[-1]['sql'])
+
+
+class BlogResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create(username='editor')
+        cls.category = Category.objects.create(name='Guides', type='main')
+        BlogPost.objects.create(title='First', slug='first', author=cls.author, category=cls.category)
+
+    def test_cached_until_post_changes(self):
+        first = self.client.get('/api/blog/posts/')
+        self.assertEqual(first['X-Response-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/blog/posts/')
+        self.assertEqual(second['X-Response-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+        BlogPost.objects.create(title='Second', slug='second', author=self.author, category=self.category)
+        third = self.client.get('/api/blog/posts/')
+        self.assertEqual(third['X-Response-Cache'], 'MISS')
+        self.assertEqual(third.json()['count'], 2)
+
+    def test_not_cached_for_users_or_browsable_api(self):
+        self.client.get('/api/blog/posts/')
+        html = self.client.get('/api/blog/posts/', HTTP_ACCEPT='text/html')
+        self.assertNotIn('X-Response-Cache', html)
+        self.client.force_login(get_user_model().objects.create_user(username='staff', is_staff=True))
+        response = self.client.get('/api/blog/posts/')
+        self.assertNotIn('X-Response-Cache', response)
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/blog/posts/')['X-Response-Cache'], 'HIT')
+
+
+@skipIf(connection.vendor == 'postgresql', 'PostgreSQL ranks through the search vector')
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class BlogSearchFallbackTests(TestCase):
+    """``?search=`` on databases without PostgreSQL full-text search."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create(username='editor')
+        category = Category.objects.create(name='Guides', type='main')
+        posts = [
+            ('older', 'Deductibles explained', 'How a deductible works', 'body'),
+            ('newer', 'Teen drivers', 'Adding a teen', 'Raising the deductible lowers the premium'),
+            ('other', 'Flood cover', 'What flood insurance pays', 'body'),
+        ]
+        for days, (slug, title, summary, content) in enumerate(reversed(posts)):
+            post = BlogPost.objects.create(
+                title=title, slug=slug, summary=summary, content=content, author=author, category=category,
+            )
+            BlogPost.objects.filter(pk=post.pk).update(published_at=timezone.now() - timedelta(days=days))
+
+    def test_matches_are_newest_first_without_a_rank(self):
+        results = self.client.get('/api/blog/posts/?search=deductible').json()['results']
+        self.assertEqual([post['slug'] for post in results], ['newer', 'older'])
+        self.assertEqual([post['search_rank'] for post in results], [None, None])
+        self.assertEqual(results[0]['search_snippet'], 'Adding a teen')
+
+    def test_explicit_ordering_still_applies(self):
+        results = self.client.get('/api/blog/posts/?search=deductible&ordering=published_at').json()['results']
+        self.assertEqual([post['slug'] for post in results], ['older', 'newer'])
+
+    def test_empty_query_lists_every_post(self):
+        for url in ('/api/blog/posts/?search=', '/api/blog/posts/?search=%20%20'):
+            results = self.client.get(url).json()['results']
+            self.assertEqual([post['slug'] for post in results], ['other', 'newer', 'older'])
+            self.assertNotIn('search_rank', results[0])
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class BlogConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create(username='editor')
+        category = Category.objects.create(name='Guides', type='main')
+        cls.post = BlogPost.objects.create(title='First', slug='first', author=author, category=category)
+
+    def test_list_revalidation(self):
+        response = self.client.get('/api/blog/posts/')
+        etag = response['ETag']
+        # One aggregate, no page query and no serialization
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/blog/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.post.title = 'Renamed'
+        self.post.save()
+        response = self.client.get('/api/blog/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_cursor_pages_are_validated_from_their_rows(self):
+        url = '/api/blog/posts/?pagination=cursor'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertNotIn('COUNT(', ' '.join(query['sql'] for query in queries))
+        self.assertNotIn('Last-Modified', response)
+        # Only the page query, no serialization
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        BlogPost.objects.filter(pk=self.post.pk).update(views=5)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_detail_revalidation(self):
+        response = self.client.get('/api/blog/posts/first/')
+        etag = response['ETag']
+        # views changes without updated_at, so If-Modified-Since could answer a stale 304
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get('/api/blog/posts/first/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        BlogPost.objects.filter(pk=self.post.pk).update(views=5)
+        response = self.client.get('/api/blog/posts/first/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['views'], 5)
+
+
+class BlogQueryBudgetTests(QueryBudgetTestCase):
+    def test_posts(self):
+        self.assertQueryBudget('post-list')
+        self.assertQueryBudget('post-list', query='category__parent=states')
+        self.assertQueryBudget('post-list', query='ordering=trending')
+        self.assertQueryBudget('post-list', query='ordering=trending&pagination=cursor')
+        self.assertQueryBudget('post-detail', args=['post-0-0'])
+        self.assertQueryBudget('blog-posts-by-category', query='category=state-0')
+
+    def test_categories(self):
+        self.assertQueryBudget('category-list')
+        self.assertQueryBudget('category-tree')
+        self.assertQueryBudget('states-list')
+
+
+class CategoryPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.states = Category.objects.create(name='States', type='main')
+        cls.coverage = Category.objects.create(name='Coverage', type='main')
+        cls.texas = Category.objects.create(name='Texas', type='sub', parent=cls.states)
+        cls.post = BlogPost.objects.create(title='Texas minimums', slug='texas-minimums', category=cls.texas, content='x')
+
+    def test_paths_follow_the_tree(self):
+        self.assertEqual(self.texas.path, f'/{self.states.pk}/{self.texas.pk}/')
+        self.assertEqual(BlogPost.objects.get(pk=self.post.pk).category_path, self.texas.path)
+
+    def test_reparenting_rewrites_descendants_and_posts(self):
+        dallas = Category.objects.create(name='Dallas', type='sub', parent=self.texas)
+        BlogPost.objects.create(title='Dallas rates', slug='dallas-rates', category=dallas, content='x')
+        self.texas.parent = self.coverage
+        self.texas.save()
+
+        prefix = f'/{self.coverage.pk}/{self.texas.pk}/'
+        self.assertEqual(Category.objects.get(pk=dallas.pk).path, f'{prefix}{dallas.pk}/')
+        self.assertEqual(
+            sorted(BlogPost.objects.values_list('category_path', flat=True)), [prefix, f'{prefix}{dallas.pk}/'],
+        )
+        slugs = [post['slug'] for post in self.client.get('/api/blog/posts/?category__parent=coverage').json()['results']]
+        self.assertCountEqual(slugs, ['texas-minimums', 'dallas-rates'])
+        self.assertEqual(self.client.get('/api/blog/posts/?category__parent=states').json()['count'], 0)
+
+    def test_cannot_move_under_own_subcategory(self):
+        self.states.parent = self.texas
+        with self.assertRaises(ValueError):
+            self.states.save()
+        self.assertIsNone(Category.objects.get(pk=self.states.pk).parent_id)
+
+    def test_deleting_a_category_clears_post_paths(self):
+        self.texas.delete()
+        self.assertEqual(BlogPost.objects.get(pk=self.post.pk).category_path, '')
+
+
+class CategoryTreeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        states = Category.objects.create(name='States', type='main')
+        cls.texas = Category.objects.create(name='Texas', type='sub', parent=states)
+        cls.ohio = Category.objects.create(name='Ohio', type='sub', parent=states)
+        Category.objects.create(name='Coverage', type='main')
+        for i in range(3):
+            BlogPost.objects.create(title=f'Texas {i}', slug=f'texas-{i}', category=cls.texas, content='x')
+        BlogPost.objects.create(title='Draft', slug='draft', category=cls.ohio, content='x', is_published=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_nested_tree_with_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/blog/categories/tree/')
+        coverage, states = response.json()['categories']
+        self.assertEqual((coverage['name'], coverage['children']), ('Coverage', []))
+        self.assertEqual(states['total_post_count'], 3)
+        self.assertEqual(
+            [(child['slug'], child['post_count']) for child in states['children']], [('ohio', 0), ('texas', 3)],
+        )
+
+    def test_moving_a_post_invalidates(self):
+        first = self.client.get('/api/blog/categories/tree/')
+        cached = self.client.get('/api/blog/categories/tree/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        post = BlogPost.objects.get(slug='texas-0')
+        post.category = self.ohio
+        post.save()
+
+        second = self.client.get('/api/blog/categories/tree/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.json()['version'], first.json()['version'])
+        children = second.json()['categories'][1]['children']
+        self.assertEqual([child['post_count'] for child in children], [1, 2])
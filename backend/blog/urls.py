@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 from .views import BlogPostViewSet, CategoryViewSet
-from .api_views import states_list
+from .api_views import category_tree, states_list
 
 router = routers.DefaultRouter()
 router.register(r'posts', BlogPostViewSet, basename='post')
@@ -9,6 +9,8 @@ router.register(r'categories', CategoryViewSet, basename='category')
 from .views import BlogPostsByCategory
 
 urlpatterns = [
+    # Before the router, whose category detail route would take 'tree' as a slug
+    path('categories/tree/', category_tree, name='category-tree'),
     path('', include(router.urls)),
     path('api/states/', states_list, name='states-list'),
      path('api/blog/posts/', BlogPostsByCategory.as_view(), name='blog-posts-by-category'),
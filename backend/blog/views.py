@@ -1,38 +1,56 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
 from .models import BlogPost, Category, BlogFeedback
-from .serializers import BlogPostListSerializer, BlogPostDetailSerializer, CategorySerializer, BlogFeedbackSerializer
+from .serializers import (
+    BlogPostListSerializer, BlogPostSearchResultSerializer, BlogPostDetailSerializer,
+    CategorySerializer, BlogFeedbackSerializer
+)
+from .search import BlogPostSearchFilter
+from . import catalog
+from backend.pagination import KeysetPagination
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import generics
-from django.db.models import F
-
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+from django.http import Http404
+from analytics.buffer import get_counter
+from analytics.feedback import DUPLICATE, NOT_FOUND, record_vote
+from backend.client_ip import get_client_ip
+from backend.conditional import ConditionalGetMixin
+from backend.ordering import OrderingFilter
+from backend.response_cache import CachedResponseMixin
+from backend.throttling import FeedbackThrottle, ViewCountThrottle
+
+class CategoryViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = (Category,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
 
     def get_queryset(self):
-        queryset = Category.objects.all()
+        queryset = Category.objects.select_related('parent')
         # Filter by type (e.g., main/sub)
         category_type = self.request.query_params.get('type')
         if category_type:
             queryset = queryset.filter(type=category_type)
 
-        # Filter by parent slug
+        # Filter by parent slug or name, resolved from the cached category index
         parent_slug = self.request.query_params.get('parent')
         if parent_slug:
-            queryset = queryset.filter(parent__slug=parent_slug)
+            parent = catalog.find_category(slug=parent_slug)
+            queryset = queryset.filter(parent_id=parent['id']) if parent else queryset.none()
 
-        # Filter by parent name
         parent_name = self.request.query_params.get('parent__name')
         if parent_name:
-            queryset = queryset.filter(parent__name=parent_name)
+            parent = catalog.find_category(name=parent_name)
+            queryset = queryset.filter(parent_id=parent['id']) if parent else queryset.none()
 
         return queryset
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    cache_models = (BlogPost, Category)
+    conditional_volatile_fields = ('views', 'trending_score')
+    conditional_row_orderings = ('trending',)  # an index scan; no aggregate over every post first
     queryset = (
         BlogPost.objects.all()
         .select_related('category', 'author')
@@ -40,9 +58,12 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         .order_by('-published_at')
     )
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'summary', 'content']
-    ordering_fields = ['published_at', 'views']
+    pagination_class = KeysetPagination  # ?pagination=cursor for keyset paging
+    filter_backends = [BlogPostSearchFilter, OrderingFilter]
+    search_fields = ['title', 'summary', 'content']  # fallback when not on PostgreSQL
+    ordering_fields = ['published_at', 'views', 'trending']
+    # Most trending first; lifetime views and votes order posts without recent views (blogpost_trending_idx)
+    ordering_aliases = {'trending': ('-trending_score', '-views', '-helpful_count', '-id')}
     lookup_field = 'slug'  # ✅ This enables /api/blog/posts/<slug>/
 
     def list(self, request, *args, **kwargs):
@@ -68,65 +89,76 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         if category_slug:
             queryset = queryset.filter(category__slug=category_slug)
 
-        # Filter by parent category slug
+        # Filter by parent category slug or name: a prefix match on the post's category path
         parent_slug = self.request.query_params.get('category__parent')
         if parent_slug:
-            queryset = queryset.filter(category__parent__slug=parent_slug)
+            queryset = self.filter_below(queryset, slug=parent_slug)
 
-        # Filter by parent category name
         parent_name = self.request.query_params.get('category__parent__name')
         if parent_name:
-            queryset = queryset.filter(category__parent__name=parent_name)
-            
-        return queryset
+            queryset = self.filter_below(queryset, name=parent_name)
+
+        if self.action == 'list':
+            return BlogPostListSerializer.card_queryset(queryset)
+        return queryset.select_related('category__parent', 'author').prefetch_related('additional_images')
+
+    def filter_below(self, queryset, **lookup):
+        """Posts in any subcategory of the category matching ``lookup``."""
+        parent = catalog.find_category(**lookup)
+        if parent is None:
+            return queryset.none()
+        return queryset.filter(category_path__startswith=parent['path']).exclude(category_path=parent['path'])
 
     def get_serializer_class(self):
         if self.action in ['list']:
+            if self.request.query_params.get('search', '').strip():
+                return BlogPostSearchResultSerializer
             return BlogPostListSerializer
         return BlogPostDetailSerializer
 
-    # Example custom action to increment views
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_classes=[ViewCountThrottle])
     def increment_view(self, request, slug=None):  # slug instead of pk
-        post = self.get_object()
-        post.views = post.views + 1
-        post.save()
-        return Response({'views': post.views})
-
-    @action(detail=True, methods=['post'])
+        """Buffer a page view; the returned count is approximate until the next flush."""
+        row = BlogPost.objects.filter(slug=slug, is_published=True).values_list('pk', 'views').first()
+        if row is None:
+            raise Http404
+        pk, views = row
+        counter = get_counter('blog.BlogPost')
+        counter.add(pk)
+        return Response({'views': views + counter.pending(pk)})
+
+    @action(detail=True, methods=['post'], throttle_classes=[FeedbackThrottle])
     def feedback(self, request, slug=None):
         """Submit feedback for a blog post"""
-        blog_post = self.get_object()
-        serializer = BlogFeedbackSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            try:
-                feedback = serializer.save(blog_post=blog_post)
-                
-                # Update blog post helpful counts
-                if feedback.is_helpful:
-                    BlogPost.objects.filter(pk=blog_post.pk).update(helpful_count=F('helpful_count') + 1)
-                else:
-                    BlogPost.objects.filter(pk=blog_post.pk).update(not_helpful_count=F('not_helpful_count') + 1)
-                
-                return Response(
-                    {'message': 'Feedback submitted successfully'}, 
-                    status=status.HTTP_201_CREATED
-                )
-            except Exception as e:
-                return Response(
-                    {'error': 'You have already provided feedback for this blog post'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-class BlogPostsByCategory(generics.ListAPIView):
+        serializer = BlogFeedbackSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = record_vote(
+            BlogPost.objects.filter(slug=slug, is_published=True), BlogFeedback, 'blog_post',
+            key=slug, ip_address=get_client_ip(request), **serializer.validated_data,
+        )
+        if result == NOT_FOUND:
+            raise Http404
+        if result == DUPLICATE:
+            return Response(
+                {'error': 'You have already provided feedback for this blog post'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            {'message': 'Feedback submitted successfully'},
+            status=status.HTTP_201_CREATED
+        )
+
+class BlogPostsByCategory(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
+    cache_models = (BlogPost, Category)
+    conditional_volatile_fields = ('views',)
     serializer_class = BlogPostListSerializer
 
     def get_queryset(self):
+        queryset = BlogPost.objects.filter(is_published=True)
         category_slug = self.request.query_params.get('category')
         if category_slug:
-            return BlogPost.objects.filter(category__slug=category_slug, is_published=True)
-        return BlogPost.objects.filter(is_published=True)
+            queryset = queryset.filter(category__slug=category_slug)
+        return BlogPostListSerializer.card_queryset(queryset)
 
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0006_companyreview_meta_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='companyreview',
+            name='company',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='company.insurancecompany'),
+        ),
+        migrations.AddIndex(
+            model_name='companyreview',
+            index=models.Index(fields=['company', 'is_published', '-published_at'], name='review_company_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companyreview',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at'], name='review_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='insurancecompany',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='insurer_active_order_idx'),
+        ),
+    ]
@@ -24,6 +24,9 @@ class InsuranceCompany(models.Model):
         verbose_name = "Insurance Company"
         verbose_name_plural = "Insurance Companies"
         ordering = ["order", "name"]
+        indexes = [
+            models.Index(fields=["order", "name"], name="insurer_active_order_idx", condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return self.name
@@ -37,7 +40,8 @@ class HighRiskInsuranceCompany(InsuranceCompany):
 
 
 class CompanyReview(models.Model):
-    company = models.ForeignKey(InsuranceCompany, related_name="reviews", on_delete=models.CASCADE)
+    # Indexed through review_company_published_idx, which leads with company
+    company = models.ForeignKey(InsuranceCompany, related_name="reviews", on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True)
     summary = models.TextField(blank=True)
@@ -50,11 +54,18 @@ class CompanyReview(models.Model):
     meta_keywords = models.CharField(max_length=255, blank=True)
     is_published = models.BooleanField(default=True)
     published_at = models.DateTimeField(default=timezone.now)
+    # Forward-decayed views, maintained by `manage.py update_trending` (see analytics/trending.py)
+    trending_score = models.FloatField(default=0, editable=False)
 
     class Meta:
         ordering = ["-published_at"]
         verbose_name = "Company Review"
         verbose_name_plural = "Company Reviews"
+        indexes = [
+            models.Index(fields=["company", "is_published", "-published_at"], name="review_company_published_idx"),
+            models.Index(fields=["-published_at"], name="review_published_idx", condition=models.Q(is_published=True)),
+            models.Index(fields=["-trending_score", "-id"], name="review_trending_idx", condition=models.Q(is_published=True)),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
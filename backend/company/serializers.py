@@ -1,9 +1,12 @@
+from django.db.models import Count, Prefetch, Q
 from rest_framework import serializers
 from .models import InsuranceCompany, CompanyReview
 
 
 class InsuranceCompanySerializer(serializers.ModelSerializer):
+    """Insurer with its published reviews (context ``include_reviews``, default on) and a review count."""
     reviews = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
 
     class Meta:
         model = InsuranceCompany
@@ -20,13 +23,38 @@ class InsuranceCompanySerializer(serializers.ModelSerializer):
             "high_risk_blurb",
             "is_active",
             "order",
+            "review_count",
             "reviews",
         ]
 
+    @classmethod
+    def prefetch_queryset(cls, queryset, include_reviews=True, review_limit=None):
+        """Annotate review counts and batch-load up to ``review_limit`` reviews per insurer."""
+        queryset = queryset.annotate(review_count=Count("reviews", filter=Q(reviews__is_published=True)))
+        if include_reviews:
+            reviews = CompanyReview.objects.filter(is_published=True).order_by("-published_at", "-id")
+            if review_limit:
+                reviews = reviews[:review_limit]
+            queryset = queryset.prefetch_related(Prefetch("reviews", queryset=reviews, to_attr="published_reviews"))
+        return queryset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get("include_reviews", True):
+            fields.pop("reviews")
+        return fields
+
     def get_reviews(self, obj):
-        qs = obj.reviews.filter(is_published=True).order_by("-published_at")
+        qs = getattr(obj, "published_reviews", None)
+        if qs is None:
+            qs = obj.reviews.filter(is_published=True).order_by("-published_at")
         return CompanyReviewSerializer(qs, many=True, context=self.context).data
 
+    def get_review_count(self, obj):
+        if hasattr(obj, "review_count"):
+            return obj.review_count
+        return obj.reviews.filter(is_published=True).count()
+
 
 class CompanyReviewSerializer(serializers.ModelSerializer):
     company_name = serializers.CharField(source="company.name", read_only=True)
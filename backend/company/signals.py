@@ -0,0 +1,5 @@
+from backend import response_cache
+
+from .models import CompanyReview, InsuranceCompany
+
+response_cache.watch(InsuranceCompany, CompanyReview)
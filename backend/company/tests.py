@@ -1,3 +1,63 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.testing import QueryBudgetTestCase
+
+from .models import CompanyReview, InsuranceCompany
+
+
+class CompanyQueryBudgetTests(QueryBudgetTestCase):
+    def test_insurer_list(self):
+        self.assertQueryBudget('insurance-company-list')
+        self.assertQueryBudget('insurance-company-list', query='include=reviews')
+
+    def test_insurer_detail(self):
+        self.assertQueryBudget('insurance-company-detail', args=['insurer-0'])
+
+    def test_reviews(self):
+        self.assertQueryBudget('company-review-by-company', args=['insurer-0'])
+        self.assertQueryBudget('company-review-detail', args=['review-0-0'])
+        self.assertQueryBudget('company-review-popular')
+
+
+class InsurerListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.busy = InsuranceCompany.objects.create(name='Busy Mutual', slug='busy', order=0)
+        cls.quiet = InsuranceCompany.objects.create(name='Quiet Life', slug='quiet', order=1)
+        for i in range(5):
+            CompanyReview.objects.create(
+                company=cls.busy, title=f'Review {i}', slug=f'busy-{i}', content='Text',
+                published_at=now - timedelta(days=i),
+            )
+        CompanyReview.objects.create(company=cls.busy, title='Draft', slug='busy-draft', content='Text', is_published=False)
+        CompanyReview.objects.create(company=cls.quiet, title='Only', slug='quiet-0', content='Text')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_reviews_are_not_embedded_by_default(self):
+        results = self.client.get(reverse('insurance-company-list')).json()['results']
+        self.assertEqual([insurer['slug'] for insurer in results], ['busy', 'quiet'])
+        for insurer in results:
+            self.assertNotIn('reviews', insurer)
+        self.assertEqual([insurer['review_count'] for insurer in results], [5, 1])
+
+    @override_settings(COMPANY_REVIEWS_PER_INSURER=2)
+    def test_include_reviews_is_limited_per_insurer(self):
+        results = self.client.get(reverse('insurance-company-list'), {'include': 'reviews'}).json()['results']
+        busy, quiet = results
+        self.assertEqual([review['slug'] for review in busy['reviews']], ['busy-0', 'busy-1'])
+        self.assertEqual([review['slug'] for review in quiet['reviews']], ['quiet-0'])
+        # The count covers every published review, not just the embedded ones
+        self.assertEqual((busy['review_count'], quiet['review_count']), (5, 1))
+
+    def test_detail_embeds_every_published_review(self):
+        insurer = self.client.get(reverse('insurance-company-detail', args=['busy'])).json()
+        self.assertEqual(len(insurer['reviews']), 5)
+        self.assertEqual(insurer['review_count'], 5)
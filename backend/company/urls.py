@@ -3,6 +3,7 @@ from .views import (
     InsuranceCompanyListView,
     InsuranceCompanyDetailView,
     CompanyReviewByCompanyListView,
+    CompanyReviewPopularListView,
     CompanyReviewDetailView,
 )
 
@@ -10,5 +11,7 @@ urlpatterns = [
     path('insurers/', InsuranceCompanyListView.as_view(), name='insurance-company-list'),
     path('insurers/<slug:slug>/', InsuranceCompanyDetailView.as_view(), name='insurance-company-detail'),
     path('insurers/<slug:slug>/reviews/', CompanyReviewByCompanyListView.as_view(), name='company-review-by-company'),
+    # Before the detail route, which would otherwise take "popular" for a slug
+    path('reviews/popular/', CompanyReviewPopularListView.as_view(), name='company-review-popular'),
     path('reviews/<slug:slug>/', CompanyReviewDetailView.as_view(), name='company-review-detail'),
 ]
\ No newline at end of file
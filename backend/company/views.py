@@ -1,48 +1,92 @@
+from django.conf import settings
 from rest_framework import generics, filters
 from rest_framework.permissions import AllowAny
 
+from analytics.buffer import CountViewsMixin
+from backend.conditional import ConditionalGetMixin
+from backend.response_cache import CachedResponseMixin
 from .models import InsuranceCompany, CompanyReview
 from .serializers import InsuranceCompanySerializer, CompanyReviewSerializer
 
 
-class InsuranceCompanyListView(generics.ListAPIView):
+class InsuranceCompanyListView(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
+    cache_models = (InsuranceCompany, CompanyReview)
     serializer_class = InsuranceCompanySerializer
     permission_classes = [AllowAny]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["name", "description"]
     ordering_fields = ["order", "name"]
 
+    def include_reviews(self):
+        # Reviews are embedded only on request: ?include=reviews
+        return "reviews" in self.request.query_params.get("include", "").split(",")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_reviews"] = self.include_reviews()
+        return context
+
     def get_queryset(self):
         qs = InsuranceCompany.objects.filter(is_active=True)
         # Optional filter: high-risk recommendations
         recommended = self.request.query_params.get("high_risk_recommended")
         if recommended in ["1", "true", "True"]:
             qs = qs.filter(is_high_risk_recommended=True)
+        qs = InsuranceCompanySerializer.prefetch_queryset(
+            qs, include_reviews=self.include_reviews(), review_limit=settings.COMPANY_REVIEWS_PER_INSURER
+        )
         return qs.order_by("order", "name")
 
 
-class InsuranceCompanyDetailView(generics.RetrieveAPIView):
+class InsuranceCompanyDetailView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    cache_models = (InsuranceCompany, CompanyReview)
     serializer_class = InsuranceCompanySerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
 
     def get_queryset(self):
-        return InsuranceCompany.objects.filter(is_active=True)
+        return InsuranceCompanySerializer.prefetch_queryset(InsuranceCompany.objects.filter(is_active=True))
 
 
-class CompanyReviewByCompanyListView(generics.ListAPIView):
+class CompanyReviewByCompanyListView(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
+    cache_models = (InsuranceCompany, CompanyReview)
     serializer_class = CompanyReviewSerializer
     permission_classes = [AllowAny]
 
     def get_queryset(self):
         company_slug = self.kwargs.get("slug")
-        return CompanyReview.objects.filter(is_published=True, company__slug=company_slug).order_by("-published_at")
+        return (
+            CompanyReview.objects.filter(is_published=True, company__slug=company_slug)
+            .select_related("company")
+            .order_by("-published_at")
+        )
+
+
+class CompanyReviewPopularListView(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
+    """Published reviews across insurers, most trending first"""
+    cache_models = (InsuranceCompany, CompanyReview)
+    conditional_volatile_fields = ("trending_score",)
+    serializer_class = CompanyReviewSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        return (
+            CompanyReview.objects.filter(is_published=True)
+            .select_related("company")
+            .order_by("-trending_score", "-id")
+        )
+
+    def uses_page_validators(self, queryset):
+        # Pages come off review_trending_idx; an aggregate over every review would precede them
+        return True
 
 
-class CompanyReviewDetailView(generics.RetrieveAPIView):
+class CompanyReviewDetailView(CountViewsMixin, CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    cache_models = (InsuranceCompany, CompanyReview)
     serializer_class = CompanyReviewSerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
+    view_counter_label = "company.CompanyReview"
 
     def get_queryset(self):
-        return CompanyReview.objects.filter(is_published=True)
+        return CompanyReview.objects.filter(is_published=True).select_related("company")
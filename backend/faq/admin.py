@@ -11,9 +11,13 @@ class FAQCategoryAdmin(admin.ModelAdmin):
     list_editable = ['order', 'is_active']
     ordering = ['order', 'name']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_faq_count()
+
     def get_faq_count(self, obj):
         return obj.get_faq_count()
     get_faq_count.short_description = 'FAQ Count'
+    get_faq_count.admin_order_field = 'published_faq_count'
 
 
 @admin.register(FAQ)
@@ -23,7 +27,7 @@ class FAQAdmin(admin.ModelAdmin):
     search_fields = ['question', 'answer', 'short_answer', 'tags']
     prepopulated_fields = {'slug': ('question',)}
     list_editable = ['priority', 'is_published', 'is_featured', 'order']
-    ordering = ['category__order', 'order', '-created_at']
+    ordering = ['category_order', 'order', '-created_at']
     readonly_fields = ['views', 'helpful_count', 'not_helpful_count', 'created_at', 'updated_at']
     
     fieldsets = (
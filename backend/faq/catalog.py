@@ -0,0 +1,32 @@
+"""
+Cached published-FAQ counts per category.
+
+Nested category data on every FAQ needs a count, so the counts for all
+categories are read with one grouped query and kept in the cache until an FAQ
+is saved or deleted (see faq/signals.py).
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+CACHE_KEY = 'faq:category-counts'
+CACHE_TIMEOUT = 60 * 60
+
+
+def get_faq_counts():
+    """Return ``{category_id: published FAQ count}``."""
+    counts = cache.get(CACHE_KEY)
+    if counts is None:
+        from .models import FAQ
+
+        counts = dict(
+            FAQ.objects.filter(is_published=True)
+            .order_by()
+            .values_list('category_id')
+            .annotate(total=Count('id'))
+        )
+        cache.set(CACHE_KEY, counts, CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
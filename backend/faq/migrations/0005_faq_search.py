@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:42
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from backend.db_operations import PostgresOnly
+
+
+def populate_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from faq.search import SEARCH_VECTOR
+    FAQ = apps.get_model('faq', 'FAQ')
+    FAQ.objects.update(search_vector=SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0004_faq_meta_description_faq_meta_keywords_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='faq',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(
+            migrations.AddIndex(
+                model_name='faq',
+                index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='faq_search_vector_gin'),
+            ),
+        ),
+        PostgresOnly(
+            migrations.AddIndex(
+                model_name='faq',
+                index=django.contrib.postgres.indexes.GinIndex(fields=['question'], name='faq_question_trgm', opclasses=['gin_trgm_ops']),
+            ),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
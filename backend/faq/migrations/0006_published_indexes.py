@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0005_faq_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='faq',
+            name='category',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='faqs', to='faq.faqcategory'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['category', 'is_published', 'order', '-created_at'], name='faq_category_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at'], name='faq_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-views', '-helpful_count'], name='faq_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faqcategory',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='faqcategory_active_idx'),
+        ),
+    ]
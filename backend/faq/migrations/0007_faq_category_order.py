@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+def copy_category_order(apps, schema_editor):
+    FAQ = apps.get_model('faq', 'FAQ')
+    FAQCategory = apps.get_model('faq', 'FAQCategory')
+    FAQ.objects.update(
+        category_order=models.Subquery(FAQCategory.objects.filter(pk=models.OuterRef('category_id')).values('order')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0006_published_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='faq',
+            options={'ordering': ['category_order', 'order', '-created_at'], 'verbose_name': 'FAQ', 'verbose_name_plural': 'FAQs'},
+        ),
+        migrations.RemoveIndex(
+            model_name='faq',
+            name='faq_category_published_idx',
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='category_order',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(copy_category_order, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category_order', 'order', '-created_at', 'id'], name='faq_published_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['category', 'is_published', 'category_order', 'order', '-created_at'], name='faq_category_published_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0007_faq_category_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faq',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-trending_score', '-id'], name='faq_trending_idx'),
+        ),
+    ]
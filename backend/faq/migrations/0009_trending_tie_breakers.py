@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0008_trending_score'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='faq',
+            name='faq_popular_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='faq',
+            name='faq_trending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-trending_score', '-views', '-helpful_count', '-id'], name='faq_trending_idx'),
+        ),
+    ]
@@ -1,7 +1,19 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from ckeditor_uploader.fields import RichTextUploadingField
 
+from .catalog import get_faq_counts
+from .search import update_search_vector
+
+
+class FAQCategoryQuerySet(models.QuerySet):
+    def with_faq_count(self):
+        return self.annotate(
+            published_faq_count=models.Count('faqs', filter=models.Q(faqs__is_published=True))
+        )
+
 
 class FAQCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -13,10 +25,15 @@ class FAQCategory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FAQCategoryQuerySet.as_manager()
+
     class Meta:
         ordering = ['order', 'name']
         verbose_name = "FAQ Category"
         verbose_name_plural = "FAQ Categories"
+        indexes = [
+            models.Index(fields=['order', 'name'], name='faqcategory_active_idx', condition=models.Q(is_active=True)),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -27,7 +44,9 @@ class FAQCategory(models.Model):
         return self.name
 
     def get_faq_count(self):
-        return self.faqs.filter(is_published=True).count()
+        if hasattr(self, 'published_faq_count'):
+            return self.published_faq_count
+        return get_faq_counts().get(self.pk, 0)
 
 
 class FAQ(models.Model):
@@ -41,7 +60,8 @@ class FAQ(models.Model):
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     answer = RichTextUploadingField()
     short_answer = models.TextField(max_length=300, blank=True, help_text="Brief answer for listings")
-    category = models.ForeignKey(FAQCategory, on_delete=models.CASCADE, related_name='faqs')
+    # Indexed through faq_category_published_idx, which leads with category
+    category = models.ForeignKey(FAQCategory, on_delete=models.CASCADE, related_name='faqs', db_index=False)
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
     tags = models.CharField(max_length=255, blank=True, help_text="Comma-separated tags")
     is_published = models.BooleanField(default=True)
@@ -49,7 +69,12 @@ class FAQ(models.Model):
     views = models.PositiveIntegerField(default=0)
     helpful_count = models.PositiveIntegerField(default=0)
     not_helpful_count = models.PositiveIntegerField(default=0)
+    # Forward-decayed views and votes, maintained by `manage.py update_trending` (see analytics/trending.py)
+    trending_score = models.FloatField(default=0, editable=False)
     order = models.PositiveIntegerField(default=0, help_text="Order within category")
+    # Copy of category.order so lists sort without joining FAQCategory; kept in
+    # sync by save() and, when a category is reordered, by faq/signals.py
+    category_order = models.PositiveIntegerField(default=0, editable=False)
     # Author bio fields (optional per FAQ)
     author_name = models.CharField(max_length=100, blank=True)
     author_bio = models.TextField(blank=True)
@@ -60,16 +85,45 @@ class FAQ(models.Model):
     meta_keywords = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted full-text document, maintained by save() on PostgreSQL (see faq/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
-        ordering = ['category__order', 'order', '-created_at']
+        ordering = ['category_order', 'order', '-created_at']
         verbose_name = "FAQ"
         verbose_name_plural = "FAQs"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='faq_search_vector_gin'),
+            GinIndex(fields=['question'], name='faq_question_trgm', opclasses=['gin_trgm_ops']),
+            # Public list in display order; id breaks ties for keyset paging
+            models.Index(
+                fields=['category_order', 'order', '-created_at', 'id'], name='faq_published_order_idx',
+                condition=models.Q(is_published=True),
+            ),
+            # Category pages: equality on category and is_published, rows come out in display order
+            models.Index(
+                fields=['category', 'is_published', 'category_order', 'order', '-created_at'],
+                name='faq_category_published_idx',
+            ),
+            models.Index(fields=['-created_at'], name='faq_recent_idx', condition=models.Q(is_published=True)),
+            # Popular FAQs: trending first, then lifetime views and votes for FAQs with no recent views
+            models.Index(
+                fields=['-trending_score', '-views', '-helpful_count', '-id'], name='faq_trending_idx',
+                condition=models.Q(is_published=True),
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.question)
+        update_fields = kwargs.get('update_fields')
+        if self.category_id is not None and (update_fields is None or 'category' in update_fields):
+            self.category_order = self.category.order
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'category_order'}
         super().save(*args, **kwargs)
+        if update_fields is None or {'question', 'answer', 'short_answer', 'tags'} & set(update_fields):
+            update_search_vector(FAQ.objects.filter(pk=self.pk))
 
     def __str__(self):
         return self.question
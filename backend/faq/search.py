@@ -0,0 +1,72 @@
+"""
+Ranked FAQ search.
+
+On PostgreSQL an FAQ matches when its weighted ``search_vector`` (question >
+tags, short answer > answer) matches the query, or when the question is a
+trigram word match for it, which tolerates typos in as-you-type searches.
+Both predicates are backed by GIN indexes. SQLite gets a weighted
+``icontains`` score so the endpoint ranks the same way locally, but every
+word must appear verbatim: typo tolerance (``?q=premum`` finding "premium")
+needs PostgreSQL with ``pg_trgm``.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Coalesce
+
+SEARCH_CONFIG = 'english'
+
+SEARCH_VECTOR = (
+    SearchVector('question', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('tags', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('short_answer', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('answer', weight='C', config=SEARCH_CONFIG)
+)
+
+# Share of the question's trigram similarity added to the full-text rank
+TRIGRAM_WEIGHT = 0.5
+
+# Per-field weights for the SQLite fallback score
+FALLBACK_WEIGHTS = {
+    'question': 4.0,
+    'tags': 2.0,
+    'short_answer': 2.0,
+    'answer': 1.0,
+}
+
+
+def postgres_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def update_search_vector(queryset):
+    """Recompute ``search_vector`` for every FAQ in ``queryset``."""
+    if not postgres_enabled():
+        return 0
+    return queryset.update(search_vector=SEARCH_VECTOR)
+
+
+def search_faqs(queryset, terms):
+    """Filter ``queryset`` to FAQs matching ``terms``, annotated with ``relevance``."""
+    if postgres_enabled():
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(
+            Q(search_vector=query) | Q(question__trigram_word_similar=terms)
+        ).annotate(
+            relevance=(
+                Coalesce(SearchRank(F('search_vector'), query), Value(0.0))
+                + TrigramWordSimilarity(terms, 'question') * TRIGRAM_WEIGHT
+            ),
+        )
+
+    words = terms.split()
+    match = Q()
+    score = Value(0.0)
+    for word in words:
+        word_match = Q()
+        for field, weight in FALLBACK_WEIGHTS.items():
+            lookup = Q(**{f'{field}__icontains': word})
+            word_match |= lookup
+            score = score + Case(When(lookup, then=Value(weight)), default=Value(0.0), output_field=FloatField())
+        match &= word_match
+    return queryset.filter(match).annotate(relevance=score / (len(words) * sum(FALLBACK_WEIGHTS.values())))
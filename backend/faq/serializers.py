@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from backend.client_ip import get_client_ip
+from related.serializers import related_content
 from .models import FAQ, FAQCategory, FAQFeedback
 
 
@@ -36,10 +38,18 @@ class FAQListSerializer(serializers.ModelSerializer):
         return obj.get_helpfulness_percentage()
 
 
+class FAQSearchResultSerializer(FAQListSerializer):
+    relevance = serializers.FloatField(read_only=True)
+
+    class Meta(FAQListSerializer.Meta):
+        fields = FAQListSerializer.Meta.fields + ('relevance',)
+
+
 class FAQDetailSerializer(serializers.ModelSerializer):
     category = FAQCategorySerializer(read_only=True)
     tags_list = serializers.SerializerMethodField()
     helpfulness_percentage = serializers.SerializerMethodField()
+    related = serializers.SerializerMethodField()
 
     class Meta:
         model = FAQ
@@ -49,7 +59,7 @@ class FAQDetailSerializer(serializers.ModelSerializer):
             'views', 'helpful_count', 'not_helpful_count', 
             'author_name', 'author_bio', 'author_image',
             'meta_title', 'meta_description', 'meta_keywords',
-            'helpfulness_percentage', 'created_at', 'updated_at'
+            'helpfulness_percentage', 'created_at', 'updated_at', 'related'
         )
 
     def get_tags_list(self, obj):
@@ -58,24 +68,20 @@ class FAQDetailSerializer(serializers.ModelSerializer):
     def get_helpfulness_percentage(self, obj):
         return obj.get_helpfulness_percentage()
 
+    def get_related(self, obj):
+        # Precomputed by `manage.py build_related` (see related/builder.py)
+        return related_content(obj, self.context)
+
 
 class FAQFeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = FAQFeedback
         fields = ('id', 'faq', 'is_helpful', 'comment', 'created_at')
-        read_only_fields = ('ip_address', 'created_at')
+        read_only_fields = ('faq', 'ip_address', 'created_at')  # faq comes from the URL
 
     def create(self, validated_data):
         # Get IP address from request
         request = self.context.get('request')
         if request:
-            validated_data['ip_address'] = self.get_client_ip(request)
-        return super().create(validated_data)
-
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+            validated_data['ip_address'] = get_client_ip(request)
+        return super().create(validated_data)
\ No newline at end of file
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend import response_cache
+
+from . import catalog
+from .models import FAQ, FAQCategory
+
+response_cache.watch(FAQ, FAQCategory)
+
+
+@receiver([post_save, post_delete], sender=FAQ)
+def invalidate_category_counts(sender, **kwargs):
+    catalog.invalidate()
+
+
+@receiver(post_save, sender=FAQCategory)
+def sync_category_order(sender, instance, created, **kwargs):
+    """Copy a changed category order onto its FAQs' ``category_order`` sort key."""
+    if not created:
+        FAQ.objects.filter(category=instance).exclude(category_order=instance.order).update(
+            category_order=instance.order,
+        )
@@ -1,3 +1,157 @@
+import base64
+import json
+from datetime import timedelta
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.testing import QueryBudgetTestCase
+
+from .models import FAQ, FAQCategory
+from .search import FALLBACK_WEIGHTS
+
+
+class FAQQueryBudgetTests(QueryBudgetTestCase):
+    def test_lists(self):
+        for url_name in ('faq-list', 'faq-popular', 'faq-featured', 'faq-recent', 'faq-category-list', 'recent-content'):
+            self.assertQueryBudget(url_name)
+        self.assertQueryBudget('faq-category-faqs', args=['faq-category-0'])
+        self.assertQueryBudget('faq-search', query='q=question')
+
+    def test_detail(self):
+        self.assertQueryBudget('faq-detail', args=[FAQ.objects.first().slug])
+
+
+class FAQCategoryOrderTests(QueryBudgetTestCase):
+    def test_sorting_does_not_join_categories(self):
+        self.assertNotIn('JOIN', str(FAQ.objects.all().query))
+
+    def test_reordering_a_category_moves_its_faqs(self):
+        first, last = FAQCategory.objects.get(order=0), FAQCategory.objects.get(order=3)
+        first.order, last.order = 3, 0
+        first.save()
+        last.save()
+
+        self.assertEqual(set(last.faqs.values_list('category_order', flat=True)), {0})
+        results = self.client.get(reverse('faq-list')).json()['results']
+        self.assertEqual(results[0]['category']['id'], last.pk)
+
+    def test_moving_a_faq_copies_the_category_order(self):
+        faq = FAQ.objects.filter(category__order=0).first()
+        faq.category = FAQCategory.objects.get(order=3)
+        faq.save(update_fields=['category'])
+        faq.refresh_from_db()
+        self.assertEqual(faq.category_order, 3)
+
+
+@skipIf(connection.vendor == 'postgresql', 'PostgreSQL ranks through the search vector and trigrams')
+class FAQSearchFallbackTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = FAQCategory.objects.create(name='Auto')
+        for slug, fields in (
+            ('in-answer', {'answer': 'Your premium can change at renewal.', 'views': 50}),
+            ('in-tags', {'tags': 'premium, discounts', 'views': 5}),
+            ('in-question', {'question': 'Why did my premium go up?'}),
+            ('in-short-answer', {'short_answer': 'A higher deductible lowers the premium.', 'views': 10}),
+            ('unrelated', {'answer': 'Flood damage needs separate cover.', 'views': 100}),
+        ):
+            FAQ.objects.create(**{'question': f'Question {slug}', 'answer': 'Answer', 'category': category, 'slug': slug, **fields})
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, terms):
+        return self.client.get(reverse('faq-search'), {'q': terms}).json()['results']
+
+    def test_fields_are_weighted(self):
+        results = self.search('premium')
+        # Tags and short answer weigh the same, so views break the tie
+        self.assertEqual(
+            [faq['slug'] for faq in results],
+            ['in-question', 'in-short-answer', 'in-tags', 'in-answer'],
+        )
+        total = sum(FALLBACK_WEIGHTS.values())
+        self.assertAlmostEqual(results[0]['relevance'], FALLBACK_WEIGHTS['question'] / total)
+        self.assertAlmostEqual(results[-1]['relevance'], FALLBACK_WEIGHTS['answer'] / total)
+
+    def test_every_word_must_match(self):
+        results = self.search('deductible premium')
+        self.assertEqual([faq['slug'] for faq in results], ['in-short-answer'])
+
+    def test_no_typo_tolerance(self):
+        # Only the PostgreSQL trigram match finds "premium" for "premum"
+        self.assertEqual(self.search('premum'), [])
+
+    def test_empty_query(self):
+        self.assertEqual(self.search('  '), [])
+
+
+class FAQKeysetPaginationTests(TestCase):
+    """``?pagination=cursor`` over the mixed-direction display ordering."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [FAQCategory.objects.create(name=f'Category {i}', order=i) for i in range(2)]
+        now = timezone.now()
+        for i in range(23):
+            faq = FAQ.objects.create(
+                question=f'Question {i}', slug=f'faq-{i}', answer='Answer',
+                category=categories[i % 2], order=i % 3,
+            )
+            # Only two distinct timestamps, so whole runs tie on (category_order, order, created_at)
+            FAQ.objects.filter(pk=faq.pk).update(created_at=now - timedelta(days=i % 2))
+        cls.expected = list(
+            FAQ.objects.order_by('category_order', 'order', '-created_at', 'id').values_list('slug', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertNotIn('count', body)
+        return body
+
+    def test_page_numbers_by_default(self):
+        body = self.client.get(reverse('faq-list')).json()
+        self.assertEqual(body['count'], 23)
+        self.assertEqual([faq['slug'] for faq in body['results']], self.expected[:10])
+
+    def test_next_and_previous_walk_every_row_once(self):
+        pages = [self.get_page(reverse('faq-list') + '?pagination=cursor')]
+        self.assertIsNone(pages[0]['previous'])
+        while pages[-1]['next']:
+            pages.append(self.get_page(pages[-1]['next']))
+        slugs = [faq['slug'] for page in pages for faq in page['results']]
+        self.assertEqual(slugs, self.expected)
+        self.assertEqual(len(pages), 3)
+
+        # Back from the last page through the previous links
+        page = pages[-1]
+        for earlier in reversed(pages[:-1]):
+            page = self.get_page(page['previous'])
+            self.assertEqual(page['results'], earlier['results'])
+        self.assertIsNone(page['previous'])
+
+    def test_invalid_cursor_is_not_found(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
 
-# Create your tests here.
+        for cursor in (
+            'not a cursor',
+            encode([1, 2]),
+            encode({'v': [0, 0]}),
+            encode({'v': [None, None, None, None]}),
+            encode({'v': [0, 0, 'yesterday', 1]}),
+            encode({'v': ['zero', 0, timezone.now().isoformat(), 1]}),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('faq-list'), {'pagination': 'cursor', 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
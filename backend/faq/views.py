@@ -3,18 +3,31 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, F
+from django.conf import settings
+from django.http import Http404
+from analytics.buffer import CountViewsMixin
+from analytics.rollup import get_config as get_rollup_config, with_recent_views
+from analytics.feedback import DUPLICATE, NOT_FOUND, record_vote
 from .models import FAQ, FAQCategory, FAQFeedback
 from .serializers import (
     FAQListSerializer, 
     FAQDetailSerializer, 
     FAQCategorySerializer,
-    FAQFeedbackSerializer
+    FAQFeedbackSerializer,
+    FAQSearchResultSerializer
 )
-
-
-class FAQCategoryViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = FAQCategory.objects.filter(is_active=True)
+from .search import search_faqs
+from backend.pagination import KeysetPagination
+from backend.client_ip import get_client_ip
+from backend.conditional import ConditionalGetMixin
+from backend.ordering import OrderingFilter
+from backend.response_cache import CachedResponseMixin
+from backend.throttling import FeedbackThrottle
+
+
+class FAQCategoryViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = (FAQCategory, FAQ)
+    queryset = FAQCategory.objects.filter(is_active=True).with_faq_count().order_by('order', 'name')
     serializer_class = FAQCategorySerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
@@ -26,20 +39,28 @@ class FAQCategoryViewSet(viewsets.ReadOnlyModelViewSet):
         faqs = FAQ.objects.filter(
             category=category, 
             is_published=True
-        ).order_by('order', '-created_at')
-        
+        ).select_related('category').order_by('order', '-created_at')
+        self.check_not_modified(faqs)
+
         serializer = FAQListSerializer(faqs, many=True, context={'request': request})
         return Response(serializer.data)
 
 
-class FAQViewSet(viewsets.ReadOnlyModelViewSet):
+class FAQViewSet(CountViewsMixin, CachedResponseMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = (FAQ, FAQCategory)
+    view_counter_label = 'faq.FAQ'
+    conditional_volatile_fields = ('views', 'helpful_count', 'trending_score')
+    conditional_row_orderings = ('trending',)  # an index scan; no aggregate over every FAQ first
     queryset = FAQ.objects.filter(is_published=True).select_related('category')
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination  # ?pagination=cursor for keyset paging
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, OrderingFilter]
     filterset_fields = ['category__slug', 'priority', 'is_featured']
     search_fields = ['question', 'answer', 'short_answer', 'tags']
-    ordering_fields = ['created_at', 'views', 'helpful_count']
-    ordering = ['category__order', 'order', '-created_at']
+    ordering_fields = ['created_at', 'views', 'helpful_count', 'trending']
+    # Most trending first; lifetime views and votes order FAQs without recent views (faq_trending_idx)
+    ordering_aliases = {'trending': ('-trending_score', '-views', '-helpful_count', '-id')}
+    ordering = ['category_order', 'order', '-created_at']
     lookup_field = 'slug'
 
     def list(self, request, *args, **kwargs):
@@ -47,11 +68,6 @@ class FAQViewSet(viewsets.ReadOnlyModelViewSet):
         response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
         return response
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
-        response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
-        return response
-
     def get_serializer_class(self):
         if self.action == 'list':
             return FAQListSerializer
@@ -77,20 +93,21 @@ class FAQViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset.select_related('category')
 
+    def count_views_deferred(self):
+        return settings.FAQ_DEFERRED_VIEWS
+
     def retrieve(self, request, *args, **kwargs):
-        """Override retrieve to increment view count"""
-        instance = self.get_object()
-        # Increment view count
-        FAQ.objects.filter(pk=instance.pk).update(views=F('views') + 1)
-        # Refresh instance to get updated view count
-        instance.refresh_from_db()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        response = super().retrieve(request, *args, **kwargs)
+        if self.count_views_deferred():
+            response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
+        return response
 
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured FAQs"""
-        faqs = self.get_queryset().filter(is_featured=True)[:10]
+        faqs = self.get_queryset().filter(is_featured=True)
+        self.check_not_modified(faqs)
+        faqs = faqs[:10]
         serializer = FAQListSerializer(faqs, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -98,83 +115,103 @@ class FAQViewSet(viewsets.ReadOnlyModelViewSet):
     def recent(self, request):
         """Get recent FAQs"""
         limit = int(request.query_params.get('limit', 5))
-        faqs = self.get_queryset().order_by('-created_at')[:limit]
+        faqs = self.get_queryset()
+        self.check_not_modified(faqs)
+        faqs = faqs.order_by('-created_at')[:limit]
         serializer = FAQListSerializer(faqs, many=True, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def popular(self, request):
-        """Get popular FAQs based on views"""
+        """Get popular FAQs by trending score; ``?days=N`` ranks by the views of the last N days"""
         limit = int(request.query_params.get('limit', 10))
-        faqs = self.get_queryset().order_by('-views', '-helpful_count')[:limit]
+        days = request.query_params.get('days')
+        if days is not None:
+            if not days.isdecimal() or int(days) < 1:
+                return Response({'error': 'days must be a positive whole number'}, status=status.HTTP_400_BAD_REQUEST)
+            # Older rollups are gone, so a longer window would only pretend to cover more
+            days = min(int(days), get_rollup_config()['RETENTION_DAYS'])
+        faqs = self.get_queryset()
+        if days:
+            # Ranked from the daily rollups, which change without touching the FAQ rows
+            faqs = with_recent_views(faqs, days).order_by('-recent_views', '-views')[:limit]
+        else:
+            # One scan of faq_trending_idx; the ETag comes from the rows it returns
+            faqs = list(faqs.order_by('-trending_score', '-views', '-helpful_count', '-id')[:limit])
+            self.check_rows_not_modified(faqs)
         serializer = FAQListSerializer(faqs, many=True, context={'request': request})
         return Response(serializer.data)
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_classes=[FeedbackThrottle])
     def feedback(self, request, slug=None):
         """Submit feedback for an FAQ"""
-        faq = self.get_object()
-        serializer = FAQFeedbackSerializer(data=request.data, context={'request': request})
-        
-        if serializer.is_valid():
-            try:
-                feedback = serializer.save(faq=faq)
-                
-                # Update FAQ helpful counts
-                if feedback.is_helpful:
-                    FAQ.objects.filter(pk=faq.pk).update(helpful_count=F('helpful_count') + 1)
-                else:
-                    FAQ.objects.filter(pk=faq.pk).update(not_helpful_count=F('not_helpful_count') + 1)
-                
-                return Response(
-                    {'message': 'Feedback submitted successfully'}, 
-                    status=status.HTTP_201_CREATED
-                )
-            except Exception as e:
-                return Response(
-                    {'error': 'You have already provided feedback for this FAQ'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-
-class FAQSearchView(generics.ListAPIView):
-    serializer_class = FAQListSerializer
+        serializer = FAQFeedbackSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = record_vote(
+            FAQ.objects.filter(slug=slug, is_published=True), FAQFeedback, 'faq',
+            key=slug, ip_address=get_client_ip(request), **serializer.validated_data,
+        )
+        if result == NOT_FOUND:
+            raise Http404
+        if result == DUPLICATE:
+            return Response(
+                {'error': 'You have already provided feedback for this FAQ'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            {'message': 'Feedback submitted successfully'},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class FAQSearchView(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
+    """Relevance-ranked FAQ search (see faq/search.py)"""
+    cache_models = (FAQ, FAQCategory)
+    serializer_class = FAQSearchResultSerializer
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        query = self.request.query_params.get('q', '')
+        query = self.request.query_params.get('q', '').strip()
         if query:
-            return FAQ.objects.filter(
-                Q(question__icontains=query) |
-                Q(answer__icontains=query) |
-                Q(short_answer__icontains=query) |
-                Q(tags__icontains=query),
-                is_published=True
-            ).select_related('category').order_by('-views', '-created_at')
+            queryset = FAQ.objects.filter(is_published=True).select_related('category')
+            return search_faqs(queryset, query).order_by('-relevance', '-views', '-created_at')
         return FAQ.objects.none()
 
 
-class RecentContentView(generics.ListAPIView):
+def get_recent_content(request):
+    """Recent blogs and FAQs for the footer"""
+    from blog.models import BlogPost
+    from blog.serializers import BlogPostListSerializer
+
+    # Get recent blogs
+    recent_blogs = BlogPostListSerializer.card_queryset(
+        BlogPost.objects.filter(is_published=True).order_by('-published_at')
+    )[:3]
+    blog_serializer = BlogPostListSerializer(recent_blogs, many=True, context={'request': request})
+
+    # Get recent FAQs
+    recent_faqs = FAQ.objects.filter(is_published=True).select_related('category').order_by('-created_at')[:3]
+    faq_serializer = FAQListSerializer(recent_faqs, many=True, context={'request': request})
+
+    return {
+        'recent_blogs': blog_serializer.data,
+        'recent_faqs': faq_serializer.data
+    }
+
+
+class RecentContentView(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
     """Combined view for recent blogs and FAQs for footer"""
+    cache_models = ('blog.BlogPost', 'blog.Category', FAQ, FAQCategory)
     permission_classes = [AllowAny]
 
     def list(self, request, *args, **kwargs):
         from blog.models import BlogPost
-        from blog.serializers import BlogPostListSerializer
-        
-        # Get recent blogs
-        recent_blogs = BlogPost.objects.filter(is_published=True).order_by('-published_at')[:3]
-        blog_serializer = BlogPostListSerializer(recent_blogs, many=True, context={'request': request})
-        
-        # Get recent FAQs
-        recent_faqs = FAQ.objects.filter(is_published=True).order_by('-created_at')[:3]
-        faq_serializer = FAQListSerializer(recent_faqs, many=True, context={'request': request})
-        
-        resp = Response({
-            'recent_blogs': blog_serializer.data,
-            'recent_faqs': faq_serializer.data
-        })
+        self.check_not_modified(
+            BlogPost.objects.filter(is_published=True),
+            FAQ.objects.filter(is_published=True),
+        )
+        resp = Response(get_recent_content(request))
         resp['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
         return resp
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.db.models import Max
+from django.utils import timezone
 
 from .models import (
     GuideMenuPage,
@@ -8,6 +9,7 @@ from .models import (
     StaticPage,
     CompanyInfo,
     ContactSubmission,
+    OutboundEmail,
 )
 from django.db.models import Q
 
@@ -202,4 +204,18 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
     list_filter = ['inquiry_type', 'is_read', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
     list_editable = ['is_read']
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'last_error']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status__in=['sent', 'sending']).update(status='pending', next_attempt_at=timezone.now())
+        self.message_user(request, f'{updated} email(s) queued for another attempt.')
+    retry_now.short_description = 'Retry selected emails now'
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class PagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'pages'
\ No newline at end of file
+    name = 'pages'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.query_plans import PLAN_CHECKS, analyze, check_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the published-content list queries and fail when one does not use its index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('checks', nargs='*', help='Only run these checks (default: all)')
+        parser.add_argument(
+            '--min-rows', type=int, default=1000,
+            help='Skip checks on tables with fewer rows; small tables are legitimately sequential-scanned',
+        )
+        parser.add_argument('--no-analyze', action='store_true', help='Do not refresh planner statistics first')
+        parser.add_argument('--show-plans', action='store_true', help='Print every plan, not only failing ones')
+
+    def handle(self, *args, **options):
+        unknown = set(options['checks']) - {check.name for check in PLAN_CHECKS}
+        if unknown:
+            raise CommandError(f"Unknown checks: {', '.join(sorted(unknown))}")
+        if not options['no_analyze']:
+            from blog.models import BlogPost, Category
+            from company.models import CompanyReview, InsuranceCompany
+            from faq.models import FAQ, FAQCategory
+            analyze([BlogPost, Category, FAQ, FAQCategory, CompanyReview, InsuranceCompany])
+
+        results = check_plans(min_rows=options['min_rows'], only=options['checks'])
+        for result in results:
+            if result.status == 'ok':
+                line = self.style.SUCCESS(f'ok       {result.name}')
+            elif result.status == 'skipped':
+                line = self.style.WARNING(f'skipped  {result.name} ({result.detail})')
+            else:
+                line = self.style.ERROR(f'FAILED   {result.name}: {result.detail}')
+            self.stdout.write(line)
+            if result.plan and (options['show_plans'] or result.status == 'failed'):
+                self.stdout.write('    ' + result.plan.replace('\n', '\n    '))
+
+        failed = [result.name for result in results if result.status == 'failed']
+        if failed:
+            raise CommandError(f"{len(failed)} queries do not use their index: {', '.join(failed)}")
@@ -0,0 +1,325 @@
+import ipaddress
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.catalog import build_paths
+from blog.models import BlogFeedback, BlogPost, Category
+from company.models import CompanyReview, InsuranceCompany
+from faq.models import FAQ, FAQCategory, FAQFeedback
+
+WORDS = (
+    "insurance coverage policy premium deductible driver vehicle claim liability collision comprehensive "
+    "quote rate discount state accident record credit score teen senior commute mileage garage theft "
+    "uninsured motorist bodily injury property damage medical payments roadside rental reimbursement "
+    "bundle home renters umbrella agent carrier underwriting risk profile license violation ticket "
+    "speeding insurer review rating customer service financial strength complaint ratio savings monthly "
+    "annual payment plan online app telematics usage based safe driving lease loan gap full minimum"
+).split()
+
+BATCH_SIZE = 2000
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep explicit auto_now/auto_now_add values for spread-out dates."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Generate a large synthetic dataset (categories, posts, FAQs, feedback, insurers, reviews) for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help='RNG seed; the same seed gives the same data')
+        parser.add_argument('--prefix', default='gen', help='Slug/name prefix marking generated rows')
+        parser.add_argument('--categories', type=int, default=50, help='Blog subcategories (spread over 5 main categories)')
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--post-size', type=int, default=6000, help='Median rich-text size of a post in bytes')
+        parser.add_argument('--blog-feedback', type=int, default=100000)
+        parser.add_argument('--faq-categories', type=int, default=12)
+        parser.add_argument('--faqs', type=int, default=2000)
+        parser.add_argument('--faq-feedback', type=int, default=20000)
+        parser.add_argument('--insurers', type=int, default=200)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--days', type=int, default=5 * 365, help='Spread publish dates over this many days')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--flush', action='store_true', help='Delete rows generated earlier with the same prefix first')
+        parser.add_argument(
+            '--skip-search-vectors', action='store_true',
+            help='Leave search vectors empty on PostgreSQL (blog posts can be refilled with rebuild_search_index)',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.days = options['days']
+        self.now = timezone.now()
+        self.paragraphs = [self.paragraph() for _ in range(500)]
+
+        if options['flush']:
+            self.flush()
+        elif BlogPost.objects.filter(slug__startswith=f'{self.prefix}-').exists():
+            raise CommandError(f"Rows with prefix '{self.prefix}' already exist; use --flush or another --prefix")
+
+        started = time.monotonic()
+        with manual_timestamps(BlogPost, FAQCategory, FAQ, BlogFeedback, FAQFeedback, InsuranceCompany):
+            category_ids = self.create_categories(options['categories'])
+            post_ids = self.create_posts(options['posts'], category_ids, options['post_size'])
+            self.create_feedback(BlogFeedback, 'blog_post_id', post_ids, options['blog_feedback'])
+            faq_category_ids = self.create_faq_categories(options['faq_categories'])
+            faq_ids = self.create_faqs(options['faqs'], faq_category_ids)
+            self.create_feedback(FAQFeedback, 'faq_id', faq_ids, options['faq_feedback'])
+            insurer_ids = self.create_insurers(options['insurers'])
+            self.create_reviews(options['reviews'], insurer_ids)
+
+        self.update_counters(BlogPost, 'feedback', post_ids)
+        self.update_counters(FAQ, 'feedback', faq_ids)
+        if not options['skip_search_vectors']:
+            self.update_search_vectors()
+        self.invalidate_caches()
+        self.stdout.write(self.style.SUCCESS(f"Dataset generated in {time.monotonic() - started:.1f}s"))
+
+    # Text and dates
+
+    def words(self, count):
+        return ' '.join(self.rng.choices(WORDS, k=count))
+
+    def sentence(self):
+        return self.words(self.rng.randint(8, 20)).capitalize() + '.'
+
+    def paragraph(self):
+        return '<p>' + ' '.join(self.sentence() for _ in range(self.rng.randint(3, 7))) + '</p>'
+
+    def rich_text(self, median_size):
+        # Log-normal sizes: most posts near the median, a long tail of long-form guides
+        target = int(self.rng.lognormvariate(0, 0.6) * median_size)
+        parts, size = [], 0
+        while size < target:
+            if parts and self.rng.random() < 0.15:
+                chunk = f'<h2>{self.words(self.rng.randint(3, 7)).title()}</h2>'
+            elif parts and self.rng.random() < 0.1:
+                chunk = '<ul>' + ''.join(f'<li>{self.words(6)}</li>' for _ in range(self.rng.randint(3, 6))) + '</ul>'
+            else:
+                chunk = self.rng.choice(self.paragraphs)
+            parts.append(chunk)
+            size += len(chunk)
+        return ''.join(parts)
+
+    def past(self):
+        return self.now - timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    # Bulk insert
+
+    def insert(self, model, objects, total):
+        """Insert a generator of unsaved objects in batches; memory stays at one batch."""
+        label = model._meta.object_name
+        done = 0
+        started = time.monotonic()
+        objects = iter(objects)
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            done += len(batch)
+            self.stdout.write(f"\r{label}: {done}/{total}", ending='')
+            self.stdout.flush()
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"\r{label}: {done} in {elapsed:.1f}s ({done / max(elapsed, 1e-6):,.0f}/s)")
+
+    def generated_ids(self, model, field='slug'):
+        return list(
+            model.objects.filter(**{f'{field}__startswith': f'{self.prefix}-'}).order_by('pk').values_list('pk', flat=True)
+        )
+
+    def flush(self):
+        with transaction.atomic():
+            BlogPost.objects.filter(slug__startswith=f'{self.prefix}-').delete()
+            Category.objects.filter(slug__startswith=f'{self.prefix}-').delete()
+            FAQCategory.objects.filter(slug__startswith=f'{self.prefix}-').delete()
+            InsuranceCompany.objects.filter(slug__startswith=f'{self.prefix}-').delete()
+        self.stdout.write(self.style.WARNING(f"Deleted rows with prefix '{self.prefix}'"))
+
+    # Models
+
+    def create_categories(self, count):
+        mains = ['States', 'Coverage', 'Drivers', 'Vehicles', 'Companies']
+        Category.objects.bulk_create([
+            Category(name=f'{self.prefix} {name}', slug=f'{self.prefix}-{name.lower()}', type='main')
+            for name in mains
+        ])
+        main_ids = self.generated_ids(Category)
+        self.insert(Category, (
+            Category(
+                name=f'{self.prefix} {self.words(2).title()} {i}', slug=f'{self.prefix}-sub-{i}',
+                type='sub', parent_id=main_ids[i % len(main_ids)],
+            )
+            for i in range(count)
+        ), count)
+        # bulk_create skips Category.save(), which maintains the paths
+        paths = build_paths(Category.objects.filter(slug__startswith=f'{self.prefix}-').values_list('pk', 'parent_id'))
+        Category.objects.bulk_update(
+            [Category(pk=pk, path=path) for pk, path in paths.items()], ['path'], batch_size=self.batch_size,
+        )
+        self.category_paths = paths
+        return list(Category.objects.filter(slug__startswith=f'{self.prefix}-sub-').values_list('pk', flat=True))
+
+    def create_posts(self, count, category_ids, median_size):
+        author, _ = get_user_model().objects.get_or_create(username=f'{self.prefix}-author')
+
+        def posts():
+            for i in range(count):
+                published = self.past()
+                title = self.words(self.rng.randint(5, 10)).title()
+                category_id = self.rng.choice(category_ids)
+                yield BlogPost(
+                    title=title, slug=f'{self.prefix}-{i}', author=author,
+                    category_id=category_id, category_path=self.category_paths[category_id],
+                    summary=self.sentence() + ' ' + self.sentence(),
+                    content=self.rich_text(median_size), meta_title=title[:255], meta_description=self.sentence(),
+                    is_published=self.rng.random() < 0.95, published_at=published,
+                    updated_at=published + timedelta(days=self.rng.randrange(60)),
+                    views=int(self.rng.paretovariate(1.2) * 20),
+                )
+        self.insert(BlogPost, posts(), count)
+        return self.generated_ids(BlogPost)
+
+    def create_feedback(self, model, fk_field, target_ids, count):
+        if not target_ids:
+            return
+        # Zipf-like weights: a few popular items collect most of the feedback
+        weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(target_ids))))
+        order = target_ids[:]
+        self.rng.shuffle(order)
+        # Each row gets its own address, so (item, ip) is unique without bookkeeping
+        base = int(ipaddress.IPv4Address('10.0.0.0')) + self.rng.randrange(1 << 16) * 256
+
+        def rows():
+            for i in range(count):
+                yield model(**{
+                    fk_field: self.rng.choices(order, cum_weights=weights)[0],
+                    'is_helpful': self.rng.random() < 0.8,
+                    'comment': self.sentence() if self.rng.random() < 0.2 else '',
+                    'ip_address': str(ipaddress.IPv4Address(base + i)),
+                    'created_at': self.past(),
+                })
+        self.insert(model, rows(), count)
+
+    def create_faq_categories(self, count):
+        self.insert(FAQCategory, (
+            FAQCategory(
+                name=f'{self.prefix} {self.words(2).title()} {i}', slug=f'{self.prefix}-{i}',
+                description=self.sentence(), order=i, created_at=self.now, updated_at=self.now,
+            )
+            for i in range(count)
+        ), count)
+        return self.generated_ids(FAQCategory)
+
+    def create_faqs(self, count, category_ids):
+        category_orders = dict(FAQCategory.objects.filter(pk__in=category_ids).values_list('pk', 'order'))
+
+        def faqs():
+            for i in range(count):
+                created = self.past()
+                category_id = self.rng.choice(category_ids)
+                yield FAQ(
+                    question=self.words(self.rng.randint(6, 14)).capitalize() + '?', slug=f'{self.prefix}-{i}',
+                    answer=''.join(self.rng.choice(self.paragraphs) for _ in range(self.rng.randint(1, 4))),
+                    short_answer=self.sentence()[:300],
+                    category_id=category_id, category_order=category_orders[category_id],
+                    priority=self.rng.choice(['low', 'medium', 'high']), tags=', '.join(self.rng.sample(WORDS, 3)),
+                    is_published=self.rng.random() < 0.95, is_featured=self.rng.random() < 0.05,
+                    views=int(self.rng.paretovariate(1.2) * 20), order=i % 50,
+                    created_at=created, updated_at=created,
+                )
+        self.insert(FAQ, faqs(), count)
+        return self.generated_ids(FAQ)
+
+    def create_insurers(self, count):
+        self.insert(InsuranceCompany, (
+            InsuranceCompany(
+                name=f'{self.words(2).title()} Insurance {i}', slug=f'{self.prefix}-{i}',
+                description=self.paragraph(), website=f'https://example.com/{self.prefix}-{i}',
+                is_high_risk_recommended=self.rng.random() < 0.2, order=i,
+                created_at=self.now, updated_at=self.now,
+            )
+            for i in range(count)
+        ), count)
+        return self.generated_ids(InsuranceCompany)
+
+    def create_reviews(self, count, insurer_ids):
+        self.insert(CompanyReview, (
+            CompanyReview(
+                company_id=self.rng.choice(insurer_ids), title=self.words(6).title(), slug=f'{self.prefix}-{i}',
+                summary=self.sentence(), content=self.rich_text(3000), rating=self.rng.randint(1, 5),
+                is_published=self.rng.random() < 0.9, published_at=self.past(),
+            )
+            for i in range(count)
+        ), count)
+
+    # Derived columns
+
+    def update_counters(self, model, related_name, ids):
+        """Make helpful/not-helpful counters agree with the generated feedback rows."""
+        if not ids:
+            return
+        feedback = model._meta.get_field(related_name).related_model
+        fk = model._meta.get_field(related_name).field.name
+
+        def tally(helpful):
+            return Coalesce(Subquery(
+                feedback.objects.filter(**{fk: OuterRef('pk'), 'is_helpful': helpful})
+                .order_by().values(fk).annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField(),
+            ), 0)
+
+        with transaction.atomic():
+            model.objects.filter(slug__startswith=f'{self.prefix}-').update(
+                helpful_count=tally(True), not_helpful_count=tally(False),
+            )
+
+    def invalidate_caches(self):
+        # bulk_create sends no signals, so bump what the save/delete receivers would have
+        from backend import response_cache
+        from blog import catalog as blog_catalog
+        from faq import catalog as faq_catalog
+        from pages import shell
+
+        for model in (Category, BlogPost, FAQCategory, FAQ, InsuranceCompany, CompanyReview):
+            response_cache.bump_generation(model)
+        blog_catalog.invalidate()
+        faq_catalog.invalidate()
+        shell.invalidate()
+
+    def update_search_vectors(self):
+        from blog.search_vector import postgres_enabled, update_search_vector as update_blog
+        from faq.search import update_search_vector as update_faq
+
+        if not postgres_enabled():
+            return
+        started = time.monotonic()
+        update_blog(BlogPost.objects.filter(slug__startswith=f'{self.prefix}-'))
+        update_faq(FAQ.objects.filter(slug__startswith=f'{self.prefix}-'))
+        self.stdout.write(f"Search vectors: {time.monotonic() - started:.1f}s")
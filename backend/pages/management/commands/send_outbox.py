@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.outbox import MAX_ATTEMPTS, send_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox in batches over one SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when the queue is empty")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_batch(options["batch_size"], options["max_attempts"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+            if sent + failed >= options["batch_size"]:
+                # Full batch: there may be more due right away
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Outbox drained."))
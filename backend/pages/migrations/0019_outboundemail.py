@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0018_remove_main_group'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoreSitePage',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Website Page (SEO)',
+                'verbose_name_plural': 'Website Pages (SEO)',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('pages.staticpage',),
+        ),
+        migrations.CreateModel(
+            name='GuideMenuPage',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Insurance Guide Menu Page',
+                'verbose_name_plural': 'Insurance Guide Menu Pages',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('pages.staticpage',),
+        ),
+        migrations.CreateModel(
+            name='NavbarMenuPage',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Navbar Menu Page',
+                'verbose_name_plural': 'Navbar Menu Pages',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('pages.staticpage',),
+        ),
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipients', models.JSONField(default=list)),
+                ('from_email', models.CharField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('html_body', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outbound Email',
+                'verbose_name_plural': 'Email Outbox',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx')],
+            },
+        ),
+    ]
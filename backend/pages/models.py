@@ -113,6 +113,39 @@ class ContactSubmission(models.Model):
         return f"{self.name} - {self.subject}"
 
 
+class OutboundEmail(models.Model):
+    """Queued email, sent by the send_outbox worker (see pages/outbox.py)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    recipients = models.JSONField(default=list)
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Email Outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
 class CompanyInfo(models.Model):
     company_name = models.CharField(max_length=100, default='Insurance Panda')
     tagline = models.CharField(max_length=200, blank=True)
@@ -0,0 +1,134 @@
+"""
+Durable email outbox.
+
+Request handlers queue messages with ``enqueue_email`` inside their own
+transaction; ``manage.py send_outbox`` claims due messages in batches, delivers
+them over a single SMTP connection and retries failures with exponential
+backoff. Delivery is at least once: a runner that dies after sending but
+before recording the result leaves the message to be sent again.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import OutboundEmail
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 60        # seconds before the first retry
+BACKOFF_MAX = 60 * 60    # upper bound between retries
+CLAIM_TIMEOUT = 10 * 60  # seconds before a claimed but unfinished email is due again
+
+
+def enqueue_email(subject, recipients, template_name, context, from_email=None):
+    """Render ``template_name`` and queue it for delivery."""
+    html_body = render_to_string(template_name, context)
+    return OutboundEmail.objects.create(
+        recipients=list(recipients),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=strip_tags(html_body),
+        html_body=html_body,
+    )
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def claim_batch(batch_size=50):
+    """Mark up to ``batch_size`` due emails as sending and return them.
+
+    Claimed rows stay out of other runners' batches until ``CLAIM_TIMEOUT``
+    passes, after which a runner that died mid-batch is assumed gone and the
+    rows are due again. Each claim counts as an attempt.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=CLAIM_TIMEOUT)
+    claimed = []
+    with transaction.atomic():
+        due = (
+            OutboundEmail.objects.filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+        )
+        if db_connection.features.has_select_for_update_skip_locked:
+            # Concurrent runners pick disjoint batches
+            due = due.select_for_update(skip_locked=True)
+        for email in due[:batch_size]:
+            # attempts doubles as a version, so without row locks a row goes to one runner only
+            if OutboundEmail.objects.filter(pk=email.pk, attempts=email.attempts).update(
+                status='sending', attempts=F('attempts') + 1, next_attempt_at=lease,
+            ):
+                email.status, email.attempts, email.next_attempt_at = 'sending', email.attempts + 1, lease
+                claimed.append(email)
+    return claimed
+
+
+def record_result(email, error, max_attempts=MAX_ATTEMPTS):
+    """Store the outcome of sending a claimed ``email`` (``error`` is None on success)."""
+    if error is None:
+        fields = {'status': 'sent', 'sent_at': timezone.now(), 'last_error': ''}
+    else:
+        fields = {'last_error': f'{type(error).__name__}: {error}'}
+        if email.attempts >= max_attempts:
+            fields['status'] = 'failed'
+        else:
+            fields['status'] = 'pending'
+            fields['next_attempt_at'] = timezone.now() + backoff_delay(email.attempts)
+    # Skipped if the claim expired and another runner has since taken the row
+    OutboundEmail.objects.filter(pk=email.pk, status='sending', attempts=email.attempts).update(**fields)
+
+
+def send_batch(batch_size=50, max_attempts=MAX_ATTEMPTS):
+    """Send up to ``batch_size`` due emails; returns ``(sent, failed)``.
+
+    Rows are claimed in one short transaction and each result is saved on its
+    own, so no database lock is held while talking to the SMTP server.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+        open_error = None
+    except Exception as exc:
+        open_error = exc
+
+    try:
+        for email in emails:
+            error = open_error
+            if error is None:
+                try:
+                    _message(email, mail_connection).send()
+                except Exception as exc:
+                    error = exc
+            record_result(email, error, max_attempts)
+            if error is None:
+                sent += 1
+            else:
+                failed += 1
+    finally:
+        if open_error is None:
+            mail_connection.close()
+    return sent, failed
@@ -0,0 +1,58 @@
+"""
+Site chrome bundle for /api/site-shell/.
+
+Navbar pages, footer pages, the active company info and the recent blog/FAQ
+items are rendered together and cached as one blob with its ETag. The cache
+key carries a version that pages/signals.py bumps whenever a StaticPage,
+CompanyInfo, BlogPost or FAQ is saved or deleted.
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+VERSION_KEY = 'site-shell:version'
+CACHE_TIMEOUT = 60 * 60
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate():
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def build_shell(request):
+    from faq.views import get_recent_content
+    from .serializers import CompanyInfoSerializer
+    from .views import get_active_company_info, get_footer_pages_data, get_navbar_pages_data
+
+    company = get_active_company_info()
+    return {
+        'navbar': get_navbar_pages_data(),
+        'footer': get_footer_pages_data(),
+        'company': CompanyInfoSerializer(company, context={'request': request}).data if company else None,
+        **get_recent_content(request),
+    }
+
+
+def get_shell(request):
+    """Return ``(etag, data)`` for the site shell, building it on a cache miss."""
+    # Media URLs are absolute, so the blob is cached per scheme and host
+    key = f'site-shell:{get_version()}:{request.scheme}://{request.get_host()}'
+    cached = cache.get(key)
+    if cached is None:
+        data = build_shell(request)
+        body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        etag = '"%s"' % hashlib.md5(body.encode()).hexdigest()
+        cached = {'etag': etag, 'data': json.loads(body)}
+        cache.set(key, cached, CACHE_TIMEOUT)
+    return cached['etag'], cached['data']
@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from backend import response_cache
+from blog.models import BlogPost
+from faq.models import FAQ
+
+from . import shell
+from .models import CarInsuranceQuotesPage, CompanyInfo, StaticPage, TeamMember
+
+response_cache.watch(StaticPage, CompanyInfo, CarInsuranceQuotesPage, TeamMember)
+
+
+def invalidate_site_shell(sender, **kwargs):
+    shell.invalidate()
+
+
+# Only the shell's models: a receiver without a sender would make every delete in the project
+# load its rows to send signals. Subclasses count too, since the admin saves StaticPage through proxies.
+for sender in apps.get_models():
+    if issubclass(sender, (StaticPage, CompanyInfo, BlogPost, FAQ)):
+        uid = f'site-shell:{sender._meta.label_lower}'
+        post_save.connect(invalidate_site_shell, sender=sender, dispatch_uid=uid)
+        post_delete.connect(invalidate_site_shell, sender=sender, dispatch_uid=uid)
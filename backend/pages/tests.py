@@ -0,0 +1,134 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from analytics.models import DailyViewCount
+from backend.query_plans import check_plans
+from backend.testing import QueryBudgetTestCase
+
+from . import shell
+from .models import FooterMenuPage, OutboundEmail
+from .outbox import BACKOFF_BASE, claim_batch, record_result, send_batch
+
+
+class PagesQueryBudgetTests(QueryBudgetTestCase):
+    def test_pages(self):
+        for url_name in (
+            'all-static-pages', 'navbar-pages', 'footer-pages', 'team-members',
+            'company-info', 'site-shell', 'car-insurance-quotes',
+        ):
+            self.assertQueryBudget(url_name)
+        self.assertQueryBudget('static-page-detail', args=['about'])
+
+
+class SiteShellInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_proxy_saves_invalidate_and_other_models_keep_fast_deletes(self):
+        version = shell.get_version()
+        FooterMenuPage.objects.create(page_type='press', title='Press', content='x')
+        self.assertNotEqual(shell.get_version(), version)
+        self.assertFalse(post_delete.has_listeners(DailyViewCount))
+
+
+class QueryPlanTests(QueryBudgetTestCase):
+    def test_list_queries_use_their_indexes(self):
+        # SQLite plans with the index whatever the table size, so the seeded rows are enough
+        results = check_plans(min_rows=0)
+        problems = [f'{r.name}: {r.status} {r.detail}\n{r.plan}' for r in results if r.status != 'ok']
+        self.assertEqual(problems, [])
+
+
+@override_settings(RATE_LIMITS={'SCOPES': {'contact': {'rate': '5/hour', 'burst': 1}}})
+class ContactThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(ADMIN_EMAIL='admin@example.com')
+    def test_anonymous_submission_queues_both_emails(self):
+        # The site form posts without a session, so the view must not inherit IsAuthenticatedOrReadOnly
+        data = {'name': 'Sam', 'email': 'sam@example.com', 'subject': 'Quote', 'message': 'I would like a quote for my car.'}
+        self.assertEqual(self.client.post(reverse('contact-submission'), data).status_code, 201)
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('recipients', flat=True)),
+            [['admin@example.com'], ['sam@example.com']],
+        )
+        self.assertEqual(len(mail.outbox), 0)  # delivered later by send_outbox
+
+    def test_second_submission_is_throttled(self):
+        url = reverse('contact-submission')
+        data = {'name': 'Sam', 'email': 'sam@example.com', 'subject': 'Quote', 'message': 'I would like a quote for my car.'}
+        self.assertEqual(self.client.post(url, data).status_code, 201)
+        self.assertEqual(self.client.post(url, data).status_code, 429)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+    def setUp(self):
+        for i in range(3):
+            OutboundEmail.objects.create(
+                recipients=[f'user{i}@example.com'], from_email='site@example.com', subject=f'Email {i}', body='Hello',
+            )
+
+    def failing_smtp(self):
+        return mock.patch.object(EmailBackend, 'send_messages', side_effect=SMTPException('Connection unexpectedly closed'))
+
+    def test_sends_due_emails_in_batches(self):
+        self.assertEqual(send_batch(batch_size=2), (2, 0))
+        self.assertEqual([message.subject for message in mail.outbox], ['Email 0', 'Email 1'])
+
+        call_command('send_outbox', stdout=mock.Mock())
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('sent', 1)})
+
+    def test_failed_send_is_retried_after_a_backoff(self):
+        with self.failing_smtp():
+            self.assertEqual(send_batch(batch_size=1), (0, 1))
+        email = OutboundEmail.objects.get(subject='Email 0')
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('SMTPException', email.last_error)
+        self.assertAlmostEqual(
+            (email.next_attempt_at - timezone.now()).total_seconds(), BACKOFF_BASE, delta=5,
+        )
+
+        # Not due yet: the other emails go first
+        self.assertEqual(send_batch(), (2, 0))
+        self.assertEqual(send_batch(), (0, 0))
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('sent', 2, ''))
+
+    def test_gives_up_after_max_attempts(self):
+        for attempt in range(2):
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            with self.failing_smtp():
+                self.assertEqual(send_batch(max_attempts=2), (0, 3))
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('failed', 2)})
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(max_attempts=2), (0, 0))
+
+    def test_claimed_emails_are_skipped_by_other_runners(self):
+        claimed = claim_batch(batch_size=2)
+        self.assertEqual(send_batch(), (1, 0))
+        self.assertEqual(send_batch(), (0, 0))
+        self.assertEqual([message.subject for message in mail.outbox], ['Email 2'])
+
+        record_result(claimed[0], None)
+        # An expired claim is taken over, and the first runner's late result is dropped
+        OutboundEmail.objects.filter(pk=claimed[1].pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(send_batch(), (1, 0))
+        record_result(claimed[1], SMTPException('late'))
+        statuses = dict(OutboundEmail.objects.values_list('subject', 'status'))
+        self.assertEqual(statuses, {'Email 0': 'sent', 'Email 1': 'sent', 'Email 2': 'sent'})
+        self.assertEqual(OutboundEmail.objects.get(pk=claimed[1].pk).attempts, 2)
@@ -2,7 +2,7 @@ from django.urls import path
 from .views import (
     StaticPageDetailView, TeamMemberListView, CompanyInfoView,
     ContactSubmissionCreateView, get_all_static_pages,
-    CarInsuranceQuotesPageView, get_navbar_pages, get_footer_pages
+    CarInsuranceQuotesPageView, get_navbar_pages, get_footer_pages, get_site_shell
 )
 
 urlpatterns = [
@@ -22,6 +22,9 @@ urlpatterns = [
     # Contact form
     path('api/contact/', ContactSubmissionCreateView.as_view(), name='contact-submission'),
 
+    # Navbar, footer, company info and recent content in one request
+    path('api/site-shell/', get_site_shell, name='site-shell'),
+
     # Car Insurance Quotes page structured content
     path('api/car-insurance-quotes/', CarInsuranceQuotesPageView.as_view(), name='car-insurance-quotes'),
 ]
\ No newline at end of file
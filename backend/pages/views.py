@@ -1,18 +1,30 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.db import transaction
 from django.utils import timezone
 from .models import StaticPage, TeamMember, ContactSubmission, CompanyInfo, CarInsuranceQuotesPage
 from .serializers import (
     StaticPageSerializer, TeamMemberSerializer, 
     ContactSubmissionSerializer, CompanyInfoSerializer, CarInsuranceQuotesPageSerializer
 )
+from analytics.buffer import CountViewsMixin
+from backend.conditional import ConditionalGetMixin, conditional, queryset_validators
+from backend.response_cache import CachedResponseMixin, cache_response
+from backend.throttling import ContactThrottle
+from .outbox import enqueue_email
+from .shell import get_shell
 
 
+def static_pages_validators(request):
+    # Nav and footer are subsets of the active pages; one aggregate covers all three lists
+    return queryset_validators(StaticPage.objects.filter(is_active=True), models=(StaticPage,))
+
+
+@cache_response(StaticPage)
+@conditional(static_pages_validators)
 @api_view(['GET'])
 def get_all_static_pages(request):
     """Get all static pages"""
@@ -60,12 +72,7 @@ def _page_url(page_type: str) -> str:
     return mapping.get(page_type, f'/pages/{page_type}')
 
 
-@api_view(['GET'])
-def get_navbar_pages(request):
-    """Return ONLY company/info pages for the extra dropdown.
-    Frontend already renders Insurance Guide and other static items,
-    so we avoid duplicates and provide a single dropdown group.
-    """
+def get_navbar_pages_data():
     company_types = {
         'about', 'contact', 'privacy', 'terms', 'california_privacy', 'disclosure', 'team', 'how_to_use'
     }
@@ -73,68 +80,111 @@ def get_navbar_pages(request):
         is_active=True, show_in_navbar=True, page_type__in=company_types
     ).order_by('nav_order', 'title')
 
-    data = [{
+    return [{
         'title': p.title,
         'label': p.menu_label or p.title,
         'group': (p.nav_group or 'Company'),
         'page_type': p.page_type,
         'url': _page_url(p.page_type)
     } for p in pages]
-    return Response(data)
 
 
+@cache_response(StaticPage)
+@conditional(static_pages_validators)
+@api_view(['GET'])
+def get_navbar_pages(request):
+    """Return ONLY company/info pages for the extra dropdown.
+    Frontend already renders Insurance Guide and other static items,
+    so we avoid duplicates and provide a single dropdown group.
+    """
+    return Response(get_navbar_pages_data())
+
+
+def get_footer_pages_data():
+    pages = StaticPage.objects.filter(is_active=True, show_in_footer=True).order_by('footer_order', 'title')
+    return [{'title': p.title, 'label': p.menu_label or p.title, 'page_type': p.page_type, 'url': _page_url(p.page_type)} for p in pages]
+
+
+@cache_response(StaticPage)
+@conditional(static_pages_validators)
 @api_view(['GET'])
 def get_footer_pages(request):
     """List active static pages configured to show in footer"""
-    pages = StaticPage.objects.filter(is_active=True, show_in_footer=True).order_by('footer_order', 'title')
-    data = [{'title': p.title, 'label': p.menu_label or p.title, 'page_type': p.page_type, 'url': _page_url(p.page_type)} for p in pages]
-    return Response(data)
+    return Response(get_footer_pages_data())
 
 
-class StaticPageDetailView(generics.RetrieveAPIView):
+@api_view(['GET'])
+def get_site_shell(request):
+    """Navbar, footer, company info and recent content in one cached response.
+    Sends an ETag and answers a matching If-None-Match with 304.
+    """
+    etag, data = get_shell(request)
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=600'
+    return response
+
+
+class StaticPageDetailView(CountViewsMixin, CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Get static page by page type"""
+    cache_models = (StaticPage,)
     serializer_class = StaticPageSerializer
     lookup_field = 'page_type'
+    view_counter_label = 'pages.StaticPage'
     
     def get_queryset(self):
         return StaticPage.objects.filter(is_active=True)
 
 
-class TeamMemberListView(generics.ListAPIView):
+class TeamMemberListView(CachedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
     """Get all active team members"""
+    cache_models = (TeamMember,)
     serializer_class = TeamMemberSerializer
     
     def get_queryset(self):
         return TeamMember.objects.filter(is_active=True)
 
 
-class CompanyInfoView(generics.RetrieveAPIView):
+def get_active_company_info():
+    # Return the active company info, or the first one if none is active
+    active_company = CompanyInfo.objects.filter(is_active=True).first()
+    if active_company:
+        return active_company
+    # Fallback to first company info if none is marked as active
+    return CompanyInfo.objects.first()
+
+
+class CompanyInfoView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Get active company information"""
+    cache_models = (CompanyInfo,)
     serializer_class = CompanyInfoSerializer
     
     def get_object(self):
-        # Return the active company info, or the first one if none is active
-        active_company = CompanyInfo.objects.filter(is_active=True).first()
-        if active_company:
-            return active_company
-        # Fallback to first company info if none is marked as active
-        return CompanyInfo.objects.first()
+        company = get_active_company_info()
+        self.check_object_not_modified(company)
+        return company
 
 
 class ContactSubmissionCreateView(generics.CreateAPIView):
-    """Create contact form submission and send emails"""
+    """Create contact form submission and queue the notification emails"""
     queryset = ContactSubmission.objects.all()
     serializer_class = ContactSubmissionSerializer
+    # Public form: anonymous visitors submit it, the per-IP throttle keeps it in check
+    permission_classes = [AllowAny]
+    throttle_classes = [ContactThrottle]
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Save the contact submission
-        contact_submission = serializer.save()
-        
-        # Send emails
-        try:
+        # Save the submission and its emails together; the send_outbox worker delivers them
+        with transaction.atomic():
+            contact_submission = serializer.save()
+
             # Email context
             context = {
                 'name': contact_submission.name,
@@ -146,54 +196,39 @@ class ContactSubmissionCreateView(generics.CreateAPIView):
                 'site_name': settings.SITE_NAME,
                 'site_url': settings.SITE_URL,
             }
-            
-            # Send email to admin
-            admin_html_message = render_to_string('pages/contact_admin_email.html', context)
-            admin_plain_message = strip_tags(admin_html_message)
-            
-            send_mail(
-                subject=f'New Contact Form Submission - {contact_submission.subject or "General Inquiry"}',
-                message=admin_plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.ADMIN_EMAIL],
-                html_message=admin_html_message,
-                fail_silently=False,
-            )
-            
-            # Send confirmation email to user
-            user_html_message = render_to_string('pages/contact_user_email.html', context)
-            user_plain_message = strip_tags(user_html_message)
-            
-            send_mail(
+
+            # Email to admin
+            if settings.ADMIN_EMAIL:
+                enqueue_email(
+                    subject=f'New Contact Form Submission - {contact_submission.subject or "General Inquiry"}',
+                    recipients=[settings.ADMIN_EMAIL],
+                    template_name='pages/contact_admin_email.html',
+                    context=context,
+                )
+
+            # Confirmation email to user
+            enqueue_email(
                 subject=f'Thank you for contacting {settings.SITE_NAME}',
-                message=user_plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[contact_submission.email],
-                html_message=user_html_message,
-                fail_silently=False,
+                recipients=[contact_submission.email],
+                template_name='pages/contact_user_email.html',
+                context=context,
             )
-            
-            return Response({
-                'message': 'Contact form submitted successfully! We will get back to you soon.',
-                'data': serializer.data
-            }, status=status.HTTP_201_CREATED)
-            
-        except Exception as e:
-            # If email fails, still return success but log the error
-            return Response({
-                'message': 'Contact form submitted successfully! However, there was an issue sending confirmation emails.',
-                'data': serializer.data,
-                'email_error': str(e)
-            }, status=status.HTTP_201_CREATED)
-
-
-class CarInsuranceQuotesPageView(generics.RetrieveAPIView):
+
+        return Response({
+            'message': 'Contact form submitted successfully! We will get back to you soon.',
+            'data': serializer.data
+        }, status=status.HTTP_201_CREATED)
+
+
+class CarInsuranceQuotesPageView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Get Car Insurance Quotes page structured content"""
+    cache_models = (CarInsuranceQuotesPage,)
     serializer_class = CarInsuranceQuotesPageSerializer
 
     def get_object(self):
         obj = CarInsuranceQuotesPage.objects.first()
         if obj:
+            self.check_object_not_modified(obj)
             return obj
         # Ensure at least one record exists to avoid 404/500
         return CarInsuranceQuotesPage.objects.create(
@@ -0,0 +1,255 @@
+"""
+Related posts and FAQs for every published post and FAQ.
+
+``build()`` (``manage.py build_related --full``, nightly) vectorises every
+published post and FAQ with TF-IDF (related/tfidf.py). It reads the title or
+question, summary or short answer, body and tags, and reads the corpus twice
+(vocabulary, then vectors) so only the sparse matrix is held in memory. Each
+item's ``TOP_K`` most similar posts and FAQs are stored as ``RelatedItem``
+rows, and the vectors are saved to ``INDEX_PATH``.
+
+Saving or deleting a post or FAQ queues it (related/signals.py). ``update()``
+(``manage.py build_related``, every few minutes) loads the saved vectors and
+re-vectorises only the queued items with the saved vocabulary. It then
+recomputes their lists, the lists that pointed at them, and the lists they
+now enter. Words first seen since the last full build are ignored until the
+next one. Without a saved index, ``update()`` falls back to ``build()``.
+
+Configuration lives in ``settings.RELATED_CONTENT``:
+
+    RELATED_CONTENT = {
+        'TOP_K': 5,               # related posts and FAQs kept per item
+        'INDEX_PATH': '/var/lib/insurance/related-index.npz',
+        'MAX_DF': 0.5,            # drop terms found in more than this share of documents
+        'MIN_SCORE': 0.05,        # least cosine similarity worth showing
+    }
+
+Runs must not overlap: each one rewrites the index file.
+"""
+import os
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from scipy import sparse
+
+from backend.response_cache import bump_generation
+
+from .models import PendingRelatedUpdate, RelatedItem
+from .tfidf import Vectorizer, neighbours, strip_html, tokenize
+
+DEFAULTS = {
+    'TOP_K': 5,
+    'INDEX_PATH': None,  # BASE_DIR/related-index.npz
+    'MAX_DF': 0.5,
+    'MAX_TERMS': 200,
+    'MIN_SCORE': 0.05,
+    'BLOCK_SIZE': 256,
+    'BATCH_SIZE': 1000,
+}
+
+# Item type -> (model, fields read as heading, summary, HTML body, tags); the position is the group id
+SOURCES = [
+    ('blog.blogpost', 'blog.BlogPost', ('title', 'summary', 'content', 'meta_keywords')),
+    ('faq.faq', 'faq.FAQ', ('question', 'short_answer', 'answer', 'tags')),
+]
+WEIGHTS = (3, 2, 1, 2)
+TARGET_FIELDS = ('post', 'faq')  # RelatedItem foreign key per group
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RELATED_CONTENT', {}))
+    if not config['INDEX_PATH']:
+        config['INDEX_PATH'] = os.path.join(settings.BASE_DIR, 'related-index.npz')
+    return config
+
+
+def _documents(group, pks=None):
+    """Yield ``(pk, term counts)`` for the published items of a group, optionally only ``pks``."""
+    _, label, fields = SOURCES[group]
+    queryset = apps.get_model(label)._default_manager.filter(is_published=True)
+    if pks is not None:
+        queryset = queryset.filter(pk__in=list(pks))
+    for pk, heading, summary, body, tags in queryset.order_by('pk').values_list('pk', *fields).iterator(chunk_size=2000):
+        yield pk, tokenize(zip((heading, summary, strip_html(body), tags), WEIGHTS))
+
+
+class RelatedIndex:
+    """Item vectors with the vocabulary that produced them, saved between runs.
+
+    Row ``i`` of ``matrix`` is item ``ids[i]`` of group ``groups[i]``;
+    ``cutoffs[i, g]`` is the score of the last of its ``TOP_K`` related items
+    of group ``g``, or 0 while it has fewer, so a changed item only enters
+    lists whose cutoff it beats.
+    """
+
+    def __init__(self, vectorizer, groups, ids, matrix, cutoffs=None):
+        self.vectorizer = vectorizer
+        self.groups = np.asarray(groups, dtype=np.int8)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.matrix = matrix
+        self.cutoffs = cutoffs if cutoffs is not None else np.zeros((len(self.ids), len(SOURCES)), dtype=np.float32)
+
+    def rows(self):
+        return {(group, pk): row for row, (group, pk) in enumerate(zip(self.groups.tolist(), self.ids.tolist()))}
+
+    def save(self, path):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(
+                file, terms=np.array(self.vectorizer.terms, dtype=str), idf=self.vectorizer.idf,
+                max_terms=self.vectorizer.max_terms, groups=self.groups, ids=self.ids, cutoffs=self.cutoffs,
+                data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+                shape=np.array(self.matrix.shape),
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """The saved index, or None when there is none."""
+        try:
+            with np.load(path) as saved:
+                vectorizer = Vectorizer(saved['terms'].tolist(), saved['idf'], int(saved['max_terms']))
+                matrix = sparse.csr_matrix(
+                    (saved['data'], saved['indices'], saved['indptr']), shape=tuple(saved['shape']),
+                )
+                return cls(vectorizer, saved['groups'], saved['ids'], matrix, saved['cutoffs'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def _store(index, rows, config):
+    """Recompute and replace the related items of the items at ``rows``; returns the rows written."""
+    rows = np.asarray(sorted(rows), dtype=np.int64)
+    results = neighbours(
+        index.matrix[rows], index.matrix, index.groups, config['TOP_K'], exclude=rows,
+        min_score=config['MIN_SCORE'], block_size=config['BLOCK_SIZE'],
+    )
+    items, sources = [], []
+    for row, related in zip(rows.tolist(), results):
+        source_type, source_id = SOURCES[index.groups[row]][0], int(index.ids[row])
+        sources.append((source_type, source_id))
+        for group, entries in related.items():
+            index.cutoffs[row, group] = entries[-1][1] if len(entries) == config['TOP_K'] else 0
+            items += [
+                RelatedItem(
+                    source_type=source_type, source_id=source_id, rank=rank, score=score,
+                    **{f'{TARGET_FIELDS[group]}_id': int(index.ids[target])},
+                )
+                for rank, (target, score) in enumerate(entries)
+            ]
+        if len(items) >= config['BATCH_SIZE']:
+            _replace(sources, items, config)
+            items, sources = [], []
+    _replace(sources, items, config)
+    return len(rows)
+
+
+def _replace(sources, items, config):
+    with transaction.atomic():
+        _delete_sources(sources)
+        RelatedItem.objects.bulk_create(items, batch_size=config['BATCH_SIZE'])
+
+
+def _delete_sources(sources):
+    by_type = {}
+    for source_type, source_id in sources:
+        by_type.setdefault(source_type, []).append(source_id)
+    for source_type, source_ids in by_type.items():
+        RelatedItem.objects.filter(source_type=source_type, source_id__in=source_ids).delete()
+
+
+def _finish(index, config, processed):
+    index.save(config['INDEX_PATH'])
+    # Only the rows this run read: ids are taken before commit, so a save that was in flight when the
+    # queue was read may sit below them, and one made during the run must wait for the next run
+    processed = sorted(processed)
+    for start in range(0, len(processed), config['BATCH_SIZE']):
+        PendingRelatedUpdate.objects.filter(pk__in=processed[start:start + config['BATCH_SIZE']]).delete()
+    # Detail responses embed the related items
+    for _, label, _ in SOURCES:
+        bump_generation(apps.get_model(label))
+
+
+def build(config=None):
+    """Recompute every published item's related items; returns the number of items."""
+    config = config or get_config()
+    processed = list(PendingRelatedUpdate.objects.values_list('pk', flat=True))
+    vectorizer = Vectorizer.fit(
+        (counts for group in range(len(SOURCES)) for _, counts in _documents(group)),
+        max_df=config['MAX_DF'], max_terms=config['MAX_TERMS'],
+    )
+    keys = []
+
+    def counts():
+        for group in range(len(SOURCES)):
+            for pk, item_counts in _documents(group):
+                keys.append((group, pk))
+                yield item_counts
+
+    matrix = vectorizer.transform(counts())
+    index = RelatedIndex(vectorizer, [group for group, _ in keys], [pk for _, pk in keys], matrix)
+    # One transaction: readers keep the previous lists until the new ones are complete
+    with transaction.atomic():
+        RelatedItem.objects.all().delete()
+        _store(index, range(len(keys)), config)
+    _finish(index, config, processed)
+    return len(keys)
+
+
+def update(config=None):
+    """Apply the queued changes; returns the number of items whose related items were recomputed."""
+    config = config or get_config()
+    pending = list(PendingRelatedUpdate.objects.order_by('pk').values_list('pk', 'source_type', 'source_id'))
+    if not pending:
+        return 0
+    index = RelatedIndex.load(config['INDEX_PATH'])
+    if index is None:
+        return build(config)
+
+    types = [source_type for source_type, _, _ in SOURCES]
+    changed = {(types.index(source_type), source_id) for _, source_type, source_id in pending if source_type in types}
+    vectors, keys = [], []
+    for group in range(len(SOURCES)):
+        for pk, counts in _documents(group, [pk for key_group, pk in changed if key_group == group]):
+            keys.append((group, pk))
+            vectors.append(counts)
+    fresh = index.vectorizer.transform(vectors)
+
+    # Lists that showed a changed item, which may no longer belong there
+    pointing = Q(pk__in=[])
+    for group, field in enumerate(TARGET_FIELDS):
+        pointing |= Q(**{f'{field}_id__in': [pk for key_group, pk in changed if key_group == group]})
+    stale = set(RelatedItem.objects.filter(pointing).values_list('source_type', 'source_id').distinct())
+    _delete_sources([(SOURCES[group][0], pk) for group, pk in changed])
+
+    # Replace the changed rows; unpublished and deleted items just drop out
+    old_rows = index.rows()
+    keep = np.array(sorted(set(range(len(index.ids))) - {old_rows[key] for key in changed if key in old_rows}), dtype=np.int64)
+    index = RelatedIndex(
+        index.vectorizer,
+        np.concatenate([index.groups[keep], np.array([group for group, _ in keys], dtype=np.int8)]),
+        np.concatenate([index.ids[keep], np.array([pk for _, pk in keys], dtype=np.int64)]),
+        sparse.vstack([index.matrix[keep], fresh]).tocsr(),
+        np.concatenate([index.cutoffs[keep], np.zeros((len(keys), len(SOURCES)), dtype=np.float32)]),
+    )
+    rows = index.rows()
+    recompute = {rows[key] for key in keys}
+    recompute |= {rows[types.index(source_type), source_id] for source_type, source_id in stale
+                  if (types.index(source_type), source_id) in rows}
+
+    # Lists the changed items now enter: they beat the list's last entry of their group
+    first_new = len(index.ids) - len(keys)
+    if keys:
+        similarities = (fresh @ index.matrix.T).tocoo()
+        groups = index.groups[first_new + similarities.row]
+        entering = similarities.data > np.maximum(index.cutoffs[similarities.col, groups], config['MIN_SCORE'])
+        entering &= similarities.col != first_new + similarities.row
+        recompute |= set(similarities.col[entering].tolist())
+
+    written = _store(index, recompute, config) if recompute else 0
+    _finish(index, config, [pk for pk, _, _ in pending])
+    return written
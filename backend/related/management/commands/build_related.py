@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from related.builder import build, update
+
+
+class Command(BaseCommand):
+    help = "Recompute related posts and FAQs for the items saved since the last run"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild the vocabulary and every item (nightly)')
+
+    def handle(self, *args, **options):
+        if options['full']:
+            self.stdout.write(self.style.SUCCESS(f"{build()} items indexed"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{update()} related lists updated"))
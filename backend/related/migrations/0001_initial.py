@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('blog', '0010_trending_score'),
+        ('faq', '0008_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRelatedUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(max_length=50)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_type', 'source_id'), name='pendingrelated_source_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RelatedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(max_length=50)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('faq', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='faq.faq')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.blogpost')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source_type', 'source_id', 'rank'], name='relateditem_source_idx')],
+            },
+        ),
+    ]
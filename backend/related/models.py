@@ -0,0 +1,38 @@
+from django.db import models
+
+
+class RelatedItem(models.Model):
+    """One entry of an item's precomputed related posts or FAQs (see related/builder.py).
+
+    Exactly one of ``post`` and ``faq`` is set; ``rank`` orders the entries
+    of a source per target type, best first.
+    """
+    source_type = models.CharField(max_length=50)  # model label, e.g. 'blog.blogpost'
+    source_id = models.PositiveBigIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    post = models.ForeignKey('blog.BlogPost', null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    faq = models.ForeignKey('faq.FAQ', null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['source_type', 'source_id', 'rank'], name='relateditem_source_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source_type}:{self.source_id} #{self.rank} -> {self.post_id or self.faq_id}"
+
+
+class PendingRelatedUpdate(models.Model):
+    """A post or FAQ saved or deleted since its related items were computed.
+
+    Every save adds a row, even for an item already queued: a run deletes
+    exactly the rows it read, so a save during the run leaves its own row
+    for the next one.
+    """
+    source_type = models.CharField(max_length=50)
+    source_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.source_type}:{self.source_id}"
@@ -0,0 +1,52 @@
+from django.db.models import Q
+from rest_framework import serializers
+
+from blog.models import BlogPost
+from faq.models import FAQ
+
+from .models import RelatedItem
+
+
+class RelatedPostSerializer(serializers.ModelSerializer):
+    category = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BlogPost
+        fields = ('id', 'title', 'slug', 'summary', 'feature_image', 'category')
+
+    def get_category(self, obj):
+        if obj.category is None:
+            return None
+        return {'name': obj.category.name, 'slug': obj.category.slug}
+
+
+class RelatedFAQSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FAQ
+        fields = ('id', 'question', 'slug', 'short_answer')
+
+
+def related_content(obj, context=None):
+    """``{'posts': [...], 'faqs': [...]}`` precomputed for ``obj``, read in one query."""
+    items = (
+        RelatedItem.objects.filter(source_type=obj._meta.label_lower, source_id=obj.pk)
+        .filter(Q(post__is_published=True) | Q(faq__is_published=True))
+        .select_related('post__category', 'faq')
+        .only(
+            'rank', 'post', 'faq',
+            'post__id', 'post__title', 'post__slug', 'post__summary', 'post__feature_image',
+            'post__category', 'post__category__name', 'post__category__slug',
+            'faq__id', 'faq__question', 'faq__slug', 'faq__short_answer',
+        )
+        .order_by('rank')
+    )
+    posts, faqs = [], []
+    for item in items:
+        if item.post_id:
+            posts.append(item.post)
+        else:
+            faqs.append(item.faq)
+    return {
+        'posts': RelatedPostSerializer(posts, many=True, context=context).data,
+        'faqs': RelatedFAQSerializer(faqs, many=True, context=context).data,
+    }
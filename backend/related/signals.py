@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from blog.models import BlogPost
+from faq.models import FAQ
+
+from .models import PendingRelatedUpdate, RelatedItem
+
+
+def enqueue(sources):
+    """Queue ``[(source_type, source_id), ...]`` for the next ``build_related`` run."""
+    PendingRelatedUpdate.objects.bulk_create(
+        [PendingRelatedUpdate(source_type=source_type, source_id=source_id) for source_type, source_id in sources],
+    )
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_delete, sender=FAQ)
+def queue_related_update(sender, instance, **kwargs):
+    enqueue([(sender._meta.label_lower, instance.pk)])
+
+
+@receiver(pre_delete, sender=BlogPost)
+@receiver(pre_delete, sender=FAQ)
+def queue_lists_showing_deleted_item(sender, instance, **kwargs):
+    # The item's entries in other lists are removed by the cascade; refill those lists
+    field = 'post' if sender is BlogPost else 'faq'
+    enqueue(RelatedItem.objects.filter(**{field: instance}).values_list('source_type', 'source_id').distinct())
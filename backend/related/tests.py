@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from blog.models import BlogPost
+from faq.models import FAQ, FAQCategory
+
+from . import builder
+from .builder import build, update
+from .models import PendingRelatedUpdate
+from .serializers import related_content
+
+
+class RelatedContentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        post = lambda slug, title, content: BlogPost.objects.create(
+            title=title, slug=slug, content=content, is_published=True,
+        )
+        cls.deductibles = post('deductibles', 'Car deductibles explained', '<p>How a car deductible lowers premiums.</p>')
+        cls.choosing = post('choosing', 'Choosing a car deductible', '<p>Pick a deductible you can pay after a crash.</p>')
+        cls.flood = post('flood', 'Flood cover for homes', '<p>Basements, rivers and storm surge.</p>')
+        category = FAQCategory.objects.create(name='Claims')
+        cls.faq = FAQ.objects.create(
+            category=category, question='Which car deductible should I pick?', slug='pick-deductible',
+            answer='Compare premiums.',
+        )
+        FAQ.objects.create(category=category, question='Is a stolen bike on renters policies?', slug='theft', answer='Usually.')
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # A corpus this small needs a high MAX_DF: 'car' alone is in three of five documents
+        settings = override_settings(RELATED_CONTENT={
+            'INDEX_PATH': os.path.join(directory, 'index.npz'), 'TOP_K': 2, 'MAX_DF': 0.8,
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def related_slugs(self, obj):
+        related = related_content(obj)
+        return [post['slug'] for post in related['posts']], [faq['slug'] for faq in related['faqs']]
+
+    def test_full_build(self):
+        self.assertEqual(build(), 5)
+        self.assertEqual(self.related_slugs(self.deductibles), (['choosing'], ['pick-deductible']))
+        self.assertEqual(self.related_slugs(self.flood), ([], []))
+        self.assertFalse(PendingRelatedUpdate.objects.exists())
+
+        with self.assertNumQueries(1):
+            related_content(self.faq)
+        response = self.client.get('/api/blog/posts/deductibles/')
+        self.assertEqual([post['slug'] for post in response.json()['related']['posts']], ['choosing'])
+
+    def test_saves_are_applied_incrementally(self):
+        build()
+        calculator = BlogPost.objects.create(
+            title='Car deductible calculator', slug='calculator', content='<p>Premiums by deductible.</p>',
+            is_published=True,
+        )
+        self.choosing.is_published = False
+        self.choosing.save()
+        self.assertEqual(PendingRelatedUpdate.objects.count(), 2)
+
+        update()
+        # The new post enters the lists it beats; the unpublished one leaves them
+        self.assertEqual(self.related_slugs(self.deductibles)[0], ['calculator'])
+        self.assertEqual(self.related_slugs(calculator), (['deductibles'], ['pick-deductible']))
+        self.assertFalse(PendingRelatedUpdate.objects.exists())
+        self.assertEqual(update(), 0)
+
+    def test_saves_during_a_run_stay_queued(self):
+        build()
+        self.flood.save()
+        store = builder._store
+
+        def store_while_editing(*args, **kwargs):
+            # Saved again after the run read the queue: the next run has to pick it up
+            self.flood.save()
+            return store(*args, **kwargs)
+
+        with mock.patch.object(builder, '_store', store_while_editing):
+            update()
+        self.assertEqual(PendingRelatedUpdate.objects.count(), 1)
+        update()
+        self.assertFalse(PendingRelatedUpdate.objects.exists())
+
+    def test_update_without_an_index_builds(self):
+        self.assertEqual(update(), 5)
+        # Both share 'car deductible'; 'choosing' also shares 'pick'
+        self.assertEqual(self.related_slugs(self.faq)[0], ['choosing', 'deductibles'])
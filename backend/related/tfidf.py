@@ -0,0 +1,171 @@
+"""
+TF-IDF vectors and top-K cosine neighbours over sparse matrices.
+
+A document is a weighted bag of words: every token of a field counts
+``weight`` times, so a title word outweighs a body word. A vector holds
+``(1 + ln tf) * idf`` per term, with ``idf = ln((1 + n) / (1 + df)) + 1``. Only
+the document's ``max_terms`` strongest terms are kept, and the vector is
+L2-normalised so that a dot product is the cosine similarity.
+
+Neighbours are found for a block of rows at a time. ``block @ matrix.T`` is a
+sparse product whose size depends on how many terms documents share, never an
+n x n dense matrix. Blocks get fewer rows as the corpus grows, so memory stays
+bounded by the block rather than growing with the square of the corpus. Terms
+found in more than ``max_df`` of the documents are dropped when fitting: they
+tie everything to everything and would make the products dense. A dense block
+is still handled, just with numpy's dense selection.
+"""
+import html
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r'[^\W\d_]{3,}')
+TAG_RE = re.compile(r'<[^>]*>')
+
+# Common words that would otherwise survive max_df in small corpora
+STOP_WORDS = frozenset("""
+    about after again also and any are because been before being between both but can could did does
+    doing down each few for from further had has have having her here hers him his how into its just
+    more most not now off once only other our out over own same she should some such than that the
+    their them then there these they this those through too under until very was were what when where
+    which while who whom why will with would you your
+""".split())
+
+
+def strip_html(text):
+    """Text of an HTML fragment, good enough for counting words (and much faster than an HTML parser)."""
+    return html.unescape(TAG_RE.sub(' ', text or ''))
+
+
+def tokenize(fields):
+    """Weighted term counts of ``[(text, weight), ...]``."""
+    counts = Counter()
+    for text, weight in fields:
+        for token, count in Counter(TOKEN_RE.findall((text or '').lower())).items():
+            counts[token] += count * weight
+    for word in STOP_WORDS & counts.keys():
+        del counts[word]
+    return counts
+
+
+class Vectorizer:
+    def __init__(self, terms, idf, max_terms=200):
+        self.terms = list(terms)  # column -> term
+        self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.max_terms = max_terms
+
+    @classmethod
+    def fit(cls, documents, max_df=0.5, max_terms=200):
+        """Learn the vocabulary and idf from an iterable of term counts."""
+        df, n = Counter(), 0
+        for counts in documents:
+            df.update(counts.keys())
+            n += 1
+        limit = max(max_df * n, 1)
+        terms = sorted(term for term, count in df.items() if count <= limit)
+        idf = [math.log((1 + n) / (1 + df[term])) + 1 for term in terms]
+        return cls(terms, idf, max_terms)
+
+    def vector(self, counts):
+        """``(columns, weights)`` of one document, L2-normalised."""
+        pairs = [(self.vocabulary[term], count) for term, count in counts.items() if term in self.vocabulary]
+        if not pairs:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        columns = np.fromiter((column for column, _ in pairs), dtype=np.int32, count=len(pairs))
+        tf = np.fromiter((count for _, count in pairs), dtype=np.float32, count=len(pairs))
+        weights = (1 + np.log(tf)) * self.idf[columns]
+        if len(weights) > self.max_terms:
+            strongest = np.argpartition(weights, -self.max_terms)[-self.max_terms:]
+            columns, weights = columns[strongest], weights[strongest]
+        order = np.argsort(columns)
+        return columns[order], weights[order] / np.linalg.norm(weights)
+
+    def transform(self, documents):
+        """CSR matrix with one row per term-count mapping in ``documents``."""
+        indptr, indices, data = [0], [], []
+        for counts in documents:
+            columns, weights = self.vector(counts)
+            indices.append(columns)
+            data.append(weights)
+            indptr.append(indptr[-1] + len(columns))
+        return sparse.csr_matrix(
+            (
+                np.concatenate(data) if data else np.empty(0, dtype=np.float32),
+                np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+                np.array(indptr, dtype=np.int64),
+            ),
+            shape=(len(indptr) - 1, len(self.terms)),
+            dtype=np.float32,
+        )
+
+
+def _top_dense(products, columns, k, min_score):
+    """``[[(row, score), ...] per query]`` from a dense block restricted to ``columns``."""
+    scores = products[:, columns]
+    if scores.shape[1] > k:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    best_rows = columns[best]
+    order = np.lexsort((best_rows, -best_scores), axis=1)
+    best_rows, best_scores = np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+    return [
+        [(row, score) for row, score in zip(rows, scores) if score > min_score]
+        for rows, scores in zip(best_rows.tolist(), best_scores.tolist())
+    ]
+
+
+def _top_sparse(products, groups, group_ids, k, min_score, exclude):
+    """Like ``_top_dense`` for every group at once, from a sparse block: ``[{group: [...]} per query]``."""
+    offsets = np.repeat(np.arange(products.shape[0]), np.diff(products.indptr))
+    rows, scores = products.indices, products.data
+    keep = scores > min_score
+    if exclude is not None:
+        keep &= rows != exclude[offsets]
+    offsets, rows, scores = offsets[keep], rows[keep], scores[keep]
+    row_groups = groups[rows]
+    # Sort by query, group, best score first; then keep the first k of every (query, group) run
+    order = np.lexsort((rows, -scores, row_groups, offsets))
+    offsets, rows, scores, row_groups = offsets[order], rows[order], scores[order], row_groups[order]
+    runs = np.flatnonzero(np.r_[True, (offsets[1:] != offsets[:-1]) | (row_groups[1:] != row_groups[:-1])])
+    best = np.arange(len(offsets)) - np.repeat(runs, np.diff(np.r_[runs, len(offsets)])) < k
+    results = [{group: [] for group in group_ids} for _ in range(products.shape[0])]
+    for offset, row, score, group in zip(
+        offsets[best].tolist(), rows[best].tolist(), scores[best].tolist(), row_groups[best].tolist(),
+    ):
+        results[offset][group].append((row, score))
+    return results
+
+
+def neighbours(queries, matrix, groups, k, exclude=None, min_score=0.0, block_size=256, block_cells=1 << 22):
+    """Yield the ``k`` rows of ``matrix`` most similar to each row of ``queries``, per group.
+
+    ``groups`` gives every row of ``matrix`` a small integer (e.g. post or
+    FAQ); each yielded value is ``{group: [(row, score), ...]}``, best first.
+    ``exclude[i]`` is a row never returned for query ``i`` (the query itself).
+    Blocks hold at most ``block_size`` queries and ``block_cells`` scores.
+    """
+    transposed = matrix.T.tocsr()
+    size = matrix.shape[0]
+    group_ids = np.unique(groups).tolist()
+    columns = {group: np.flatnonzero(groups == group) for group in group_ids}
+    step = max(1, min(block_size, block_cells // max(size, 1)))
+    for start in range(0, queries.shape[0], step):
+        products = (queries[start:start + step] @ transposed).tocsr()
+        excluded = None if exclude is None else np.asarray(exclude[start:start + step])
+        # Few shared terms leave the block sparse; common ones make it dense, where numpy selects faster
+        if products.nnz * 4 < products.shape[0] * size:
+            yield from _top_sparse(products, groups, group_ids, k, min_score, excluded)
+            continue
+        products = products.toarray()
+        if excluded is not None:
+            products[np.arange(products.shape[0]), excluded] = -np.inf
+        per_group = {group: _top_dense(products, columns[group], k, min_score) for group in group_ids}
+        for offset in range(products.shape[0]):
+            yield {group: per_group[group][offset] for group in group_ids}
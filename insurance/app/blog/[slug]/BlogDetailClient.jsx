@@ -61,7 +61,6 @@ const BlogDetailClient = ({ params, backHref = '/blog', backLabel = 'Back to Blo
   useEffect(() => {
     if (slug && slug !== 'undefined') {
       fetchPost();
-      fetchRelatedPosts();
     } else if (slug === 'undefined') {
       setError('Invalid blog post URL');
       setLoading(false);
@@ -89,6 +88,8 @@ const BlogDetailClient = ({ params, backHref = '/blog', backLabel = 'Back to Blo
       }
       const data = await res.json();
       setPost(data);
+      // Related articles are precomputed server-side and embedded in the detail response
+      setRelatedPosts(data.related?.posts || []);
       
       // Increment view count (legacy path)
       try {
@@ -106,18 +107,6 @@ const BlogDetailClient = ({ params, backHref = '/blog', backLabel = 'Back to Blo
     }
   };
 
-  const fetchRelatedPosts = async () => {
-    try {
-      const res = await fetch(`${API_BASE_URL}/api/blog/posts/?limit=3`);
-      if (res.ok) {
-        const data = await res.json();
-        setRelatedPosts(data.results || data);
-      }
-    } catch (err) {
-      console.error('Error fetching related posts:', err);
-    }
-  };
-
   const formatDate = (dateString) => {
     if (!dateString) return '';
     const date = new Date(dateString);